@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Execução em lote (não interativa) das análises de vários arquivos de estrutura em paralelo.
+
+Uso:
+    python BatchRunner.py Examples --workers 4
+    python BatchRunner.py "Modelos/**/*.json" --storage sparse --solver cholesky --summary resumo.json
+    python BatchRunner.py Examples --cache Cache --cache-size 512
+"""
+import argparse
+import glob
+import json
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ResultCache import ResultCache
+
+
+def findModels(target: str, pattern: str = "*.json", recursive: bool = False) -> list[str]:
+    """
+    Lista os arquivos de estrutura de um diretório ou de um padrão glob (os arquivos de resultados são ignorados)
+    """
+    if os.path.isdir(target):
+        target = os.path.join(target, "**", pattern) if recursive else os.path.join(target, pattern)
+        recursive = True
+    files = glob.glob(target, recursive=recursive)
+    return sorted(f for f in files if os.path.isfile(f) and not os.path.basename(f).startswith("results."))
+
+
+def analyseModel(dir: str, options: dict, plot: bool = False) -> dict:
+    """
+    Analisa um arquivo de estrutura e escreve o seu results.json (executado em um processo do pool)
+    plot: grava também a figura da estrutura (backend Agg, sem janela); por padrão, a plotagem é dispensada
+    """
+    from SAG import SAG
+
+    status = {"file": dir, "status": "ok", "message": "", "results": None}
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        Structure = SAG(dir, **options)                 # Entra com o arquivo para o gerenciador de análises
+
+        # Verificando se a estrutura é hipostática
+        stability = Structure.Structure.checkStability()
+        if stability["stable"]:
+            Structure.solveStructure()                  # Resolve a estrutura
+            status["results"] = Structure.outputResults(plot={"show": False} if plot else False)   # Gera o arquivo de saída
+            if Structure.cache is not None:
+                status["cacheHit"] = Structure.cached is not None
+        else:
+            status["status"] = "unstable"
+            status["message"] = (f"Estrutura hipostática: {stability['nMechanisms']} mecanismo(s) "
+                                 f"nos nós {stability['mechanismNodes']}")
+            status["stability"] = stability
+    except Exception as e:
+        status["status"] = "error"
+        status["message"] = f"{type(e).__name__}: {e}"
+    finally:
+        status["wallTime [s]"] = time.perf_counter() - start
+        status["peakMemory [MB]"] = tracemalloc.get_traced_memory()[1]/2**20
+        tracemalloc.stop()
+    return status
+
+
+def runBatch(files: list[str], workers: int = None, options: dict = None, plot: bool = False) -> list[dict]:
+    """
+    Distribui as análises em um pool de processos e retorna o estado de cada modelo (na ordem dos arquivos)
+    """
+    options = options or {}
+    summary = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyseModel, dir, options, plot): dir for dir in files}
+        for future in as_completed(futures):
+            dir = futures[future]
+            try:
+                summary[dir] = future.result()
+            except Exception as e:
+                # Falha do próprio processo (p.ex. falta de memória)
+                summary[dir] = {"file": dir, "status": "error", "message": f"{type(e).__name__}: {e}",
+                                "results": None, "wallTime [s]": float("nan"), "peakMemory [MB]": float("nan")}
+    return [summary[dir] for dir in files]
+
+
+def printSummary(summary: list[dict]):
+    """
+    Apresenta a tabela resumo do lote
+    """
+    width = max([len("Arquivo")] + [len(item["file"]) for item in summary])
+    print(f"\n{'Arquivo':<{width}}  {'Estado':<8}  {'Tempo [s]':>10}  {'Memória [MB]':>12}  Mensagem")
+    for item in summary:
+        print(f"{item['file']:<{width}}  {item['status']:<8}  {item['wallTime [s]']:>10.3f}  "
+              f"{item['peakMemory [MB]']:>12.2f}  {item['message']}")
+
+    nOk = sum(item["status"] == "ok" for item in summary)
+    print(f"\n{nOk} de {len(summary)} modelos analisados com sucesso.")
+    if any("cacheHit" in item for item in summary):
+        nHits = sum(item.get("cacheHit", False) for item in summary)
+        print(f"Cache: {nHits} acertos e {sum('cacheHit' in item for item in summary) - nHits} faltas.")
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Análise em lote de arquivos de estrutura")
+    parser.add_argument("target", help="diretório ou padrão glob dos arquivos de estrutura")
+    parser.add_argument("--pattern", default="*.json", help="padrão dos arquivos quando o alvo é um diretório (p.ex. \"*.ftl\")")
+    parser.add_argument("--recursive", action="store_true", help="procura os arquivos nos subdiretórios")
+    parser.add_argument("--workers", type=int, default=None, help="número de processos (padrão: nº de núcleos)")
+    parser.add_argument("--storage", choices=["dense", "sparse"], default=None, help="armazenamento da matriz de rigidez")
+    parser.add_argument("--solver", default=None, help="resolvedor do sistema linear")
+    parser.add_argument("--bc-method", choices=["penalty", "partition"], default=None,
+                        help="método de aplicação das condições de contorno")
+    parser.add_argument("--renumbering", choices=["none", "rcm"], default=None, help="renumeração dos nós antes da montagem")
+    parser.add_argument("--profile", choices=["legacy", "full", "summary"], default=None,
+                        help="perfil do arquivo de resultados")
+    parser.add_argument("--cache", default=None, help="diretório do cache de resultados")
+    parser.add_argument("--cache-size", type=float, default=1024, help="tamanho máximo do cache [MB]")
+    parser.add_argument("--cache-factorizations", action="store_true", help="armazena também as fatorações no cache")
+    parser.add_argument("--plot", action="store_true", help="grava a figura de cada estrutura (sem abrir janelas)")
+    parser.add_argument("--summary", default=None, help="arquivo JSON para gravar o resumo do lote")
+    args = parser.parse_args(argv)
+
+    files = findModels(args.target, args.pattern, args.recursive)
+    if not files:
+        print(f"Nenhum arquivo encontrado em '{args.target}'.")
+        return 1
+
+    options = {"storage": args.storage, "solver": args.solver, "bcMethod": args.bc_method,
+               "outputProfile": args.profile, "renumbering": args.renumbering}
+    if args.cache is not None:
+        options["cache"] = ResultCache(args.cache, args.cache_size, args.cache_factorizations)
+    start = time.perf_counter()
+    summary = runBatch(files, args.workers, options, args.plot)
+    printSummary(summary)
+    print(f"Tempo total: {time.perf_counter() - start:.3f} s")
+
+    if args.summary is not None:
+        with open(args.summary, 'w') as outfile:
+            json.dump(summary, outfile, indent=4)
+
+    return 0 if all(item["status"] == "ok" for item in summary) else 2
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
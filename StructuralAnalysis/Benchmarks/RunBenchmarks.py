@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Suíte de benchmarks do SAG com treliças sintéticas.
+
+Cada caso é cronometrado por fase (leitura, construção dos elementos, montagem, aplicação das CC, solução,
+recuperação dos esforços e saída) e registrado em um arquivo de histórico (JSON Lines) para comparação entre execuções.
+O histórico padrão fica no diretório de cache do usuário (~/.cache/SAG/benchmark_history.jsonl).
+Os tamanhos padrão vão de 10^2 a 10^6 GLs; o armazenamento denso é limitado a DENSE_LIMIT GLs.
+A importação do núcleo (SAG) é medida em um processo novo e deve respeitar IMPORT_BUDGET, sem carregar os
+módulos de LAZY_MODULES (importados apenas pelas funcionalidades que os utilizam).
+
+Uso:
+    python Benchmarks/RunBenchmarks.py --models warren grid --dofs 100 1000 10000 --compare
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import DataReader
+from SAG import Truss2D, Truss3D
+from TrussGenerators import GENERATORS, generateModel
+
+STRUCTURES = {"Truss2D": Truss2D, "Truss3D": Truss3D}     # Classes de análise por tipo de estrutura
+PHASES = ["parse", "elements", "assembly", "bc", "solve", "recovery", "output"]
+# Histórico fora da árvore de código (diretório de cache do usuário)
+DEFAULT_HISTORY = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+                               "SAG", "benchmark_history.jsonl")
+DENSE_LIMIT = 3000      # Maior número de GLs analisado com armazenamento denso
+IMPORT_BUDGET = 0.25    # Tempo máximo de importação do SAG (descontado o NumPy) [s]
+LAZY_MODULES = ("scipy", "matplotlib", "plotly")     # Módulos que a importação e a análise densa não podem carregar
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))    # Diretório do SAG
+
+# Medição executada no processo novo: importação do SAG e análise densa de uma treliça pequena
+IMPORT_PROBE = """
+import json, sys, time
+import numpy
+try:
+    import resource
+    rss = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024
+except ImportError:
+    rss = lambda: float("nan")
+before = rss();     nModules = len(sys.modules)
+start = time.perf_counter()
+import SAG
+elapsed = time.perf_counter() - start
+memory = rss() - before
+loaded = [name for name in {modules} if name in sys.modules]
+from TrussGenerators import generateModel
+structure = SAG.Truss2D(generateModel("warren", 100))
+structure.verifyRestrictions()
+structure.solveStructure()
+structure.outputResults("summary")
+print(json.dumps({{"time [s]": elapsed, "memory [MB]": memory, "nModules": len(sys.modules) - nModules, "loadedOnImport": loaded,
+                  "loadedOnAnalysis": [name for name in {modules} if name in sys.modules]}}))
+"""
+
+
+def gitRevision() -> str:
+    """
+    Revisão atual do repositório (quando disponível)
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def measureImport() -> dict:
+    """
+    Mede, em um processo novo, o tempo, o acréscimo do pico de memória residente e o número de módulos da
+    importação do SAG (com o NumPy já importado) e os módulos de LAZY_MODULES carregados pela importação e por
+    uma análise densa
+    """
+    code = IMPORT_PROBE.format(modules=repr(LAZY_MODULES))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([ROOT, os.path.join(ROOT, "Benchmarks")])}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha na medição da importação: {result.stderr.strip()}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def checkImportBudget(record: dict, budget: float = IMPORT_BUDGET) -> bool:
+    """
+    Verifica o orçamento da importação: tempo abaixo do limite e nenhum módulo pesado carregado
+    """
+    ok = record["time [s]"] <= budget and not record["loadedOnImport"] and not record["loadedOnAnalysis"]
+    print(f"\nImportação do SAG: {record['time [s]']*1e3:.1f} ms (limite {budget*1e3:.0f} ms), "
+          f"{record['memory [MB]']:.1f} MB, {record['nModules']} módulos; módulos carregados na importação: {record['loadedOnImport'] or 'nenhum'}, "
+          f"na análise densa: {record['loadedOnAnalysis'] or 'nenhum'}" + ("" if ok else " (!)"))
+    return ok
+
+
+def writeOutput(Structure: Truss2D, workDir: str, profile: str):
+    """
+    Gera e grava os resultados segundo o perfil de saída
+    """
+    output = Structure.outputResults(profile)
+    if profile == "full":
+        DataReader.WriteMatrices(os.path.join(workDir, "results_matrices.npz"), Structure.outputMatrices())
+    DataReader.WriteData(os.path.join(workDir, "results.json"), output, compact=profile != "legacy")
+
+
+def runCase(kind: str, nDOF: int, options: dict, workDir: str, repeat: int = 1, profile: str = "summary",
+            format: str = "json") -> dict:
+    """
+    Gera, analisa e cronometra um caso de benchmark (menor tempo de cada fase entre as repetições)
+    format: formato do arquivo de entrada ("json" ou "binary", modelo .trz mapeado em memória)
+    """
+    # Gera o modelo e grava o arquivo de entrada (fora da medição)
+    model = generateModel(kind, nDOF)
+    if format == "binary":
+        dir = os.path.join(workDir, f"{kind}_{nDOF}" + DataReader.BINARY_EXTENSION)
+        DataReader.WriteBinaryModel(dir, model)
+    else:
+        dir = os.path.join(workDir, f"{kind}_{nDOF}.json")
+        DataReader.WriteData(dir, model)
+    del model
+
+    phases = {}
+    def timed(name, function):
+        start = time.perf_counter()
+        result = function()
+        phases[name] = min(phases.get(name, np.inf), time.perf_counter() - start)
+        return result
+
+    for _ in range(repeat):
+        data = timed("parse", lambda: DataReader.ReadModel(dir))
+        Structure: Truss2D = timed("elements", lambda: STRUCTURES[data["typeStructure"]](data, **options))
+        timed("assembly", Structure.calculateKGS_Singular)
+        timed("bc", lambda: (Structure.defineGlobalForces(), Structure.applyBoundaryConditions()))
+        timed("solve", Structure.solveSystem)
+        timed("recovery", lambda: (Structure.calcEIS(), Structure.calcReactions()))
+        timed("output", lambda: writeOutput(Structure, workDir, profile))
+
+    return {"model": kind, "nDOF": int(Structure.nGL), "nElem": int(Structure.nElem), "requestedDOF": nDOF,
+            "storage": Structure.storage, "solver": Structure.solver.name, "bcMethod": Structure.bcMethod,
+            "renumbering": Structure.renumbering, "bandwidth": Structure.renumberingReport["bandwidth"][-1],
+            "profile": profile, "format": format,
+            "phases [s]": phases, "total [s]": sum(phases.values()),
+            "maxDisplacement": float(np.abs(Structure.nodalDisp).max())}
+
+
+def caseKey(record: dict) -> tuple:
+    """
+    Chave de identificação de um caso para a comparação com o histórico
+    """
+    return (record["model"], record["requestedDOF"], record["storage"], record["solver"], record["bcMethod"],
+            record.get("profile", "legacy"), record.get("format", "json"), record.get("renumbering", "none"))
+
+
+def readHistory(dir: str) -> list[dict]:
+    """
+    Lê o histórico de execuções
+    """
+    if not os.path.exists(dir):
+        return []
+    with open(dir, 'r') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def compareWithHistory(records: list[dict], history: list[dict], threshold: float) -> bool:
+    """
+    Compara os tempos por fase com a última execução registrada do mesmo caso.
+    Retorna False quando alguma fase ficou mais lenta que o limite relativo
+    """
+    ok = True
+    last = {}
+    for record in history:
+        last[caseKey(record)] = record
+
+    for record in records:
+        previous = last.get(caseKey(record))
+        if previous is None:
+            print(f"{record['model']:>9} {record['nDOF']:>9}: sem execução anterior para comparação")
+            continue
+        ratios = []
+        for phase in PHASES:
+            old = previous["phases [s]"].get(phase);    new = record["phases [s]"][phase]
+            if old:
+                ratio = new/old
+                flag = " (!)" if ratio > threshold and new - old > 1e-3 else ""
+                ok &= flag == ""
+                ratios.append(f"{phase} {ratio:.2f}x{flag}")
+        print(f"{record['model']:>9} {record['nDOF']:>9}: " + ", ".join(ratios)
+              + f"  [anterior: {previous.get('revision')} {previous.get('date')}]")
+    return ok
+
+
+def printTable(records: list[dict]):
+    """
+    Apresenta os tempos por fase de cada caso
+    """
+    print(f"\n{'modelo':>9} {'GLs':>9} {'elems':>9} " + " ".join(f"{phase:>9}" for phase in PHASES) + f" {'total':>9}")
+    for record in records:
+        print(f"{record['model']:>9} {record['nDOF']:>9} {record['nElem']:>9} "
+              + " ".join(f"{record['phases [s]'][phase]:>9.4f}" for phase in PHASES) + f" {record['total [s]']:>9.4f}")
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do SAG com treliças sintéticas")
+    parser.add_argument("--models", nargs="+", default=list(GENERATORS), choices=list(GENERATORS),
+                        help="geradores de treliça")
+    parser.add_argument("--dofs", nargs="+", type=int, default=[100, 1000, 10000, 100000, 1000000],
+                        help="números aproximados de GLs (até 10^6)")
+    parser.add_argument("--storage", choices=["dense", "sparse"], default="sparse")
+    parser.add_argument("--solver", default=None)
+    parser.add_argument("--bc-method", choices=["penalty", "partition"], default="partition")
+    parser.add_argument("--renumbering", choices=["none", "rcm"], default="none", help="renumeração dos nós")
+    parser.add_argument("--profile", choices=["legacy", "full", "summary"], default="summary",
+                        help="perfil do arquivo de resultados")
+    parser.add_argument("--format", choices=["json", "binary"], default="json",
+                        help="formato do arquivo de entrada (JSON ou modelo binário .trz)")
+    parser.add_argument("--repeat", type=int, default=1, help="repetições de cada caso (registra o menor tempo)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="arquivo de histórico (JSON Lines)")
+    parser.add_argument("--no-save", action="store_true", help="não grava os resultados no histórico")
+    parser.add_argument("--compare", action="store_true", help="compara com a última execução de cada caso")
+    parser.add_argument("--threshold", type=float, default=1.25, help="limite relativo para acusar regressão")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET,
+                        help="tempo máximo de importação do SAG [s]")
+    args = parser.parse_args(argv)
+
+    options = {"storage": args.storage, "solver": args.solver, "bcMethod": args.bc_method, "renumbering": args.renumbering}
+    stamp = {"date": datetime.datetime.now().isoformat(timespec="seconds"), "revision": gitRevision(),
+             "python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+             "processor": platform.processor()}
+    importRecord = measureImport()
+    stamp["import"] = importRecord
+
+    records = []
+    with tempfile.TemporaryDirectory() as workDir:
+        for kind in args.models:
+            for nDOF in args.dofs:
+                if args.storage == "dense" and nDOF > DENSE_LIMIT:
+                    print(f"{kind} {nDOF}: ignorado (armazenamento denso acima de {DENSE_LIMIT} GLs)")
+                    continue
+                records.append({**stamp, **runCase(kind, nDOF, options, workDir, args.repeat, args.profile, args.format)})
+
+    printTable(records)
+
+    ok = checkImportBudget(importRecord, args.import_budget)
+    if args.compare:
+        print("\nComparação com o histórico:")
+        ok &= compareWithHistory(records, readHistory(args.history), args.threshold)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'a') as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Geradores paramétricos de treliças planas e espaciais no formato de entrada do SAG (dicionário equivalente ao JSON)
+"""
+import numpy as np
+
+
+def buildModel(coords: np.ndarray, connectivity: np.ndarray, restrictions: list[dict], loads: list[dict],
+               E: float = 205e6, A: float = 1e-2) -> dict:
+    """
+    Monta o dicionário de entrada do SAG a partir das coordenadas (índices base 0) e da conectividade dos elementos.
+    O tipo de análise (Truss2D ou Truss3D) é definido pela dimensão das coordenadas
+    """
+    return {
+        "typeStructure": "Truss3D" if coords.shape[1] == 3 else "Truss2D",
+        "nodes": [{"id": i+1, "coordenadas": xy} for i, xy in enumerate(coords.tolist())],
+        "elements": [{"id": e+1, "NI": ni+1, "NF": nf+1, "material": 1, "sectionProp": 1}
+                     for e, (ni, nf) in enumerate(connectivity.tolist())],
+        "material": [{"id": 1, "modulo_elasticidade": E}],
+        "sectionProp": [{"id": 1, "area": A}],
+        "restrictions": restrictions,
+        "nodalLoads": loads,
+    }
+
+
+def simpleSupports(left: int, right: int) -> list[dict]:
+    """
+    Apoio de 2º gênero no nó esquerdo e de 1º gênero (vertical) no nó direito (índices base 0)
+    """
+    left = int(left);  right = int(right)
+    return [{"no": left+1, "restricoes": [1, 1], "types": ["fix", "fix"]},
+            {"no": right+1, "restricoes": [0, 1], "types": ["fix", "fix"]}]
+
+
+def verticalLoads(nodes, P: float = -10.0) -> list[dict]:
+    """
+    Ações nodais verticais nos nós indicados (índices base 0)
+    """
+    return [{"no": int(i)+1, "forcas": [0.0, P]} for i in nodes]
+
+
+def warrenGirder(nPanels: int, panelLength: float = 2.0, height: float = 2.0) -> dict:
+    """
+    Viga Warren: banzo inferior com nPanels+1 nós, banzo superior com nPanels nós e diagonais em zigue-zague
+    """
+    n = nPanels
+    bottom = np.arange(n+1)
+    top = n+1 + np.arange(n)
+    coords = np.vstack((np.column_stack((bottom*panelLength, np.zeros(n+1))),
+                        np.column_stack(((np.arange(n)+0.5)*panelLength, np.full(n, height)))))
+    connectivity = np.vstack((np.column_stack((bottom[:-1], bottom[1:])),          # Banzo inferior
+                              np.column_stack((top[:-1], top[1:])),                # Banzo superior
+                              np.column_stack((bottom[:-1], top)),                 # Diagonais ascendentes
+                              np.column_stack((top, bottom[1:]))))                 # Diagonais descendentes
+    return buildModel(coords, connectivity, simpleSupports(0, n), verticalLoads(bottom[1:-1]))
+
+
+def prattGirder(nPanels: int, panelLength: float = 2.0, height: float = 2.0) -> dict:
+    """
+    Viga Pratt: banzos com nPanels+1 nós, montantes em todos os nós e diagonais inclinadas para o centro do vão
+    """
+    n = nPanels
+    bottom = np.arange(n+1)
+    top = n+1 + np.arange(n+1)
+    x = np.arange(n+1)*panelLength
+    coords = np.vstack((np.column_stack((x, np.zeros(n+1))), np.column_stack((x, np.full(n+1, height)))))
+    panels = np.arange(n)
+    left = panels < n/2
+    diagonals = np.where(left[:, None], np.column_stack((top[:-1], bottom[1:])), np.column_stack((bottom[:-1], top[1:])))
+    connectivity = np.vstack((np.column_stack((bottom[:-1], bottom[1:])),          # Banzo inferior
+                              np.column_stack((top[:-1], top[1:])),                # Banzo superior
+                              np.column_stack((bottom, top)),                      # Montantes
+                              diagonals))                                          # Diagonais
+    return buildModel(coords, connectivity, simpleSupports(0, n), verticalLoads(bottom[1:-1]))
+
+
+def gridTruss(nx: int, ny: int, dx: float = 1.0, dy: float = 1.0) -> dict:
+    """
+    Malha plana com nx x ny nós, barras horizontais e verticais e contraventamento em X em todas as células
+    """
+    idx = np.arange(nx*ny).reshape(ny, nx)
+    X, Y = np.meshgrid(np.arange(nx)*dx, np.arange(ny)*dy)
+    coords = np.column_stack((X.ravel(), Y.ravel()))
+    connectivity = np.vstack((np.column_stack((idx[:, :-1].ravel(), idx[:, 1:].ravel())),       # Horizontais
+                              np.column_stack((idx[:-1, :].ravel(), idx[1:, :].ravel())),       # Verticais
+                              np.column_stack((idx[:-1, :-1].ravel(), idx[1:, 1:].ravel())),    # Diagonais (/)
+                              np.column_stack((idx[:-1, 1:].ravel(), idx[1:, :-1].ravel()))))   # Diagonais (\)
+    return buildModel(coords, connectivity, simpleSupports(idx[0, 0], idx[0, -1]), verticalLoads(idx[-1, :]))
+
+
+def delaunayTruss(nNodes: int, width: float = 100.0, height: float = 20.0, seed: int = 0) -> dict:
+    """
+    Treliça aleatória gerada pela triangulação de Delaunay de nNodes pontos em um retângulo
+    """
+    from scipy.spatial import Delaunay
+
+    rng = np.random.default_rng(seed)
+    coords = rng.random((nNodes, 2))*[width, height]
+
+    # Arestas únicas dos triângulos
+    simplices = Delaunay(coords).simplices
+    edges = np.vstack((simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [2, 0]]))
+    connectivity = np.unique(np.sort(edges, axis=1), axis=0)
+
+    left = int(np.argmin(coords[:, 0]));    right = int(np.argmax(coords[:, 0]))
+    loaded = np.flatnonzero(coords[:, 1] > 0.9*height)
+    return buildModel(coords, connectivity, simpleSupports(left, right), verticalLoads(loaded))
+
+
+def spaceGridTruss(nx: int, ny: int, dx: float = 2.0, dy: float = 2.0, height: float = 1.5) -> dict:
+    """
+    Cobertura em grelha espacial de duas camadas (quadrado sobre quadrado deslocado): banzo superior com nx x ny nós,
+    banzo inferior com (nx-1) x (ny-1) nós no centro das células e diagonais de cada nó inferior aos quatro nós
+    superiores da sua célula. Apoios fixos nos quatro cantos do banzo superior e ações verticais nos nós superiores
+    """
+    top = np.arange(nx*ny).reshape(ny, nx)
+    bottom = nx*ny + np.arange((nx-1)*(ny-1)).reshape(ny-1, nx-1)
+    X, Y = np.meshgrid(np.arange(nx)*dx, np.arange(ny)*dy)
+    Xb, Yb = np.meshgrid((np.arange(nx-1)+0.5)*dx, (np.arange(ny-1)+0.5)*dy)
+    coords = np.vstack((np.column_stack((X.ravel(), Y.ravel(), np.full(nx*ny, height))),
+                        np.column_stack((Xb.ravel(), Yb.ravel(), np.zeros((nx-1)*(ny-1))))))
+    b = bottom.ravel()
+    connectivity = np.vstack((np.column_stack((top[:, :-1].ravel(), top[:, 1:].ravel())),            # Banzo superior (x)
+                              np.column_stack((top[:-1, :].ravel(), top[1:, :].ravel())),            # Banzo superior (y)
+                              np.column_stack((bottom[:, :-1].ravel(), bottom[:, 1:].ravel())),      # Banzo inferior (x)
+                              np.column_stack((bottom[:-1, :].ravel(), bottom[1:, :].ravel())),      # Banzo inferior (y)
+                              np.column_stack((b, top[:-1, :-1].ravel())),                           # Diagonais
+                              np.column_stack((b, top[:-1, 1:].ravel())),
+                              np.column_stack((b, top[1:, :-1].ravel())),
+                              np.column_stack((b, top[1:, 1:].ravel()))))
+    corners = [top[0, 0], top[0, -1], top[-1, 0], top[-1, -1]]
+    restrictions = [{"no": int(i)+1, "restricoes": [1, 1, 1], "types": ["fix", "fix", "fix"]} for i in corners]
+    loads = [{"no": int(i)+1, "forcas": [0.0, 0.0, -10.0]} for i in top.ravel() if i not in corners]
+    return buildModel(coords, connectivity, restrictions, loads)
+
+
+# Geradores disponíveis e o tamanho do modelo em função do número de GLs aproximado
+GENERATORS = {
+    "warren": lambda nDOF: warrenGirder(max(2, nDOF//4)),
+    "pratt": lambda nDOF: prattGirder(max(2, nDOF//4 - 1)),
+    "grid": lambda nDOF: gridTruss(max(2, int(np.sqrt(nDOF/2))), max(2, int(np.sqrt(nDOF/2)))),
+    "delaunay": lambda nDOF: delaunayTruss(max(4, nDOF//2)),
+    "spacegrid": lambda nDOF: spaceGridTruss(max(2, int(np.sqrt(nDOF/6))), max(2, int(np.sqrt(nDOF/6)))),
+}
+
+
+def generateModel(kind: str, nDOF: int) -> dict:
+    """
+    Gera um modelo do tipo indicado com aproximadamente nDOF graus de liberdade
+    """
+    if kind not in GENERATORS:
+        raise ValueError(f"Gerador desconhecido: '{kind}'")
+    return GENERATORS[kind](nDOF)
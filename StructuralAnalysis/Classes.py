@@ -3,30 +3,167 @@ import numpy as np
 import DataReader
 import os
 
+GL_PER_NODE = {"Truss2D": 2, "Truss3D": 3}      # Número de graus de liberdade por nó de cada tipo de análise
+
+class NodeTable:
+    """
+    Tabela de nós em arrays contíguos: IDs, coordenadas, códigos dos apoios por GL (DataReader.SUPPORT_TYPES),
+    deslocamentos prescritos ou rigidezes das molas, ações nodais e reações de apoio.
+    Os IDs não precisam ser contíguos nem ordenados: a busca por ID (index) é vetorizada
+    """
+    def __init__(self, ids, coords):
+        """
+        ids: IDs dos nós (únicos)
+        coords: coordenadas dos nós (nNodes x dimensão)
+        """
+        self.ids = np.asarray(ids, dtype=np.int64).ravel()                  # IDs dos nós
+        self.coords = np.asarray(coords, dtype=float)                       # Coordenadas dos nós (nNodes x dimensão)
+        nNodes, nGLpN = self.ids.size, self.coords.shape[-1]
+        self.supportCodes = np.zeros((nNodes, nGLpN), dtype=np.int8)        # Tipo de apoio por GL (DataReader.SUPPORT_TYPES)
+        self.supportValues = np.zeros((nNodes, nGLpN))                      # Deslocamento prescrito ou rigidez da mola por GL
+        self.hasSupport = np.zeros(nNodes, dtype=bool)                      # Nós com restrições definidas
+        self.forces = np.zeros((nNodes, nGLpN))                             # Ações nodais por GL
+        self.hasLoad = np.zeros(nNodes, dtype=bool)                         # Nós com ações nodais definidas
+        self.reactions: np.ndarray = None                                   # Reações de apoio por GL (após a análise)
+
+        # Busca por ID: IDs 1 a n na ordem da tabela são indexados diretamente; os demais, por busca binária
+        self.contiguous = bool(np.array_equal(self.ids, np.arange(1, nNodes + 1)))
+        if not self.contiguous:
+            self.order = np.argsort(self.ids, kind="stable")               # Posições dos nós em ordem crescente de ID
+            self.sortedIds = self.ids[self.order]
+            repeated = self.sortedIds[1:][self.sortedIds[1:] == self.sortedIds[:-1]]
+            if repeated.size > 0:
+                raise ValueError(f"IDs de nós repetidos: {np.unique(repeated)[:10].tolist()}")
+
+    def __len__(self) -> int:
+        return self.ids.size
+
+    def __getitem__(self, i: int) -> "Node":
+        """
+        Nó na posição i da tabela (visão sobre a linha da tabela)
+        """
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return Node(None, None, self, i % len(self))
+
+    def __iter__(self):
+        return (Node(None, None, self, i) for i in range(len(self)))
+
+    def index(self, ids) -> np.ndarray:
+        """
+        Posições na tabela (base 0) dos nós com os IDs indicados (escalar ou array de qualquer forma)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if self.contiguous:
+            index = ids - 1
+            found = (index >= 0) & (index < len(self))
+        else:
+            # Tabela não vazia: uma tabela vazia é contígua
+            position = np.minimum(np.searchsorted(self.sortedIds, ids), len(self) - 1)
+            found = self.sortedIds[position] == ids
+            index = self.order[position]
+        if not np.all(found):
+            raise ValueError(f"IDs de nós inexistentes: {np.unique(ids[~found])[:10].tolist()}")
+        return index
+
+    def node(self, id: int) -> "Node":
+        """
+        Nó com o ID indicado
+        """
+        return Node(None, None, self, int(self.index(id)))
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memória ocupada pelas tabelas de nós (bytes)
+        """
+        return sum(array.nbytes for array in vars(self).values() if isinstance(array, np.ndarray))
+
 class Node:
-    def __init__(self, id, coords):
-        self.id = id
-        self.coords = np.array(coords)
-        self.flagRestrictions = False
-        self.restrictions = list()
-        self.typeRestrictions = list()
-        self.prescDisp = list()
-        self.flexibleSupports = list()
-        self.nodalLoads = None
-        self.ReactForces = None
-        self.incidElems = 0
+    """
+    Nó da estrutura: visão sobre uma linha da tabela de nós (sem cópia dos dados nem atributos por instância).
+    Sem tabela, é criada uma tabela própria com um único nó
+    """
+    __slots__ = ("table", "index")
+
+    def __init__(self, id, coords, table: NodeTable = None, index: int = 0):
+        if table is None:
+            table = NodeTable([id], np.reshape(np.asarray(coords, dtype=float), (1, -1)))
+            index = 0
+        self.table: NodeTable = table           # Tabela de nós
+        self.index = index                      # Posição do nó na tabela
+
+    @property
+    def id(self) -> int:
+        return int(self.table.ids[self.index])
+
+    @property
+    def coords(self) -> np.ndarray:
+        return self.table.coords[self.index]
+
+    @property
+    def flagRestrictions(self) -> bool:
+        return bool(self.table.hasSupport[self.index])
+
+    def supportTypes(self) -> list:
+        """
+        Tipos de apoio por GL (DataReader.SUPPORT_TYPES)
+        """
+        return [DataReader.SUPPORT_TYPES[code] for code in self.table.supportCodes[self.index].tolist()]
+
+    def supportValues(self, type: str) -> list:
+        """
+        Valores (deslocamentos prescritos ou rigidezes das molas) dos GLs com o tipo de apoio indicado
+        """
+        code = DataReader.SUPPORT_TYPES.index(type)
+        return self.table.supportValues[self.index][self.table.supportCodes[self.index] == code].tolist()
+
+    @property
+    def restrictions(self) -> list:
+        return (self.table.supportCodes[self.index] != 0).astype(int).tolist() if self.flagRestrictions else []
+
+    @property
+    def typeRestrictions(self) -> list:
+        return self.supportTypes() if self.flagRestrictions else []
+
+    @property
+    def prescDisp(self) -> list:
+        return self.supportValues("prescrible")
+
+    @property
+    def flexibleSupports(self) -> list:
+        return self.supportValues("flexible")
+
+    @property
+    def nodalLoads(self) -> list:
+        return self.table.forces[self.index].tolist() if self.table.hasLoad[self.index] else None
+
+    @property
+    def ReactForces(self) -> np.ndarray:
+        reactions = self.table.reactions
+        return reactions[self.index] if reactions is not None and self.flagRestrictions else None
 
     def defineRestrictions(self, restrict):
-        self.restrictions = restrict
-    
+        """
+        Restringe (apoio fixo) os GLs indicados por 1 e libera os indicados por 0
+        """
+        codes = self.table.supportCodes[self.index]
+        restrict = np.asarray(restrict, dtype=bool)
+        codes[~restrict] = 0
+        codes[restrict & (codes == 0)] = DataReader.SUPPORT_TYPES.index("fix")
+        self.table.supportValues[self.index][~restrict] = 0
+        self.table.hasSupport[self.index] = bool(restrict.any())
+
     def defineNodalLoads(self, nodalLoads):
-        self.nodalLoads = nodalLoads
+        self.table.hasLoad[self.index] = nodalLoads is not None
+        self.table.forces[self.index] = 0 if nodalLoads is None else nodalLoads
 
     def definePrescribedDisplacements(self, prescribleDisplaces):
-        self.prescDisp = prescribleDisplaces
-    
-    def ElemIncidence(self, Elems):
-        pass
+        """
+        Define os deslocamentos prescritos dos GLs com apoio do tipo "prescrible", na ordem dos GLs
+        """
+        prescribed = self.table.supportCodes[self.index] == DataReader.SUPPORT_TYPES.index("prescrible")
+        self.table.supportValues[self.index][prescribed] = prescribleDisplaces
 
 class Material:
     """
@@ -84,97 +221,315 @@ class Section:
         self.id = id
         self.Ax = Ax
 
+class ElementTable:
+    """
+    Tabela de elementos em estrutura de vetores: conectividade, propriedades, geometria e matrizes de
+    rigidez de todos os elementos armazenadas em arrays NumPy e calculadas em uma única passagem vetorizada
+    """
+    def __init__(self, ids, initNodes, finalNodes, E, A, coords: np.ndarray, nGLpN: int = 2):
+        """
+        ids: IDs dos elementos
+        initNodes, finalNodes: índices (base 0) dos nós inicial e final de cada elemento
+        E, A: módulo de elasticidade e área da seção de cada elemento
+        coords: coordenadas dos nós da estrutura (nNodes x dimensão)
+        nGLpN: número de graus de liberdade por nó
+        """
+        self.nGLpN = nGLpN                                              # Número de graus de liberdade por nó
+        self.ids = np.asarray(ids)                                      # IDs dos elementos
+        self.initNodes = np.asarray(initNodes, dtype=np.int64)          # Índices dos nós iniciais
+        self.finalNodes = np.asarray(finalNodes, dtype=np.int64)        # Índices dos nós finais
+        self.E = np.asarray(E, dtype=float)                             # Módulos de elasticidade
+        self.A = np.asarray(A, dtype=float)                             # Áreas das seções transversais
+        self.nElem = self.ids.size                                      # Número de elementos
+
+        self.defineGeometry(np.asarray(coords, dtype=float))            # Comprimentos e cossenos diretores
+        self.defineDOFs()                                               # Mapa de GLs globais dos elementos
+        self.defineStiffness()                                          # Matrizes Kint, rotMatrix e Klocal
+
+    def defineGeometry(self, coords: np.ndarray):
+        """
+        Define os comprimentos e os cossenos diretores de todos os elementos
+        """
+        delta = coords[self.finalNodes] - coords[self.initNodes]
+        self.L = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+        self.cossines = delta / self.L[:, None]
+
+    def defineDOFs(self, nodeRank: np.ndarray = None):
+        """
+        Define o mapa de índices dos graus de liberdade globais (nElem x 2.nGLpN)
+        nodeRank: posição de cada nó na numeração dos GLs (por padrão, a própria ordem dos nós)
+        """
+        GL = np.arange(self.nGLpN)
+        initNodes = self.initNodes if nodeRank is None else nodeRank[self.initNodes]
+        finalNodes = self.finalNodes if nodeRank is None else nodeRank[self.finalNodes]
+        self.DOFs = np.hstack((initNodes[:, None]*self.nGLpN + GL, finalNodes[:, None]*self.nGLpN + GL))
+
+    def bandwidthProfile(self) -> tuple[int, int]:
+        """
+        Semibanda e perfil (soma das distâncias de cada linha ao seu primeiro coeficiente não nulo) da matriz de
+        rigidez com o mapa de GLs atual, obtidos da conectividade dos elementos sem montar a matriz
+        """
+        if self.nElem == 0:
+            return 0, 0
+        first = self.DOFs.min(axis=1)
+        nGL = int(self.DOFs.max()) + 1
+        rowStart = np.arange(nGL)
+        np.minimum.at(rowStart, self.DOFs.ravel(), np.repeat(first, self.DOFs.shape[1]))
+        return int((self.DOFs.max(axis=1) - first).max()), int((np.arange(nGL) - rowStart).sum())
+
+    def defineStiffness(self):
+        """
+        Define as matrizes de rigidez interna, de rotação e local de todos os elementos
+        (2.nGLpN x 2.nGLpN: 4x4 na treliça plana e 6x6 na espacial)
+        """
+        n = self.nGLpN
+        k = self.E*self.A/self.L
+
+        # Matrizes de rigidez interna (apenas a rigidez axial na direção x do sistema interno)
+        self.Kint = np.zeros((self.nElem, 2*n, 2*n))
+        self.Kint[:, 0, 0] = k;     self.Kint[:, 0, n] = -k
+        self.Kint[:, n, 0] = -k;    self.Kint[:, n, n] = k
+
+        # Matrizes de rotação do sistema interno ao local (a base do elemento repetida nos dois nós)
+        base = self.defineBase()
+        self.rotMatrix = np.zeros((self.nElem, 2*n, 2*n))
+        self.rotMatrix[:, :n, :n] = base
+        self.rotMatrix[:, n:, n:] = base
+
+        # Matrizes de rigidez local (R^T.Kint.R = EA/L.b.b^T, com b = [-cossenos, cossenos])
+        b = np.hstack((-self.cossines, self.cossines))
+        self.Klocal = k[:, None, None]*b[:, :, None]*b[:, None, :]
+
+    def defineBase(self) -> np.ndarray:
+        """
+        Bases ortonormais (nElem x nGLpN x nGLpN) do sistema interno dos elementos, com o eixo x na direção do
+        elemento. Na treliça espacial, o eixo y é perpendicular ao eixo Z global (ou ao eixo X, nos elementos
+        verticais); como os elementos só têm rigidez axial, a escolha dos eixos transversais não altera a Klocal
+        """
+        e1 = self.cossines
+        if self.nGLpN == 2:
+            return np.stack((e1, np.column_stack((-e1[:, 1], e1[:, 0]))), axis=1)
+
+        # Vetor auxiliar: eixo Z global, ou eixo X nos elementos (quase) verticais
+        aux = np.zeros_like(e1)
+        vertical = np.abs(e1[:, 2]) > 0.9
+        aux[~vertical, 2] = 1;      aux[vertical, 0] = 1
+        e2 = np.cross(aux, e1)
+        e2 /= np.linalg.norm(e2, axis=1)[:, None]
+        e3 = np.cross(e1, e2)
+        return np.stack((e1, e2, e3), axis=1)
+
+    def calcNormalForces(self, NodalDisp: np.ndarray) -> np.ndarray:
+        """
+        Calcula os esforços normais de todos os elementos, N = EA/L.(cossenos . (u_f - u_i)), a partir dos deslocamentos
+        nodais (vetor nGL ou matriz nGL x nº de casos), e os armazena na tabela
+        """
+        self.N = self.normalForces(NodalDisp)
+        return self.N
+
+    def normalForces(self, NodalDisp: np.ndarray) -> np.ndarray:
+        """
+        Esforços normais de todos os elementos para um vetor de deslocamentos nodais ou uma matriz de vetores
+        (nGL x nº de vetores), sem alterar os esforços armazenados na tabela
+        """
+        # Deslocamentos das extremidades obtidos pelo mapa de GLs
+        endDisp = NodalDisp[self.DOFs]
+        delta = endDisp[:, self.nGLpN:] - endDisp[:, :self.nGLpN]
+
+        # Alongamento axial projetado nos cossenos diretores
+        elongation = np.einsum('ed,ed...->e...', self.cossines, delta)
+        k = self.E*self.A/self.L
+        return k.reshape(-1, *([1]*(elongation.ndim-1)))*elongation
+
+    def calcCorotational(self, NodalDisp: np.ndarray, tangent: bool = True):
+        """
+        Formulação corrotacional (grandes deslocamentos) de todos os elementos a partir do vetor de deslocamentos
+        nodais: esforços normais N = EA/L.(l - L), forças de extremidade nas coordenadas globais N.[-e, e] e,
+        opcionalmente, as matrizes de rigidez tangente EA/L.b.b^T + N/l.[[G, -G], [-G, G]], com b = [-e, e] e
+        G = I - e.e^T (e: cossenos diretores da configuração deformada, l: comprimento deformado)
+        """
+        n = self.nGLpN
+
+        # Configuração deformada dos elementos
+        endDisp = NodalDisp[self.DOFs]
+        delta = self.L[:, None]*self.cossines + endDisp[:, n:] - endDisp[:, :n]
+        l = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+        e = delta / l[:, None]
+
+        # Esforços normais e forças de extremidade
+        k = self.E*self.A/self.L
+        N = k*(l - self.L)
+        b = np.hstack((-e, e))
+        endForces = N[:, None]*b
+        if not tangent:
+            return N, endForces, None
+
+        # Rigidez tangente: parcela material e parcela geométrica
+        G = np.eye(n) - e[:, :, None]*e[:, None, :]
+        Kt = k[:, None, None]*b[:, :, None]*b[:, None, :]
+        Kg = (N/l)[:, None, None]*G
+        Kt[:, :n, :n] += Kg;    Kt[:, n:, n:] += Kg
+        Kt[:, :n, n:] -= Kg;    Kt[:, n:, :n] -= Kg
+        return N, endForces, Kt
+
+    def calcGlobalForces(self, N: np.ndarray, nGL: int) -> np.ndarray:
+        """
+        Calcula o vetor de forças nodais globais somando as forças de extremidade de todos os elementos
+        (-N.cossenos no nó inicial e N.cossenos no nó final)
+        """
+        # Forças de extremidade dos elementos nas coordenadas globais
+        endForces = np.einsum('ed,e...->ed...', self.cossines, N)
+        endForces = np.concatenate((-endForces, endForces), axis=1)
+
+        # Espalha as forças nos GLs globais
+        DOFs = self.DOFs.ravel()
+        if N.ndim == 1:
+            return np.bincount(DOFs, weights=endForces.ravel(), minlength=nGL)
+        endForces = endForces.reshape(DOFs.size, -1)
+        return np.column_stack([np.bincount(DOFs, weights=endForces[:, c], minlength=nGL) for c in range(endForces.shape[1])])
+
 class Elem:
-    def __init__(self, id, initNode: Node, finalNode: Node, mat: Material, sec: Section, TypeAn: str):
+    def __init__(self, id, initNode: Node, finalNode: Node, mat: Material, sec: Section, TypeAn: str,
+                 table: ElementTable = None, index: int = 0):
         """
-        Define as propriedades de um elemento
+        Define as propriedades de um elemento.
+        O elemento é uma visão sobre uma linha da tabela de elementos; sem tabela, é criada uma tabela própria
         """
-        self.nGLpN = 2                          # Número de graus de liberdade por nó
+        self.nGLpN = GL_PER_NODE[TypeAn]        # Número de graus de liberdade por nó
         self.id = id                            # Define a ID do elemento
         self.initNode: Node = initNode          # Define o nó inicial
         self.finalNode: Node = finalNode        # Define o nó final
         self.material: Material = mat           # Define o material
         self.section: Section = sec             # Define as propriedades da seção transversal
-        self.L = self.defineLength()            # Define o comprimento da barra e os cossenos diretores
-
         self.TypeAn = TypeAn                    # Define o tipo de análise na qual o elemento será utilizado
-        if TypeAn == "Truss2D":
-            self.Cossines2D()                   # Define os cossenos diretores em 2D
-        elif TypeAn == "Truss3D":
-            self.Cossines3D()                   # Define os cossenos diretores em 3D
 
-        self.defineKint()                       # Define a matriz de rigidez interna do elemento
-        self.defineRotMatrix()                  # Define a matriz de rotação do sistema interno ao local
-        self.defineKlocal()                     # Define a matriz de rigidez local do elemento
-            
+        # Define a tabela de elementos e a posição do elemento na tabela
+        if table is None:
+            table = ElementTable([id], [0], [1], [mat.E], [sec.Ax], np.array([initNode.coords, finalNode.coords]), self.nGLpN)
+            table.initNodes[:] = initNode.id-1;     table.finalNodes[:] = finalNode.id-1
+            table.defineDOFs()                  # Mapa de GLs a partir das IDs dos nós
+            index = 0
+        self.table: ElementTable = table        # Tabela de elementos
+        self.index = index                      # Posição do elemento na tabela
+        self.KinIncMatrix = None                # Matriz de incidência cinemática (apenas na montagem densa)
+        self._internalForces = None             # Esforços calculados pelo próprio elemento (calcInternalForces)
+        self._internalForcesRef = None
+        self._localForces = None
 
-    def defineLength(self):
+    @property
+    def L(self):
         """
-        define o comprimento do elemento
+        Comprimento do elemento
         """
-        return np.linalg.norm(self.finalNode.coords-self.initNode.coords)
-    
-    def Cossines2D(self):
+        return self.table.L[self.index]
+
+    @property
+    def cossineX(self):
         """
-        define os cossenos diretores em 2D
+        Cosseno diretor em relação ao eixo X
         """
-        self.cossineX = (self.finalNode.coords[0]-self.initNode.coords[0])/self.L
-        self.cossineY = (self.finalNode.coords[1]-self.initNode.coords[1])/self.L
-        
-    def Cossines3D(self):
+        return self.table.cossines[self.index, 0]
+
+    @property
+    def cossineY(self):
         """
-        define os cossenos diretores em 3D
+        Cosseno diretor em relação ao eixo Y
         """
-        self.cossineX = (self.finalNode.coords[0]-self.initNode.coords[0])/self.L
-        self.cossineY = (self.finalNode.coords[1]-self.initNode.coords[1])/self.L
-        self.cossineY = (self.finalNode.coords[2]-self.initNode.coords[2])/self.L
+        return self.table.cossines[self.index, 1]
 
-    def defineKint(self):
+    @property
+    def cossineZ(self):
         """
-        Define a matriz de rigidez interna do elemento
+        Cosseno diretor em relação ao eixo Z (apenas na treliça espacial)
         """
-        # Cria a matriz vazia
-        self.Kint = np.zeros([4,4])                  
+        return self.table.cossines[self.index, 2]
 
-        # Coeficiente de rigidez     
-        k = (self.material.E*self.section.Ax) / self.L 
+    @property
+    def Kint(self):
+        """
+        Matriz de rigidez interna do elemento
+        """
+        return self.table.Kint[self.index]
 
-        # Atualiza os coeficientes  
-        self.Kint[0,0] = k;     self.Kint[0,2] = -k              
-        self.Kint[2,0] = -k;    self.Kint[2,2] = k
+    @property
+    def rotMatrix(self):
+        """
+        Matriz de rotação do sistema interno ao local
+        """
+        return self.table.rotMatrix[self.index]
 
+    @property
+    def Klocal(self):
+        """
+        Matriz de rigidez local do elemento
+        """
+        return self.table.Klocal[self.index]
 
-    def defineRotMatrix(self):
+    @property
+    def DOFs(self):
         """
-        Define a matriz de rotação do sistema interno ao local
+        Mapa de índices dos graus de liberdade globais do elemento
         """
-        # Cria a matriz vazia
-        self.rotMatrix: np.array = np.zeros([4,4])
+        return self.table.DOFs[self.index]
 
-        # Atualiza os coeficientes
-        self.rotMatrix[0,0] = self.cossineX;    self.rotMatrix[0,1] = self.cossineY
-        self.rotMatrix[1,0] = -self.cossineY;   self.rotMatrix[1,1] = self.cossineX
-        self.rotMatrix[2,2] = self.cossineX;    self.rotMatrix[2,3] = self.cossineY
-        self.rotMatrix[3,2] = -self.cossineY;   self.rotMatrix[3,3] = self.cossineX
-        
-    def defineKlocal(self):
+    @property
+    def internalForces(self):
         """
-        Define a matriz de rigidez local do elemento
+        Esforços internos nodais do elemento (do próprio elemento ou do esforço normal da tabela)
+        """
+        if self._internalForces is not None:
+            return self._internalForces
+        forces = np.zeros(2*self.nGLpN)
+        forces[0] = -self.table.N[self.index];    forces[self.nGLpN] = self.table.N[self.index]
+        return forces
+
+    @internalForces.setter
+    def internalForces(self, value):
+        self._internalForces = value
+
+    @property
+    def internalForcesRef(self):
+        """
+        Esforços internos nodais do elemento segundo a convenção de EIS
+        """
+        if self._internalForcesRef is not None:
+            return self._internalForcesRef
+        forces = np.zeros(2*self.nGLpN)
+        forces[0] = self.table.N[self.index];     forces[self.nGLpN] = self.table.N[self.index]
+        return forces
+
+    @internalForcesRef.setter
+    def internalForcesRef(self, value):
+        self._internalForcesRef = value
+
+    @property
+    def localForces(self):
+        """
+        Forças de extremidade do elemento nas coordenadas globais
+        """
+        if self._localForces is not None:
+            return self._localForces
+        return self.rotMatrix.T @ self.internalForces
+
+    @localForces.setter
+    def localForces(self, value):
+        self._localForces = value
+
+    def defineLength(self):
+        """
+        define o comprimento do elemento
         """
-        self.Klocal = self.rotMatrix.T @ self.Kint @ self.rotMatrix
+        return self.L
 
     def defineKinematicIncidenteMatrix(self,nGLE: int):
         """
         Define a matriz de incidência cinemática da estrutura
         """
         # Cria a matriz vazia 
-        self.KinIncMatrix = np.zeros([4,nGLE])
+        self.KinIncMatrix = np.zeros([2*self.nGLpN,nGLE])
         
-        # define a incidência cinemática
-        for i in range(self.nGLpN):
-            self.KinIncMatrix[i,(self.initNode.id-1)*2 + i] = 1
-        for i in range(self.nGLpN):
-            self.KinIncMatrix[self.nGLpN+i,(self.finalNode.id-1)*2 + i] = 1
+        # define a incidência cinemática a partir do mapa de GLs
+        self.KinIncMatrix[np.arange(2*self.nGLpN), self.DOFs] = 1
 
 
 
@@ -197,15 +552,14 @@ class Elem:
         Calcula o esforço interno solicitante do elemento estrutural
         """
 
-        # Calcula os esforços internos nodais do elemento 
-        self.internalForces: np.ndarray = self.Kint @ self.rotMatrix @ self.KinIncMatrix @ NodalDisp
+        # Calcula os esforços internos nodais do elemento (os deslocamentos do elemento são obtidos pelo mapa de GLs)
+        self.internalForces: np.ndarray = self.Kint @ self.rotMatrix @ NodalDisp[self.DOFs]
         
         # Cria o vetor de EIS de acordo com a convenção
         self.internalForcesRef = self.internalForces.copy()
         
-        # Aplica a convenção de EIS
+        # Aplica a convenção de EIS (esforço normal positivo nas duas extremidades na tração)
         self.internalForcesRef[0] = -self.internalForces[0]
-        self.internalForcesRef[3] = -self.internalForces[3]
     
     def calcLocalnGlobalForces(self):
         """
@@ -214,6 +568,7 @@ class Elem:
         # Calcula as forças locais do elemento
         self.localForces: np.ndarray =  self.rotMatrix.T @ self.internalForces
         
-        # Calcula as forças globais do elemento
-        self.globalForces: np.ndarray =  self.KinIncMatrix.T @ self.localForces
+        # Calcula as forças globais do elemento (somente quando a matriz de incidência foi montada)
+        if self.KinIncMatrix is not None:
+            self.globalForces: np.ndarray =  self.KinIncMatrix.T @ self.localForces
 
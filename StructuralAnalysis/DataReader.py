@@ -1,6 +1,10 @@
+import argparse
 import json
 import os
+import struct
 import time
+import zipfile
+import numpy as np
 
 def ReadData(dir: str):
     """
@@ -28,9 +32,472 @@ def ReadData(dir: str):
         print(f"Erro: {e}")
         return None
 
-def WriteData(dirOut: str, output: dict):
+def WriteData(dirOut: str, output: dict, compact: bool = False):
     """
-    Cria o arquivo de saída de dados
+    Cria o arquivo de saída de dados.
+
+    :param compact: grava o JSON sem indentação nem espaços, serializado de uma só vez (codificador em C)
     """
     with open(dirOut, 'w') as outfile:
-        json.dump(output, outfile, indent=4)
+        if compact:
+            outfile.write(json.dumps(output, separators=(',', ':')))
+        else:
+            json.dump(output, outfile, indent=4)
+
+def AppendData(dirOut: str, key: str, value, compact: bool = False):
+    """
+    Acrescenta uma chave ao objeto JSON de um arquivo de saída já gravado por WriteData, sem regravar o arquivo
+    (o fechamento do objeto é substituído pela nova chave)
+    """
+    with open(dirOut, 'rb+') as outfile:
+        outfile.seek(0, os.SEEK_END)
+        position = outfile.tell()
+        while position > 0:
+            position -= 1
+            outfile.seek(position)
+            if outfile.read(1) == b'}':
+                break
+        while position > 0:
+            outfile.seek(position - 1)
+            if not outfile.read(1).isspace():
+                break
+            position -= 1
+        outfile.seek(position)
+        outfile.truncate()
+        if compact:
+            text = ',' + json.dumps(key) + ':' + json.dumps(value, separators=(',', ':')) + '}'
+        else:
+            text = ',\n    ' + json.dumps(key) + ': ' + json.dumps(value, indent=4).replace('\n', '\n    ') + '\n}'
+        outfile.write(text.encode())
+
+def WriteMatrices(dirOut: str, matrices: dict):
+    """
+    Grava matrizes (densas ou esparsas) em um arquivo .npz no formato de triplets: para cada matriz M
+    são gravados M_row, M_col, M_data e M_shape com os coeficientes não nulos
+    """
+    import scipy.sparse as sp
+    arrays = {}
+    for name, matrix in matrices.items():
+        coo = sp.coo_matrix(matrix)
+        arrays[name + "_row"] = coo.row;    arrays[name + "_col"] = coo.col
+        arrays[name + "_data"] = coo.data;  arrays[name + "_shape"] = np.array(coo.shape)
+    np.savez_compressed(dirOut, **arrays)
+
+def ReadMatrices(dir: str) -> dict:
+    """
+    Lê as matrizes gravadas por WriteMatrices como matrizes esparsas CSR
+    """
+    import scipy.sparse as sp
+    with np.load(dir) as file:
+        names = [key[:-len("_shape")] for key in file.files if key.endswith("_shape")]
+        return {name: sp.csr_matrix((file[name + "_data"], (file[name + "_row"], file[name + "_col"])),
+                                    shape=tuple(file[name + "_shape"])) for name in names}
+
+def ReadModel(dir: str):
+    """
+    Lê um arquivo de estrutura de acordo com a sua extensão (.json, .ftl do Ftool ou modelo binário .trz)
+
+    :param dir: Caminho para o arquivo.
+    :return: Dicionário de entrada da análise ou None em caso de erro.
+    """
+    extension = os.path.splitext(dir)[1].lower()
+    if extension in (".ftl", BINARY_EXTENSION):
+        try:
+            return ReadFtool(ResolvePath(dir)) if extension == ".ftl" else ReadBinaryModel(ResolvePath(dir))
+        except FileNotFoundError:
+            print(f"Erro: o arquivo '{dir}' não foi encontrado.")
+            return None
+    return ReadData(dir)
+
+def ResolvePath(dir: str) -> str:
+    """
+    Retorna o caminho do arquivo, procurando também a partir do diretório do módulo
+    """
+    if os.path.exists(dir):
+        return dir
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), dir)
+
+def ReadFtool(dir: str) -> dict:
+    """
+    Lê um modelo do Ftool (.ftl, versão 4.00) em uma única passagem pelas linhas do arquivo e monta diretamente
+    o dicionário de entrada da análise (nós, elementos, materiais, seções, apoios e casos de carregamento).
+
+    O arquivo do Ftool registra a topologia como uma sequência de operadores de Euler: o primeiro cria o
+    primeiro nó; os do tipo 2 criam uma barra e um novo nó; os do tipo 4 criam uma barra entre nós existentes
+    (fechando uma face); o tipo -1 encerra o modelo. As extremidades das barras são obtidas das coordenadas
+    do novo nó e do retângulo envolvente da barra.
+
+    :param dir: Caminho para o arquivo .ftl.
+    :return: Dicionário no mesmo formato do arquivo JSON de entrada.
+    """
+    with open(dir, 'r', encoding='latin-1') as file:
+        lines = (line.strip() for line in file)
+        lines = (line for line in lines if line)
+        nextValues = lambda: next(lines).split()
+        nextFloats = lambda: [float(v) for v in nextValues()]
+
+        # Cabeçalho (versão do arquivo)
+        version = nextValues()
+        if version[0] != "400":
+            raise ValueError(f"Versão do arquivo do Ftool não suportada: '{version[0]}'")
+        next(lines);    next(lines)
+
+        # Primeiro operador: cria o primeiro nó e a face externa
+        op = nextValues()
+        if op[0] != "0":
+            raise ValueError("Arquivo do Ftool sem o operador inicial do modelo")
+        vertexCoords = [nextFloats()]           # Coordenadas dos nós na ordem de criação
+        vertexIndex = {_FtoolVertexKey(vertexCoords[0]): 0}    # Índice dos nós pelas coordenadas arredondadas
+        next(lines)                             # Retângulo envolvente do modelo
+        for _ in range(10):                     # Configurações de visualização
+            next(lines)
+
+        # Casos de carregamento e suas ações nodais
+        loadCases = []
+        for _ in range(int(next(lines))):
+            name = _ReadFtoolName(next(lines))[0]
+            next(lines)
+            nodalLoads = []
+            for _ in range(int(next(lines))):
+                nodalLoads.append(_ReadFtoolName(next(lines))[1][:2])
+            for _ in range(4):                  # Demais tipos de carregamento
+                if int(next(lines)) != 0:
+                    raise ValueError(f"O caso '{name}' possui carregamentos não nodais, não suportados em treliças")
+            loadCases.append({"name": name, "loads": nodalLoads, "nodalLoads": []})
+
+        # Materiais (módulo de elasticidade é a primeira propriedade)
+        materials = []
+        for i in range(int(next(lines))):
+            next(lines)
+            materials.append({"id": i+1, "modulo_elasticidade": nextFloats()[0]})
+
+        # Seções transversais
+        sections = []
+        for i in range(int(next(lines))):
+            type = int(_ReadFtoolName(next(lines))[1][0])
+            dims = nextFloats()
+            if type == 1:                       # Seção retangular (base x altura)
+                area = dims[0]*dims[1]
+            elif type == 0:                     # Seção genérica (área informada)
+                area = dims[0]
+            else:
+                raise ValueError(f"Tipo de seção do Ftool não suportado: {type}")
+            sections.append({"id": i+1, "area": area})
+
+        # Anotações do desenho
+        next(lines)
+        for _ in range(int(next(lines))):
+            next(lines)
+
+        # Atributos do primeiro nó
+        nodes = [];     restrictions = [];      elements = []
+        _ReadFtoolVertex(lines, vertexCoords[0], len(loadCases), nodes, restrictions, loadCases)
+
+        # Operadores de Euler
+        while True:
+            next(lines)                         # Indicador de continuação
+            op = int(nextValues()[0])
+            if op == -1:
+                break
+            elif op == 2:
+                # Cria uma barra a partir de um nó existente e um novo nó
+                newCoords = nextFloats()
+                bbox = _ReadFtoolEdgeGeometry(lines, nextFloats)
+                other = [bbox[0] + bbox[1] - newCoords[0], bbox[2] + bbox[3] - newCoords[1]]
+                ends = (_FindFtoolVertex(vertexIndex, other), len(vertexCoords))
+                vertexIndex.setdefault(_FtoolVertexKey(newCoords), len(vertexCoords))
+                vertexCoords.append(newCoords)
+            elif op == 4:
+                # Cria uma barra entre dois nós existentes
+                next(lines)                     # Retângulo envolvente da nova face
+                bbox = _ReadFtoolEdgeGeometry(lines, nextFloats)
+                ends = _FindFtoolEdgeEnds(vertexIndex, bbox)
+            else:
+                raise ValueError(f"Operador do Ftool não suportado: {op}")
+
+            # Atributos da barra (ID, material, seção, ...)
+            attrs = [int(v) for v in nextValues()]
+            for _ in range(6):
+                next(lines)
+            elements.append((attrs[0], ends, attrs[1], attrs[2]))
+
+            # Atributos do novo nó
+            if op == 2:
+                _ReadFtoolVertex(lines, vertexCoords[-1], len(loadCases), nodes, restrictions, loadCases)
+
+    # IDs dos nós na ordem de criação e elementos ordenados pela ID
+    vertexIds = [node["id"] for node in nodes]
+    data = {
+        "typeStructure": "Truss2D",
+        "nodes": sorted(nodes, key=lambda node: node["id"]),
+        "elements": [{"id": id, "NI": vertexIds[ends[0]], "NF": vertexIds[ends[1]], "material": mat, "sectionProp": sec}
+                     for id, ends, mat, sec in sorted(elements)],
+        "material": materials,
+        "sectionProp": sections,
+        "restrictions": restrictions,
+    }
+    for loadCase in loadCases:
+        del loadCase["loads"]
+    if len(loadCases) == 1:
+        data["nodalLoads"] = loadCases[0]["nodalLoads"]
+    else:
+        data["loadCases"] = loadCases
+    return data
+
+def _ReadFtoolName(line: str):
+    """
+    Separa o nome entre aspas simples e os valores seguintes de uma linha do Ftool
+    """
+    end = line.index("'", 1)
+    return line[1:end], [float(v) for v in line[end+1:].split()]
+
+def _ReadFtoolEdgeGeometry(lines, nextFloats) -> list[float]:
+    """
+    Lê a geometria de uma barra (pontos intermediários e retângulo envolvente [xmin, xmax, ymin, ymax])
+    """
+    if int(next(lines)) != 0:
+        raise ValueError("Barras poligonais do Ftool não são suportadas em treliças")
+    return nextFloats()
+
+def _ReadFtoolVertex(lines, coords, nLoadCases, nodes, restrictions, loadCases):
+    """
+    Lê os atributos de um nó (apoios, molas, carregamentos e deslocamentos prescritos)
+    """
+    attrs = [int(v) for v in next(lines).split()]
+    springs = [float(v) for v in next(lines).split()]
+    loadRefs = [int(next(lines).split()[0]) for _ in range(nLoadCases)]
+    presc = [float(v) for v in next(lines).split()]
+
+    id = attrs[0]
+    nodes.append({"id": id, "coordenadas": coords})
+
+    # Restrições: 0 livre, 1 fixo (ou prescrito), 2 mola
+    codes = attrs[1:3]
+    if any(codes):
+        restrict = {"no": id, "restricoes": [1 if code else 0 for code in codes], "types": []}
+        for j, code in enumerate(codes):
+            if code == 2:
+                restrict["types"].append("flexible")
+                restrict.setdefault("flexible", []).append(springs[j])
+            elif code == 1 and presc[0] != 0 and presc[1+j] != 0:
+                restrict["types"].append("prescrible")
+                restrict.setdefault("prescrible", []).append(presc[1+j])
+            else:
+                restrict["types"].append("fix")
+        restrictions.append(restrict)
+
+    # Ações nodais de cada caso de carregamento (índice da ação na lista do caso)
+    for loadCase, ref in zip(loadCases, loadRefs):
+        if ref > 0:
+            loadCase["nodalLoads"].append({"no": id, "forcas": loadCase["loads"][ref-1]})
+
+def _FtoolVertexKey(coords) -> tuple[float, float]:
+    """
+    Chave de busca de um nó: coordenadas arredondadas (absorve os erros de arredondamento do retângulo envolvente)
+    """
+    return round(coords[0], 6) + 0.0, round(coords[1], 6) + 0.0
+
+def _FindFtoolVertex(vertexIndex: dict, coords) -> int:
+    """
+    Retorna o índice do nó com as coordenadas indicadas
+    """
+    try:
+        return vertexIndex[_FtoolVertexKey(coords)]
+    except KeyError:
+        raise ValueError(f"Nó com coordenadas {coords} não encontrado no arquivo do Ftool") from None
+
+def _FindFtoolEdgeEnds(vertexIndex: dict, bbox) -> tuple[int, int]:
+    """
+    Retorna os índices dos nós extremos de uma barra entre nós existentes a partir do seu retângulo envolvente
+    """
+    for a, b in (((bbox[0], bbox[2]), (bbox[1], bbox[3])), ((bbox[0], bbox[3]), (bbox[1], bbox[2]))):
+        try:
+            return _FindFtoolVertex(vertexIndex, a), _FindFtoolVertex(vertexIndex, b)
+        except ValueError:
+            continue
+    raise ValueError(f"Barra com retângulo envolvente {bbox} não encontrada no arquivo do Ftool")
+
+# Códigos dos tipos de apoio por GL no modelo binário (posição na tupla)
+SUPPORT_TYPES = ("free", "fix", "prescrible", "flexible")
+BINARY_FORMAT_VERSION = 1
+BINARY_EXTENSION = ".trz"       # Extensão do modelo binário (distinta dos arquivos .npz de resultados)
+
+def RestrictionsToArrays(Restrictions: list[dict], nGLpN: int):
+    """
+    Converte a lista de restrições do JSON em arrays: IDs dos nós, códigos dos apoios por GL (SUPPORT_TYPES) e
+    valores por GL (deslocamento prescrito ou rigidez da mola)
+    """
+    nodes = np.zeros(len(Restrictions), dtype=np.int64)
+    codes = np.zeros((len(Restrictions), nGLpN), dtype=np.int8)
+    values = np.zeros((len(Restrictions), nGLpN))
+    for i, restrict in enumerate(Restrictions):
+        nodes[i] = restrict["no"]
+        contPresc = 0;  contFlex = 0
+        for j, type in enumerate(restrict["types"][:nGLpN]):
+            if restrict["restricoes"][j] == 1:
+                codes[i, j] = SUPPORT_TYPES.index(type)
+                if type == "prescrible":
+                    values[i, j] = restrict["prescrible"][contPresc]
+                    contPresc += 1
+                elif type == "flexible":
+                    values[i, j] = restrict["flexible"][contFlex]
+                    contFlex += 1
+    return nodes, codes, values
+
+def NodalLoadsToArrays(NodalLoads: list[dict], nGLpN: int):
+    """
+    Converte a lista de ações nodais do JSON em arrays: IDs dos nós e forças por GL
+    """
+    nodes = np.array([load["no"] for load in NodalLoads], dtype=np.int64)
+    forces = np.array([load["forcas"][:nGLpN] for load in NodalLoads], dtype=float).reshape(-1, nGLpN)
+    return nodes, forces
+
+def ModelToArrays(data: dict) -> dict:
+    """
+    Converte o dicionário de entrada (esquema JSON) nas tabelas do modelo binário:
+    nós (IDs e coordenadas), elementos (IDs, nós, material e seção), materiais, seções, apoios, ações nodais,
+    casos de carregamento e combinações. Os parâmetros escalares são gravados em "meta" (texto JSON)
+    """
+    nGLpN = len(data["nodes"][0]["coordenadas"])
+    Elements = data["elements"]
+
+    arrays = {
+        "nodeIds": np.array([node["id"] for node in data["nodes"]], dtype=np.int64),
+        "nodeCoords": np.array([node["coordenadas"] for node in data["nodes"]], dtype=float),
+        "elemIds": np.array([element["id"] for element in Elements], dtype=np.int64),
+        "elemNodes": np.array([[element["NI"], element["NF"]] for element in Elements], dtype=np.int64).reshape(-1, 2),
+        "elemMaterial": np.array([element["material"] for element in Elements], dtype=np.int64),
+        "elemSection": np.array([element["sectionProp"] for element in Elements], dtype=np.int64),
+        "materialIds": np.array([material["id"] for material in data["material"]], dtype=np.int64),
+        "materialE": np.array([material["modulo_elasticidade"] for material in data["material"]], dtype=float),
+        "sectionIds": np.array([section["id"] for section in data["sectionProp"]], dtype=np.int64),
+        "sectionArea": np.array([section["area"] for section in data["sectionProp"]], dtype=float),
+    }
+    arrays["supportNodes"], arrays["supportCodes"], arrays["supportValues"] = RestrictionsToArrays(data["restrictions"], nGLpN)
+    arrays["loadNodes"], arrays["loadForces"] = NodalLoadsToArrays(data.get("nodalLoads", []), nGLpN)
+
+    # Casos de carregamento: ações de todos os casos concatenadas, com o índice do caso de cada linha
+    loadCases = data.get("loadCases", [])
+    if loadCases:
+        caseLoads = [NodalLoadsToArrays(loadCase["nodalLoads"], nGLpN) for loadCase in loadCases]
+        arrays["caseNames"] = np.array([loadCase["name"] for loadCase in loadCases])
+        arrays["caseLoadCase"] = np.repeat(np.arange(len(loadCases)), [nodes.size for nodes, _ in caseLoads])
+        arrays["caseLoadNodes"] = np.concatenate([nodes for nodes, _ in caseLoads])
+        arrays["caseLoadForces"] = np.concatenate([forces for _, forces in caseLoads])
+
+        # Combinações: matriz de fatores (nº de combinações x nº de casos)
+        combinations = data.get("loadCombinations", [])
+        names = [loadCase["name"] for loadCase in loadCases]
+        factors = np.zeros((len(combinations), len(loadCases)))
+        for c, combination in enumerate(combinations):
+            for name, factor in combination["factors"].items():
+                factors[c, names.index(name)] = factor
+        arrays["comboNames"] = np.array([combination["name"] for combination in combinations], dtype=str)
+        arrays["comboFactors"] = factors
+
+    meta = {key: value for key, value in data.items() if not isinstance(value, (list, dict))}
+    meta["formatVersion"] = BINARY_FORMAT_VERSION
+    if isinstance(data.get("solver"), dict):
+        meta["solver"] = data["solver"]
+    arrays["meta"] = np.array(json.dumps(meta))
+    CheckBinaryIds(arrays)
+    return arrays
+
+def CheckBinaryIds(arrays: dict):
+    """
+    Verifica se os IDs dos nós do modelo binário são únicos, se os IDs dos materiais e seções são contíguos
+    (1, 2, ..., n, na ordem das tabelas, que são indexadas por ID - 1) e se os elementos, apoios e ações
+    referenciam IDs existentes
+    """
+    nodeIds = np.asarray(arrays["nodeIds"])
+    if np.unique(nodeIds).size != nodeIds.size:
+        raise ValueError("Os IDs dos nós do modelo binário devem ser únicos")
+    for name, table in (("materiais", "materialIds"), ("seções", "sectionIds")):
+        ids = np.asarray(arrays[table])
+        if not np.array_equal(ids, np.arange(1, ids.size + 1)):
+            raise ValueError(f"Os IDs dos {name} do modelo binário devem ser contíguos e ordenados (1 a {ids.size})")
+
+    references = [("elementos", "elemNodes", nodeIds), ("elementos", "elemMaterial", np.asarray(arrays["materialIds"])),
+                  ("elementos", "elemSection", np.asarray(arrays["sectionIds"])), ("apoios", "supportNodes", nodeIds),
+                  ("ações nodais", "loadNodes", nodeIds), ("casos de carregamento", "caseLoadNodes", nodeIds)]
+    for name, table, existing in references:
+        if table in arrays and np.asarray(arrays[table]).size > 0:
+            if not np.isin(np.asarray(arrays[table]), existing).all():
+                raise ValueError(f"A tabela '{table}' ({name}) do modelo binário referencia IDs inexistentes")
+
+def WriteBinaryModel(dirOut: str, data: dict):
+    """
+    Grava o modelo no formato binário (.trz): arquivo zip de arrays .npy sem compressão, de forma que cada tabela
+    possa ser mapeada diretamente em memória na leitura
+    """
+    arrays = ModelToArrays(data)
+    with open(dirOut, 'wb') as outfile:         # Arquivo aberto: np.savez não acrescenta a extensão .npz
+        np.savez(outfile, **arrays)
+
+def ReadBinaryModel(dir: str, mmap: bool = True) -> dict:
+    """
+    Lê um modelo binário (.trz). As tabelas são mapeadas em memória (somente leitura), sem cópia nem conversão
+    para objetos Python; o dicionário retornado contém os parâmetros escalares e as tabelas em "arrays"
+
+    :param mmap: mapeia as tabelas em memória (caso contrário, as tabelas são lidas para a memória)
+    """
+    arrays = {}
+    with zipfile.ZipFile(dir) as archive:
+        for info in archive.infolist():
+            name = os.path.splitext(info.filename)[0]
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                arrays[name] = _MapNpyMember(dir, info)
+            else:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+
+    data = json.loads(str(arrays.pop("meta")))
+    if data.get("formatVersion", 0) > BINARY_FORMAT_VERSION:
+        raise ValueError(f"Versão do modelo binário não suportada: {data['formatVersion']}")
+    CheckBinaryIds(arrays)
+    data["arrays"] = arrays
+    return data
+
+def _MapNpyMember(dir: str, info: zipfile.ZipInfo) -> np.ndarray:
+    """
+    Mapeia em memória um array .npy armazenado sem compressão dentro do arquivo zip do modelo binário
+    """
+    with open(dir, 'rb') as file:
+        # Cabeçalho local do membro no arquivo zip (tamanhos do nome e do campo extra)
+        file.seek(info.header_offset)
+        header = struct.unpack('<4s5H3L2H', file.read(30))
+        file.seek(header[-2] + header[-1], os.SEEK_CUR)
+
+        # Cabeçalho do array .npy
+        if np.lib.format.read_magic(file) == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(file)
+        offset = file.tell()
+
+    if dtype.hasobject:
+        raise ValueError(f"O array '{info.filename}' do modelo binário contém objetos Python")
+    if len(shape) == 0 or 0 in shape:
+        # Arrays escalares ou vazios não podem ser mapeados
+        with zipfile.ZipFile(dir) as archive, archive.open(info) as member:
+            return np.lib.format.read_array(member, allow_pickle=False)
+    return np.memmap(dir, dtype=dtype, mode='r', offset=offset, shape=shape, order='F' if fortran else 'C')
+
+def ConvertModel(dirIn: str, dirOut: str = None) -> str:
+    """
+    Converte um arquivo de estrutura (.json ou .ftl) para o modelo binário (.trz)
+    """
+    data = ReadModel(dirIn)
+    if data is None:
+        raise ValueError(f"Não foi possível ler o arquivo '{dirIn}'")
+    dirOut = dirOut or os.path.splitext(dirIn)[0] + BINARY_EXTENSION
+    WriteBinaryModel(dirOut, data)
+    return dirOut
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Converte arquivos de estrutura (.json ou .ftl) para o modelo binário (.trz)")
+    parser.add_argument("input", help="arquivo de estrutura")
+    parser.add_argument("output", nargs="?", default=None, help="arquivo .trz de saída (padrão: mesmo nome do arquivo de entrada)")
+    args = parser.parse_args()
+    print(ConvertModel(args.input, args.output))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class PhaseRecorder:
+    """
+    Registra, para cada fase da análise, o tempo de relógio, o tempo de CPU, o pico de alocação de memória
+    (tracemalloc) e estatísticas adicionais (nnz das matrizes, dados do resolvedor etc.)
+    """
+    def __init__(self, callback = None, traceMemory: bool = True):
+        """
+        callback: função chamada ao final de cada fase como callback(nome, registro)
+        traceMemory: registra o pico de alocação de cada fase com o tracemalloc
+        """
+        self.callback = callback
+        self.traceMemory = traceMemory
+        self.phases: dict[str, dict] = {}       # Registros das fases, na ordem de execução
+        self.ownsTracing = False                # Indica se o tracemalloc foi iniciado pelo registrador
+
+    def startTracing(self):
+        """
+        Inicia o tracemalloc, caso ainda não esteja ativo
+        """
+        if self.traceMemory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.ownsTracing = True
+
+    def stopTracing(self):
+        """
+        Encerra o tracemalloc quando iniciado pelo registrador
+        """
+        if self.ownsTracing:
+            tracemalloc.stop()
+            self.ownsTracing = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Mede uma fase da análise. O dicionário retornado recebe as estatísticas adicionais da fase
+        """
+        self.startTracing()
+        if self.traceMemory:
+            tracemalloc.reset_peak()
+            memStart = tracemalloc.get_traced_memory()[0]
+
+        stats = {}
+        wallStart = time.perf_counter();    cpuStart = time.process_time()
+        try:
+            yield stats
+        finally:
+            record = {"wallTime [s]": time.perf_counter() - wallStart, "cpuTime [s]": time.process_time() - cpuStart}
+            if self.traceMemory:
+                current, peak = tracemalloc.get_traced_memory()
+                record["peakAllocation [MB]"] = (peak - memStart)/2**20
+                record["netAllocation [MB]"] = (current - memStart)/2**20
+            record.update(stats)
+
+            # Fases repetidas são acumuladas sob nomes numerados
+            key = name;     count = 2
+            while key in self.phases:
+                key = f"{name}_{count}";    count += 1
+            self.phases[key] = record
+
+            if self.callback is not None:
+                self.callback(key, record)
+
+    def report(self) -> dict:
+        """
+        Retorna o relatório estruturado das fases e os totais
+        """
+        total = {"wallTime [s]": sum(record["wallTime [s]"] for record in self.phases.values()),
+                 "cpuTime [s]": sum(record["cpuTime [s]"] for record in self.phases.values())}
+        if self.traceMemory and self.phases:
+            total["peakAllocation [MB]"] = max(record["peakAllocation [MB]"] for record in self.phases.values())
+        return {"phases": self.phases, "total": total}
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+import time
+import numpy as np
+import Solvers
+
+GATHER_SIZE = 1 << 20       # Coeficientes das linhas de influência reunidos por bloco de posições do trem
+
+
+def lowerChord(structure) -> np.ndarray:
+    """
+    IDs dos nós do banzo inferior: nós com a menor coordenada vertical (y na treliça plana, z na espacial),
+    ordenados pelas demais coordenadas
+    """
+    coords = structure.coords
+    vertical = coords[:, -1]
+    tol = 1e-9*max(float(np.ptp(coords)), 1.0)
+    nodes = np.flatnonzero(vertical <= vertical.min() + tol)
+    order = np.lexsort(coords[nodes, :-1].T[::-1])
+    return structure.nodeIds[nodes[order]]
+
+def checkTrain(train: dict) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cargas dos eixos e distâncias de cada eixo ao primeiro de um trem {"name", "loads", "offsets"}
+    """
+    loads = np.atleast_1d(np.asarray(train["loads"], dtype=float))
+    offsets = np.atleast_1d(np.asarray(train.get("offsets", np.zeros(loads.size)), dtype=float))
+    if loads.size == 0 or loads.shape != offsets.shape:
+        raise ValueError(f"O trem '{train.get('name')}' deve ter uma distância ao primeiro eixo para cada carga")
+    if not np.all(np.isfinite(offsets)) or offsets.min() < 0:
+        raise ValueError(f"As distâncias dos eixos do trem '{train.get('name')}' ao primeiro eixo devem ser positivas")
+    return loads, offsets
+
+
+class Envelope:
+    """
+    Máximos e mínimos de um conjunto de respostas e as posições (e sentidos) do trem que os produzem, atualizados
+    por blocos de posições sem armazenar as respostas
+    """
+    def __init__(self, n: int):
+        """
+        n: número de respostas (elementos)
+        """
+        self.count = 0                                      # Posições processadas
+        self.max = np.full(n, -np.inf)
+        self.min = np.full(n, np.inf)
+        self.maxPosition = np.full(n, np.nan)               # Posição do primeiro eixo no máximo
+        self.minPosition = np.full(n, np.nan)
+        self.maxDirection = np.zeros(n, dtype=np.int8)      # Sentido do percurso no máximo (1 ou -1)
+        self.minDirection = np.zeros(n, dtype=np.int8)
+
+    def update(self, X: np.ndarray, positions: np.ndarray, direction: int):
+        """
+        Acrescenta as respostas de um bloco de posições (nº de posições x n)
+        """
+        self.count += X.shape[0]
+        for reduce, locate, best, position, sense, better in (
+                (np.max, np.argmax, self.max, self.maxPosition, self.maxDirection, np.greater),
+                (np.min, np.argmin, self.min, self.minPosition, self.minDirection, np.less)):
+            values = reduce(X, axis=0)
+            improved = np.flatnonzero(better(values, best))
+            if improved.size > 0:
+                # Posições apenas das respostas cujo extremo foi superado
+                best[improved] = values[improved]
+                position[improved] = positions[locate(X[:, improved], axis=0)]
+                sense[improved] = direction
+
+    def report(self) -> dict:
+        return {"max": self.max.tolist(), "min": self.min.tolist(), "maxPosition": self.maxPosition.tolist(),
+                "minPosition": self.minPosition.tolist(), "maxDirection": self.maxDirection.tolist(),
+                "minDirection": self.minDirection.tolist()}
+
+
+class MovingLoadAnalysis:
+    """
+    Linhas de influência dos esforços normais e envoltórias de trens de cargas móveis ao longo de um banzo
+    carregado (caminho de nós) de uma estrutura (Truss2D ou Truss3D).
+
+    As cargas atuam nos nós do caminho (estações): uma carga entre duas estações é transmitida a ambas pela regra
+    da alavanca (tabuleiro simplesmente apoiado nas transversinas), de modo que as linhas de influência são lineares
+    entre as estações. As forças unitárias de todas as estações formam um bloco de vetores resolvido com uma única
+    fatoração de K_ff, e os esforços normais de todas as estações são recuperados em uma operação vetorizada.
+    Para um trem de cargas concentradas, a resposta é linear por partes na posição do trem, com os extremos nas
+    posições em que algum eixo está sobre uma estação: as envoltórias são exatas nessas posições críticas,
+    processadas em blocos com os máximos e mínimos acumulados (ver Envelope).
+    Os deslocamentos prescritos dos apoios não são considerados (efeitos das cargas móveis apenas)
+    """
+    def __init__(self, structure, path=None, direction=None, blockSize: int = 512):
+        """
+        structure: estrutura com os apoios definidos (as ações nodais e os casos de carregamento não são considerados)
+        path: IDs dos nós do banzo carregado, na ordem do percurso (padrão: banzo inferior, ver lowerChord)
+        direction: direção das cargas (padrão: vertical, para baixo)
+        blockSize: número de estações ou de posições do trem processadas em conjunto (limita a memória)
+        """
+        S = structure
+        self.structure = S
+        self.path = np.atleast_1d(np.asarray(lowerChord(S) if path is None else path, dtype=np.int64))
+        if self.path.size < 2:
+            raise ValueError("O caminho das cargas móveis deve ter pelo menos dois nós")
+        self.nodes = S.nodeTable.index(self.path)                  # Posições dos nós do caminho na tabela de nós
+        length = np.linalg.norm(np.diff(S.coords[self.nodes], axis=0), axis=1)
+        if np.any(length <= 0):
+            raise ValueError("Nós consecutivos do caminho das cargas móveis devem ser distintos")
+        self.stations = np.concatenate(([0.0], np.cumsum(length)))  # Abscissas das estações ao longo do caminho
+
+        if direction is None:
+            direction = np.zeros(S.GLpE);   direction[-1] = -1.0
+        self.direction = np.asarray(direction, dtype=float)
+        if self.direction.shape != (S.GLpE,) or not np.linalg.norm(self.direction) > 0:
+            raise ValueError(f"A direção das cargas móveis deve ter {S.GLpE} componentes não todas nulas")
+        self.direction = self.direction/np.linalg.norm(self.direction)
+        if blockSize < 1:
+            raise ValueError("O número de posições por bloco deve ser positivo")
+        self.blockSize = blockSize
+        self.nFactorizations = 0
+        self.influence: np.ndarray = None       # Linhas de influência dos esforços normais (nElem x nº de estações)
+        self.envelopes: list[dict] = []         # Envoltórias dos trens (ver envelope)
+
+    def influenceLines(self) -> np.ndarray:
+        """
+        Esforços normais de todos os elementos para a carga unitária em cada estação (nElem x nº de estações):
+        uma fatoração de K_ff e um bloco de vetores de forças por blockSize estações.
+        A matriz de rigidez e a partição da análise linear da estrutura são reutilizadas quando disponíveis
+        """
+        S = self.structure
+        start = time.perf_counter()
+        linear = S.nonlinear is None                    # A análise não linear substitui a matriz pela tangente
+        if not linear or getattr(S, "KGS_Singular", None) is None:
+            S.calculateKGS_Singular()
+        if (linear and S.bcMethod == "partition" and getattr(S, "KGS_CC", None) is not None
+                and S.KGS_CC.shape[0] == S.fDOFs.size):
+            K_ff = S.KGS_CC
+        else:
+            S.defineBoundaryDOFs()
+            S.definePartition()
+            K_ff, _ = S.partitionedStiffness()
+        self.solver = Solvers.defineSolver(S.solver.spec(), S.storage)
+        self.solver.prepare(K_ff)
+        self.nFactorizations += 1
+
+        nStations = self.stations.size
+        self.influence = np.zeros((S.nElem, nStations))
+        for first in range(0, nStations, self.blockSize):
+            columns = np.arange(first, min(first + self.blockSize, nStations))
+            # Carga unitária da estação j na coluna j (nos GLs do nó da estação)
+            F = np.zeros((S.nGL, columns.size))
+            F[S.nodeDOFs[self.nodes[columns]], np.arange(columns.size)[:, None]] = self.direction
+            u = np.zeros(F.shape)
+            u[S.fDOFs] = self.solver.solve(F[S.fDOFs])
+            self.influence[:, columns] = S.elemTable.normalForces(u)
+        self.influenceTime = time.perf_counter() - start
+        return self.influence
+
+    def trainResponse(self, lines: np.ndarray, axles: np.ndarray, loads: np.ndarray) -> np.ndarray:
+        """
+        Esforços normais (nº de posições x nElem) das cargas dos eixos nas abscissas axles (nº de posições x
+        nº de eixos): cada carga é distribuída às duas estações vizinhas pela regra da alavanca, o que equivale a
+        interpolar as linhas de influência (lines: uma linha por estação); os eixos fora do caminho não produzem
+        esforços. As linhas das estações vizinhas de todos os eixos são combinadas em um produto por posição
+        """
+        s = self.stations
+        inside = (axles >= s[0]) & (axles <= s[-1])
+        j = np.clip(np.searchsorted(s, axles, side="right") - 1, 0, s.size - 2)
+        t = np.where(inside, (axles - s[j])/(s[j + 1] - s[j]), 0.0)
+        P = np.where(inside, loads, 0.0)
+        stations = np.concatenate((j, j + 1), axis=1)
+        weights = np.concatenate((P*(1 - t), P*t), axis=1)
+        return np.matmul(weights[:, None, :], lines[stations])[:, 0, :]
+
+    def envelope(self, trains: list[dict], reversible: bool = True) -> list[dict]:
+        """
+        Envoltórias dos esforços normais sob trens de cargas móveis {"name", "loads", "offsets"}: cargas dos eixos
+        (no sentido de direction) e distâncias de cada eixo ao primeiro, medidas para trás no sentido do percurso.
+        Com reversible, cada trem percorre o caminho também no sentido inverso. Para cada trem, retorna os máximos
+        e os mínimos dos esforços normais com a posição do primeiro eixo (abscissa ao longo do caminho) e o
+        sentido do percurso (1 ou -1) que os produzem
+        """
+        if self.influence is None:
+            self.influenceLines()
+        S = self.structure
+        lines = np.ascontiguousarray(self.influence.T)          # Linhas de influência por estação (acesso por linhas)
+        results = []
+        for train in trains:
+            loads, offsets = checkTrain(train)
+            stats = Envelope(S.nElem)
+            # Posições por bloco: as linhas de influência das estações vizinhas dos eixos do bloco
+            # (nº de posições x 2.nº de eixos x nElem) são limitadas a GATHER_SIZE coeficientes
+            size = int(np.clip(GATHER_SIZE//(2*loads.size*S.nElem), 1, self.blockSize))
+            for direction in ((1, -1) if reversible else (1,)):
+                # Posições críticas do primeiro eixo: algum eixo sobre uma estação
+                positions = np.unique((self.stations[:, None] + direction*offsets[None, :]).ravel())
+                for first in range(0, positions.size, size):
+                    x = positions[first:first + size]
+                    stats.update(self.trainResponse(lines, x[:, None] - direction*offsets[None, :], loads), x, direction)
+            results.append({"name": train.get("name"), "nPositions": stats.count, "Normal": stats.report()})
+        self.envelopes.extend(results)
+        return results
+
+    def report(self) -> dict:
+        """
+        Caminho e estações, linhas de influência dos esforços normais (uma linha por elemento) e envoltórias
+        """
+        S = self.structure
+        return {"path": self.path.tolist(), "stations": self.stations.tolist(), "elements": S.elemTable.ids.tolist(),
+                "influenceLines": self.influence.tolist(), "envelopes": self.envelopes,
+                "nFactorizations": self.nFactorizations, "influenceTime [s]": self.influenceTime,
+                "Solver": self.solver.info()}
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+import time
+import numpy as np
+import scipy.sparse as sp
+
+CONTROLS = ("load", "arclength")        # Controles do incremento (carga ou comprimento de arco)
+ITERATIONS = ("newton", "modified")     # Atualização da matriz tangente (a cada iteração ou a cada passo)
+
+
+class TangentPattern:
+    """
+    Padrão de esparsidade (CSR) da matriz tangente, calculado uma única vez a partir do mapa de GLs dos elementos.
+    A cada iteração, apenas os coeficientes dos blocos livre (K_ff) e livre-prescrito (K_fp) são atualizados
+    """
+    def __init__(self, DOFs: np.ndarray, nGL: int, fDOFs: np.ndarray, pDOFs: np.ndarray):
+        """
+        DOFs: mapa de GLs dos elementos (nElem x nGLE)
+        fDOFs, pDOFs: GLs livres e prescritos
+        """
+        nGLE = DOFs.shape[1]
+        rows = np.concatenate((np.repeat(DOFs, nGLE, axis=1).ravel(), np.arange(nGL)))
+        cols = np.concatenate((np.tile(DOFs, (1, nGLE)).ravel(), np.arange(nGL)))
+
+        # Coeficientes únicos em ordem CSR (linha, coluna) e a posição de cada triplet entre eles
+        keys, self.position = np.unique(rows*nGL + cols, return_inverse=True)
+        self.nnz = keys.size
+        self.nTriplets = DOFs.size*nGLE                 # Triplets dos elementos (a diagonal completa o padrão)
+        self.nGL = nGL
+        rows = keys // nGL;     cols = keys % nGL
+
+        # Posição dos GLs nos conjuntos livre e prescrito
+        fPos = np.full(nGL, -1, dtype=np.int64);    fPos[fDOFs] = np.arange(fDOFs.size)
+        pPos = np.full(nGL, -1, dtype=np.int64);    pPos[pDOFs] = np.arange(pDOFs.size)
+
+        # Blocos K_ff e K_fp: coeficientes selecionados do padrão completo (a ordem CSR é preservada)
+        self.ff = np.flatnonzero((fPos[rows] >= 0) & (fPos[cols] >= 0))
+        self.ffIndices = fPos[cols[self.ff]]
+        self.ffIndptr = np.concatenate(([0], np.cumsum(np.bincount(fPos[rows[self.ff]], minlength=fDOFs.size))))
+        self.ffShape = (fDOFs.size, fDOFs.size)
+        self.fp = np.flatnonzero((fPos[rows] >= 0) & (pPos[cols] >= 0))
+        self.fpIndices = pPos[cols[self.fp]]
+        self.fpIndptr = np.concatenate(([0], np.cumsum(np.bincount(fPos[rows[self.fp]], minlength=fDOFs.size))))
+        self.fpShape = (fDOFs.size, pDOFs.size)
+        self.rows = rows;   self.cols = cols
+
+    def values(self, Kt: np.ndarray) -> np.ndarray:
+        """
+        Coeficientes do padrão completo a partir das matrizes tangentes dos elementos
+        """
+        weights = np.zeros(self.position.size)
+        weights[:self.nTriplets] = Kt.ravel()
+        return np.bincount(self.position, weights=weights, minlength=self.nnz)
+
+    def blocks(self, data: np.ndarray, diag: np.ndarray = None):
+        """
+        Blocos K_ff (com diag somada à diagonal) e K_fp com o padrão fixo
+        """
+        K_ff = sp.csr_matrix((data[self.ff], self.ffIndices, self.ffIndptr), shape=self.ffShape)
+        if diag is not None:
+            K_ff.setdiag(K_ff.diagonal() + diag)
+        K_fp = sp.csr_matrix((data[self.fp], self.fpIndices, self.fpIndptr), shape=self.fpShape)
+        return K_ff, K_fp
+
+    def matrix(self, data: np.ndarray):
+        """
+        Matriz tangente completa (CSR)
+        """
+        return sp.csr_matrix((data, (self.rows, self.cols)), shape=(self.nGL, self.nGL))
+
+
+class NonlinearAnalysis:
+    """
+    Análise geometricamente não linear (grandes deslocamentos) de uma estrutura (Truss2D ou Truss3D) pela
+    formulação corrotacional dos elementos de treliça (ver ElementTable.calcCorotational).
+
+    As ações nodais e os deslocamentos prescritos são aplicados proporcionalmente ao fator de carga λ, em
+    incrementos com controle de carga ou de comprimento de arco (Crisfield, restrição cilíndrica), o que permite
+    percorrer pontos limites (snap-through). O equilíbrio de cada incremento é obtido pelo método de Newton–Raphson
+    completo (matriz tangente refatorada a cada iteração) ou modificado (uma fatoração por incremento), com busca
+    linear opcional. O padrão de esparsidade da matriz tangente e a ordenação da fatoração são reutilizados entre
+    as iterações (ver TangentPattern e Solver.refactor)
+    """
+    def __init__(self, structure, control: str = "load", iteration: str = "newton", lineSearch: bool = False,
+                 nSteps: int = 10, loadFactor: float = 1.0, maxIter: int = 30, tol: float = 1e-8,
+                 arcLength: float = None, maxSteps: int = 200, maxCuts: int = 8, targetIter: int = 5,
+                 controlNode: int = None, controlDirection: int = None):
+        """
+        structure: estrutura com as ações nodais e os apoios definidos (os casos de carregamento não são considerados)
+        control: controle do incremento ("load" ou "arclength")
+        iteration: "newton" (matriz tangente a cada iteração) ou "modified" (matriz tangente do início do incremento)
+        lineSearch: busca linear nas correções de Newton
+        nSteps: número de incrementos até o fator de carga final (controle de carga) ou para definir o comprimento
+                de arco inicial
+        loadFactor: fator de carga final
+        maxIter: número máximo de iterações por incremento
+        tol: tolerância relativa do resíduo
+        arcLength: comprimento de arco inicial (padrão: o do primeiro incremento de carga)
+        maxSteps: número máximo de incrementos do controle de comprimento de arco
+        maxCuts: número de reduções (à metade) do incremento inicial admitidas sem convergência
+        targetIter: número de iterações desejado por incremento (adaptação do comprimento de arco)
+        controlNode, controlDirection: nó (ID) e direção (0 = x, 1 = y, 2 = z) do deslocamento registrado na trajetória
+        """
+        if control not in CONTROLS:
+            raise ValueError(f"Controle desconhecido: '{control}'")
+        if iteration not in ITERATIONS:
+            raise ValueError(f"Método de iteração desconhecido: '{iteration}'")
+        if structure.nLoadCases > 0:
+            raise ValueError("A análise não linear não admite casos de carregamento (a superposição não é válida)")
+        self.structure = structure
+        self.control = control
+        self.iteration = iteration
+        self.lineSearch = lineSearch
+        self.nSteps = nSteps
+        self.loadFactor = loadFactor
+        self.maxIter = maxIter
+        self.tol = tol
+        self.arcLength = arcLength
+        self.maxSteps = maxSteps
+        self.maxCuts = maxCuts
+        self.targetIter = targetIter
+        self.controlDOF = None if controlNode is None else int(structure.nodeDOFs[structure.nodeTable.index(controlNode), controlDirection or 0])
+
+        self.nIterations = 0                # Número total de iterações
+        self.nFactorizations = 0            # Número de fatorações da matriz tangente
+        self.nCuts = 0                      # Número de reduções de incremento
+        self.path: list[dict] = []          # Trajetória de equilíbrio (um registro por incremento convergido)
+
+        self.defineSystem()
+
+    def defineSystem(self):
+        """
+        Define a partição dos GLs, os vetores de referência (forças e deslocamentos prescritos) e o padrão da
+        matriz tangente
+        """
+        S = self.structure
+        S.defineBoundaryDOFs()
+        S.definePartition()
+        S.defineGlobalForces()
+        self.F = S.GForcesV.copy()                      # Forças de referência (λ = 1)
+        self.fDOFs = S.fDOFs;   self.pDOFs = S.pDOFs
+        self.uP = S.uP                                  # Deslocamentos prescritos de referência (λ = 1)
+        self.springs = np.zeros(self.fDOFs.size)        # Rigidez das molas na diagonal do bloco livre
+        np.add.at(self.springs, S.flexPos, S.flexValues)
+        self.pattern = TangentPattern(S.elemTable.DOFs, S.nGL, self.fDOFs, self.pDOFs)
+        self.scale = max(np.linalg.norm(self.F), 1.0)
+
+    def state(self, u: np.ndarray, tangent: bool = True):
+        """
+        Esforços normais, vetor de forças internas (elementos e molas) e, opcionalmente, os blocos K_ff e K_fp da
+        matriz tangente no estado de deslocamentos u
+        """
+        S = self.structure
+        N, endForces, Kt = S.elemTable.calcCorotational(u, tangent)
+        fint = np.bincount(S.elemTable.DOFs.ravel(), weights=endForces.ravel(), minlength=S.nGL)
+        if not tangent:
+            return N, fint, None, None
+        self.data = self.pattern.values(Kt)
+        K_ff, K_fp = self.pattern.blocks(self.data, self.springs)
+        return N, fint, K_ff, K_fp
+
+    def residual(self, u: np.ndarray, lam: float) -> np.ndarray:
+        """
+        Resíduo (forças desequilibradas) nos GLs livres
+        """
+        _, fint, _, _ = self.state(u, tangent=False)
+        return lam*self.F[self.fDOFs] - fint[self.fDOFs] - self.springs*u[self.fDOFs]
+
+    def factorize(self, K_ff):
+        """
+        Fatora a matriz tangente do bloco livre (a primeira fatoração define a ordenação, reutilizada nas demais)
+        """
+        if self.nFactorizations == 0:
+            self.structure.solver.prepare(K_ff)
+        else:
+            self.structure.solver.refactor(K_ff)
+        self.nFactorizations += 1
+
+    def searchLine(self, u: np.ndarray, du: np.ndarray, lam: float, R0: np.ndarray) -> float:
+        """
+        Busca linear: fator s da correção que anula aproximadamente a projeção du.R(u + s.du) (secantes sucessivas)
+        """
+        g0 = du @ R0
+        s = 1.0
+        for _ in range(5):
+            uTrial = u.copy();  uTrial[self.fDOFs] += s*du
+            g = du @ self.residual(uTrial, lam)
+            if abs(g) <= 0.5*abs(g0) or g0 == g:
+                break
+            s = float(np.clip(s*g0/(g0 - g), 0.1, 1.0))
+        return s
+
+    def converged(self, R: np.ndarray, lam: float) -> bool:
+        return np.linalg.norm(R) <= self.tol*max(abs(lam)*self.scale, 1.0)
+
+    def loadStep(self, u: np.ndarray, lam: float, dLam: float):
+        """
+        Incremento com controle de carga: iterações de Newton no fator de carga lam + dLam.
+        Retorna (u, λ, iterações) ou None sem convergência
+        """
+        lam += dLam
+        u = u.copy()
+        u[self.pDOFs] = lam*self.uP
+        for it in range(1, self.maxIter + 1):
+            # A matriz tangente é fatorada apenas quando o resíduo não satisfaz a tolerância
+            update = self.iteration == "newton" or it == 1
+            _, fint, K_ff, _ = self.state(u, tangent=update)
+            R = lam*self.F[self.fDOFs] - fint[self.fDOFs] - self.springs*u[self.fDOFs]
+            if self.converged(R, lam):
+                return u, lam, it - 1
+            if update:
+                self.factorize(K_ff)
+            du = self.structure.solver.solve(R)
+            if not np.all(np.isfinite(du)):
+                return None
+            s = self.searchLine(u, du, lam, R) if self.lineSearch else 1.0
+            u[self.fDOFs] += s*du
+            self.nIterations += 1
+        return None
+
+    def arcStep(self, u: np.ndarray, lam: float, dl: float, previous: np.ndarray):
+        """
+        Incremento com controle de comprimento de arco (restrição cilíndrica ||Δu_f|| = dl).
+        previous: incremento de deslocamentos do passo anterior (define o sentido do preditor).
+        Retorna (u, λ, iterações) ou None sem convergência
+        """
+        u0 = u;     lam0 = lam
+
+        # Preditor tangente: du_F = K_ff^-1.(F_f - K_fp.u_P)
+        _, _, K_ff, K_fp = self.state(u0)
+        self.factorize(K_ff)
+        duF = self.structure.solver.solve(self.F[self.fDOFs] - K_fp @ self.uP)
+        dLam = dl/np.linalg.norm(duF)
+        if previous is not None and duF @ previous < 0:
+            dLam = -dLam
+        Du = dLam*duF;  DLam = dLam
+
+        for it in range(1, self.maxIter + 1):
+            u = u0.copy();  lam = lam0 + DLam
+            u[self.fDOFs] += Du;    u[self.pDOFs] = lam*self.uP
+            update = self.iteration == "newton"
+            _, fint, K_ff, K_fp = self.state(u, tangent=update)
+            R = lam*self.F[self.fDOFs] - fint[self.fDOFs] - self.springs*u[self.fDOFs]
+            if self.converged(R, lam):
+                return u, lam, it - 1
+            if update:
+                self.factorize(K_ff)
+                duF = self.structure.solver.solve(self.F[self.fDOFs] - K_fp @ self.uP)
+            duR = self.structure.solver.solve(R)
+
+            # Correção do fator de carga: raiz de ||Du + duR + dλ.duF||² = dl² mais próxima do incremento atual
+            a = duF @ duF;  b = 2*duF @ (Du + duR);     c = (Du + duR) @ (Du + duR) - dl**2
+            disc = b*b - 4*a*c
+            if disc < 0 or not np.isfinite(disc):
+                return None
+            roots = ((-b + np.sqrt(disc))/(2*a), (-b - np.sqrt(disc))/(2*a))
+            dLam = max(roots, key=lambda r: (Du + duR + r*duF) @ Du)
+            du = duR + dLam*duF
+            s = self.searchLine(u, du, lam + dLam, R) if self.lineSearch else 1.0
+            Du = Du + s*du;     DLam = DLam + s*dLam
+            self.nIterations += 1
+        return None
+
+    def record(self, step: int, u: np.ndarray, lam: float, iterations: int):
+        """
+        Registra um ponto da trajetória de equilíbrio
+        """
+        point = {"step": step, "loadFactor": float(lam), "iterations": iterations,
+                 "maxDisplacement": float(np.abs(u).max(initial=0.0))}
+        if self.controlDOF is not None:
+            point["controlDisplacement"] = float(u[self.controlDOF])
+        self.path.append(point)
+
+    def run(self) -> np.ndarray:
+        """
+        Percorre a trajetória de equilíbrio até o fator de carga final e atualiza os resultados da estrutura
+        """
+        start = time.perf_counter()
+        u = np.zeros(self.structure.nGL);   lam = 0.0
+        dLam = self.loadFactor/self.nSteps                  # Incremento de carga (controle de carga)
+        minLam = dLam/2**self.maxCuts                       # Menor incremento de carga admitido
+        dl = self.arcLength                                 # Comprimento de arco (definido no primeiro incremento)
+        minArc = None if dl is None else dl/2**self.maxCuts
+        previous = None
+        step = 0
+
+        while lam < self.loadFactor*(1 - 1e-12) and step < (self.maxSteps if self.control == "arclength" else np.inf):
+            if self.control == "load" or dl is None:
+                result = self.loadStep(u, lam, min(dLam, self.loadFactor - lam))
+            else:
+                result = self.arcStep(u, lam, dl, previous)
+
+                # Último incremento: o fator de carga final é obtido com controle de carga a partir do estado
+                # anterior; sem convergência, o comprimento de arco é reduzido
+                if result is not None and result[1] > self.loadFactor:
+                    result = self.loadStep(u, lam, self.loadFactor - lam)
+
+            # Sem convergência: reduz o incremento
+            if result is None:
+                self.nCuts += 1
+                if dl is None:
+                    dLam /= 2
+                else:
+                    dl /= 2
+                if dLam < minLam or (dl is not None and dl < minArc):
+                    raise RuntimeError(f"A análise não linear não convergiu no fator de carga {lam:.6g}")
+                continue
+
+            uNew, lamNew, iterations = result
+            step += 1
+            if self.control == "arclength":
+                if dl is None:
+                    # Comprimento de arco do primeiro incremento
+                    dl = np.linalg.norm((uNew - u)[self.fDOFs])
+                    minArc = dl/2**self.maxCuts
+                else:
+                    dl *= float(np.clip(np.sqrt(self.targetIter/max(iterations, 1)), 0.5, 2.0))
+            else:
+                dLam = min(2*dLam, self.loadFactor/self.nSteps)
+            previous = (uNew - u)[self.fDOFs]
+            u, lam = uNew, lamNew
+            self.record(step, u, lam, iterations)
+
+        if lam < self.loadFactor*(1 - 1e-12):
+            raise RuntimeError(f"A análise não linear atingiu o número máximo de incrementos ({self.maxSteps}) "
+                               f"no fator de carga {lam:.6g}, inferior ao fator de carga final {self.loadFactor:.6g}")
+
+        self.totalTime = time.perf_counter() - start
+        self.finish(u, lam)
+        return u
+
+    def finish(self, u: np.ndarray, lam: float):
+        """
+        Atualiza o estado da estrutura com o estado final: deslocamentos, esforços normais, reações e a matriz
+        tangente (com as condições de contorno aplicadas segundo o método da estrutura)
+        """
+        S = self.structure
+        N, fint, _, _ = self.state(u)
+        self.lam = lam
+        S.nodalDisp = u
+        S.normalForces = N
+        S.elemTable.N = N
+        S.GForcesV = lam*self.F
+        S.KGS_Singular = self.pattern.matrix(self.data)
+        if S.storage == "dense":
+            S.KGS_Singular = S.KGS_Singular.toarray()
+        S.applyBoundaryConditions()
+        S.defineReactions(fint)
+
+    def report(self) -> dict:
+        """
+        Resumo da análise não linear e trajetória de equilíbrio
+        """
+        return {"control": self.control, "iteration": self.iteration, "lineSearch": self.lineSearch,
+                "loadFactor": float(self.lam), "nSteps": len(self.path), "nIterations": self.nIterations,
+                "nFactorizations": self.nFactorizations, "nCuts": self.nCuts, "time [s]": self.totalTime,
+                "path": self.path}
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+import itertools
+import numpy as np
+import scipy.sparse as sp
+import Solvers
+from Nonlinear import TangentPattern
+
+
+def candidateGrid(areas: dict = None, moduli: dict = None) -> tuple[dict, dict]:
+    """
+    Produto cartesiano das faixas de valores das áreas ({ID da seção: valores}) e dos módulos de elasticidade
+    ({ID do material: valores}), no formato aceito por ParametricStudy.sweep (um valor por candidato)
+    """
+    areas = areas or {};    moduli = moduli or {}
+    ranges = [np.atleast_1d(np.asarray(values, dtype=float)) for values in list(areas.values()) + list(moduli.values())]
+    combinations = np.array(list(itertools.product(*ranges))).reshape(-1, len(ranges))
+    columns = iter(combinations.T)
+    return {id: next(columns) for id in areas}, {id: next(columns) for id in moduli}
+
+
+def assemblyOperator(pattern: TangentPattern, cossines: np.ndarray, L: np.ndarray) -> sp.csr_matrix:
+    """
+    Operador de montagem P (coeficientes do padrão x elementos): os coeficientes da matriz de rigidez no padrão
+    CSR fixo são P.EA, com as rigidezes unitárias b.b^T/L dos elementos (b = [-cossenos, cossenos])
+    """
+    b = np.hstack((-cossines, cossines))
+    unit = b[:, :, None]*b[:, None, :]/L[:, None, None]
+    elems = np.repeat(np.arange(L.size), unit[0].size)
+    return sp.csr_matrix((unit.ravel(), (pattern.position[:pattern.nTriplets], elems)), shape=(pattern.nnz, L.size))
+
+def elongations(DOFs: np.ndarray, cossines: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """
+    Alongamentos axiais b.v de todos os elementos para um vetor (ou matriz de vetores) indexado pelos GLs
+    """
+    n = cossines.shape[1]
+    endDisp = v[DOFs]
+    return np.einsum('ed,ed...->e...', cossines, endDisp[:, n:] - endDisp[:, :n])
+
+
+class ParametricStudy:
+    """
+    Estudo paramétrico e análise de sensibilidade das áreas das seções e dos módulos de elasticidade de uma
+    estrutura (Truss2D ou Truss3D), sem reler o modelo nem refazer a geometria.
+
+    A matriz de rigidez é linear nos produtos E.A dos elementos: K = Σ E_e.A_e.b_e.b_e^T/L_e. As rigidezes
+    unitárias b.b^T/L de todos os elementos (obtidas da tabela de elementos) formam um operador de montagem
+    esparso P, de modo que os coeficientes do padrão CSR fixo da matriz (ver Nonlinear.TangentPattern) de um
+    bloco de candidatos são obtidos em um único produto P.EA. Cada candidato exige uma fatoração, que reutiliza a
+    ordenação da primeira (Solver.refactor); os esforços normais são recuperados de forma vetorizada.
+
+    As sensibilidades dos deslocamentos, dos esforços normais e da flexibilidade (F.u) em relação à área ou ao
+    módulo de cada elemento são obtidas pelo método adjunto, com dK/dA_e = E_e.b_e.b_e^T/L_e: para uma resposta
+    q = c^T.u, K_ff.λ = c_f e dq/dA_e = -λ^T.(dK/dA_e).u (mais o termo explícito N_e/A_e dos esforços normais).
+    Todas as respostas formam um único bloco de vetores resolvido com a mesma fatoração da análise
+    """
+    def __init__(self, structure, blockSize: int = 32):
+        """
+        structure: estrutura com os apoios e as ações nodais (ou casos de carregamento) definidos
+        blockSize: número de candidatos montados em conjunto (limita a memória dos coeficientes)
+        """
+        S = structure
+        self.structure = S
+        self.blockSize = blockSize
+        self.nFactorizations = 0                        # Fatorações realizadas pelo estudo
+
+        # Partição dos GLs e rigidez das molas (independentes dos parâmetros)
+        S.defineBoundaryDOFs()
+        S.definePartition()
+        self.fDOFs = S.fDOFs;   self.pDOFs = S.pDOFs;   self.uP = S.uP
+        self.springs = np.zeros(self.fDOFs.size)
+        np.add.at(self.springs, S.flexPos, S.flexValues)
+
+        # Forças nodais (uma coluna por caso de carregamento ou combinação)
+        if S.nLoadCases > 0:
+            S.defineLoadCaseForces()
+            self.F = S.loadCaseForces
+        else:
+            self.F = S.dofArray(S.nodalForces).copy()
+
+        # Operador de montagem: coeficientes do padrão = P.EA (rigidezes unitárias b.b^T/L)
+        table = S.elemTable
+        self.pattern = TangentPattern(table.DOFs, S.nGL, self.fDOFs, self.pDOFs)
+        self.assembly = assemblyOperator(self.pattern, table.cossines, table.L)
+
+        # Parâmetros de referência (materiais e seções na ordem do modelo)
+        self.materialIds = [material.id for material in S.materials]
+        self.sectionIds = [section.id for section in S.sections]
+        self.baseE = np.array([material.E for material in S.materials], dtype=float)
+        self.baseA = np.array([section.Ax for section in S.sections], dtype=float)
+
+    def parameterMatrix(self, values, ids: list, base: np.ndarray, name: str) -> np.ndarray:
+        """
+        Matriz de parâmetros (nº de candidatos x nº de materiais ou seções) a partir de um dicionário
+        {ID: valor ou valores por candidato} (os demais mantêm o valor do modelo) ou de um array com uma linha
+        por candidato
+        """
+        if values is None:
+            return base[None, :]
+        if isinstance(values, dict):
+            nCand = max((np.size(value) for value in values.values()), default=1)
+            matrix = np.tile(base, (nCand, 1))
+            for id, value in values.items():
+                if id not in ids:
+                    raise ValueError(f"ID de {name} inexistente: {id}")
+                matrix[:, ids.index(id)] = value
+            return matrix
+        matrix = np.atleast_2d(np.asarray(values, dtype=float))
+        if matrix.shape[1] != base.size:
+            raise ValueError(f"Os parâmetros de {name} devem ter uma coluna por {name} ({base.size})")
+        return matrix
+
+    def elementStiffness(self, areas=None, moduli=None):
+        """
+        Áreas e módulos por candidato e os produtos E.A dos elementos (nº de candidatos x nElem)
+        """
+        A = self.parameterMatrix(areas, self.sectionIds, self.baseA, "seção")
+        E = self.parameterMatrix(moduli, self.materialIds, self.baseE, "material")
+        if A.shape[0] != E.shape[0] and 1 not in (A.shape[0], E.shape[0]):
+            raise ValueError(f"Números de candidatos incompatíveis: {A.shape[0]} (áreas) e {E.shape[0]} (módulos)")
+        nCand = max(A.shape[0], E.shape[0])
+        A = np.broadcast_to(A, (nCand, A.shape[1]));    E = np.broadcast_to(E, (nCand, E.shape[1]))
+        S = self.structure
+        return A, E, E[:, S.elemMaterials]*A[:, S.elemSections]
+
+    def elongation(self, v: np.ndarray) -> np.ndarray:
+        """
+        Alongamentos axiais de todos os elementos (ver elongations)
+        """
+        return elongations(self.structure.elemTable.DOFs, self.structure.elemTable.cossines, v)
+
+    def factorize(self, solver: Solvers.Solver, data: np.ndarray, first: bool):
+        """
+        Monta os blocos K_ff e K_fp a partir dos coeficientes do padrão e fatora K_ff (a primeira fatoração do
+        resolvedor define a ordenação, reutilizada nas demais)
+        """
+        K_ff, K_fp = self.pattern.blocks(data, self.springs)
+        if first:
+            solver.prepare(K_ff)
+        else:
+            solver.refactor(K_ff)
+        self.nFactorizations += 1
+        return K_ff, K_fp
+
+    def solve(self, solver: Solvers.Solver, K_fp) -> np.ndarray:
+        """
+        Deslocamentos (numeração interna) do sistema fatorado: K_ff.u_f = F_f - K_fp.u_p
+        """
+        column = lambda v: v if self.F.ndim == 1 else v[:, None]
+        u = np.zeros(self.F.shape)
+        u[self.pDOFs] = column(self.uP)
+        u[self.fDOFs] = solver.solve(self.F[self.fDOFs] - column(K_fp @ self.uP))
+        return u
+
+    def sweep(self, areas=None, moduli=None, store: bool = True) -> dict:
+        """
+        Analisa todos os candidatos definidos pelas áreas das seções e pelos módulos dos materiais
+        ({ID: valores por candidato} ou arrays nº de candidatos x nº de seções/materiais; ver candidateGrid).
+        Retorna os parâmetros de cada candidato, os máximos dos deslocamentos e dos esforços normais, a
+        flexibilidade F.u e, com store, os deslocamentos (numeração original) e os esforços normais de todos
+        """
+        S = self.structure
+        A, E, EA = self.elementStiffness(areas, moduli)
+        nCand = EA.shape[0]
+        L = S.elemTable.L
+        solver = Solvers.defineSolver(S.solver.spec(), "sparse")
+
+        results = {"areas": np.array(A), "moduli": np.array(E), "maxDisplacement": np.zeros(nCand),
+                   "maxNormal": np.zeros(nCand), "compliance": np.zeros((nCand,) + self.F.shape[1:])}
+        if store:
+            results["displacements"] = np.zeros((nCand,) + self.F.shape)
+            results["normalForces"] = np.zeros((nCand, S.nElem) + self.F.shape[1:])
+
+        for start in range(0, nCand, self.blockSize):
+            block = EA[start:start + self.blockSize]
+            data = np.asarray(self.assembly @ block.T)          # Coeficientes do padrão de todo o bloco
+            for j, ea in enumerate(block):
+                c = start + j
+                _, K_fp = self.factorize(solver, data[:, j], c == 0)
+                u = self.solve(solver, K_fp)
+                N = (ea/L).reshape(-1, *([1]*(u.ndim - 1)))*self.elongation(u)
+                results["maxDisplacement"][c] = np.abs(u).max(initial=0.0)
+                results["maxNormal"][c] = np.abs(N).max(initial=0.0)
+                results["compliance"][c] = np.einsum('i...,i...->...', self.F, u)
+                if store:
+                    results["displacements"][c] = S.userOrder(u)
+                    results["normalForces"][c] = N
+        results["Solver"] = solver.info()
+        return results
+
+    def sensitivities(self, dofs=None, elements=None, case: int = 0) -> dict:
+        """
+        Sensibilidades analíticas (método adjunto) na configuração atual das áreas e dos módulos:
+        dofs: GLs (numeração original, como em NodalDisplacements) dos deslocamentos de interesse
+        elements: IDs dos elementos dos esforços normais de interesse
+        case: coluna das forças quando a estrutura possui casos de carregamento
+        Para cada grupo de respostas ("displacement", "normal" e "compliance"), retorna os valores e as derivadas
+        em relação à área ("dArea") e ao módulo ("dModulus") de cada elemento (nº de respostas x nElem), às áreas
+        das seções ("dSectionArea") e aos módulos dos materiais ("dMaterialModulus").
+        A fatoração da análise linear da estrutura é reutilizada quando disponível (particionamento dos GLs);
+        caso contrário, é feita uma única fatoração
+        """
+        S = self.structure
+        table = S.elemTable
+        dofs = np.atleast_1d(np.asarray([] if dofs is None else dofs, dtype=np.int64))
+        position = {id: e for e, id in enumerate(table.ids.tolist())}
+        elements = np.array([position[id] for id in ([] if elements is None else elements)], dtype=np.int64)
+        F = self.F if self.F.ndim == 1 else self.F[:, case]
+
+        # Estado de referência: fatoração e deslocamentos da análise linear da estrutura, quando disponíveis
+        reuse = (S.bcMethod == "partition" and S.nonlinear is None and getattr(S, "nodalDisp", None) is not None
+                 and getattr(S, "KGS_CC", None) is not None and S.KGS_CC.shape[0] == self.fDOFs.size)
+        if reuse:
+            solver = S.solver
+            if S.nodalDisp.ndim > 1:
+                u = S.nodalDisp[:, case]
+            elif self.F.ndim == 1 or case == 0:
+                u = S.nodalDisp
+            else:
+                # Os deslocamentos da estrutura correspondem ao primeiro caso (ver collectLoadCaseResults):
+                # o caso é resolvido com a fatoração da análise
+                u = np.zeros(S.nGL)
+                u[self.pDOFs] = self.uP
+                u[self.fDOFs] = solver.solve(F[self.fDOFs] - S.K_fp @ self.uP)
+        else:
+            solver = Solvers.defineSolver(S.solver.spec(), "sparse")
+            _, K_fp = self.factorize(solver, self.assembly @ (table.E*table.A), True)
+            u = self.solve(solver, K_fp)
+            u = u if u.ndim == 1 else u[:, case]
+
+        # Vetores c das respostas (q = c^T.u): deslocamentos, esforços normais N = k.b.u e flexibilidade F.u
+        k = table.E*table.A/table.L
+        b = np.hstack((-table.cossines, table.cossines))
+        nD = dofs.size;     nN = elements.size
+        C = np.zeros((S.nGL, nD + nN + 1))
+        C[S.nodeDOFs.ravel()[dofs], np.arange(nD)] = 1
+        np.add.at(C, (table.DOFs[elements], nD + np.arange(nN)[:, None]), k[elements, None]*b[elements])
+        C[:, -1] = F
+
+        # Solução adjunta de todas as respostas com a mesma fatoração
+        Lam = np.zeros(C.shape)
+        Lam[self.fDOFs] = solver.solve(C[self.fDOFs])
+
+        # dq/dA_e = -E_e/L_e.(b.λ)_e.(b.u)_e (e o análogo para o módulo), com os termos explícitos dos esforços
+        elongU = self.elongation(u)
+        coupling = -(self.elongation(Lam)*elongU[:, None]).T/table.L              # nº de respostas x nElem
+        dArea = coupling*table.E;   dModulus = coupling*table.A
+        values = C.T @ u
+        rows = nD + np.arange(nN)
+        dArea[rows, elements] += values[rows]/table.A[elements]
+        dModulus[rows, elements] += values[rows]/table.E[elements]
+
+        # Derivadas em relação às áreas das seções e aos módulos dos materiais (soma sobre os elementos)
+        dSection = np.zeros((C.shape[1], len(self.sectionIds)))
+        dMaterial = np.zeros((C.shape[1], len(self.materialIds)))
+        np.add.at(dSection.T, S.elemSections, dArea.T)
+        np.add.at(dMaterial.T, S.elemMaterials, dModulus.T)
+
+        groups = {"displacement": slice(0, nD), "normal": slice(nD, nD + nN), "compliance": slice(nD + nN, None)}
+        result = {name: {"value": values[rows], "dArea": dArea[rows], "dModulus": dModulus[rows],
+                         "dSectionArea": dSection[rows], "dMaterialModulus": dMaterial[rows]}
+                  for name, rows in groups.items()}
+        result["displacement"]["dofs"] = dofs
+        result["normal"]["elements"] = table.ids[elements]
+        result["reusedFactorization"] = reuse
+        return result
@@ -1,40 +1,110 @@
+import matplotlib
 import matplotlib.pyplot as plt
-from matplotlib.patches import Circle
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import TwoSlopeNorm
 import numpy as np
-from Classes import Elem
 import os
 
-def plotStructure(dir, Structure):
-    # Configuração do gráfico
-    fig, ax = plt.subplots()
-
-    # Plotando elementos
-    for element in Structure.elements:
-        xi = element.initNode.coords[0] 
-        yi = element.initNode.coords[1]
-        xf = element.finalNode.coords[0]
-        yf = element.finalNode.coords[1]
-    
-        # Criando o gráfico
-        plt.plot(np.array([xi,xf]), np.array([yi,yf]), color='blue')
-    
-    x: list[float] = [];    y: list[float] = []
-    for node in Structure.nodes:
-        x.append(float(node.coords[0]))
-        y.append(float(node.coords[1]))
-    ax.scatter(x, y, color='blue', s = 100)  # zorder para garantir que os pontos fiquem sobre os círculos
+NON_INTERACTIVE_BACKENDS = ("agg", "pdf", "ps", "svg", "cairo", "template")     # Backends sem janela
+
+def interactiveBackend() -> bool:
+    """
+    Indica se o backend atual do matplotlib abre janelas (caso contrário, a figura é apenas gravada)
+    """
+    return matplotlib.get_backend().lower() not in NON_INTERACTIVE_BACKENDS
+
+def plotStructure(dir, Structure, show: bool = None, axialForces: bool = False, deformed: bool = False,
+                  scale: float = None, case: int = 0, dpi: int = 150, fileName: str = "Structure.png"):
+    """
+    Desenha a estrutura (todas as barras em uma única LineCollection, nós, apoios e ações nodais em uma chamada
+    cada) e grava a figura em dir/fileName.
+    show: exibe a figura em uma janela; por padrão, apenas quando o backend é interativo. Sem exibição, a figura
+          é desenhada pelo backend Agg, sem alterar o estado do pyplot e sem bloquear (execução sem interface gráfica)
+    axialForces: colore as barras pelo esforço normal (tração em vermelho, compressão em azul)
+    deformed: desenha também a configuração deformada
+    scale: fator de escala dos deslocamentos na deformada (padrão: deslocamento máximo igual a 10% do tamanho
+           da estrutura)
+    case: coluna dos resultados quando a estrutura possui vários casos de carregamento
+    """
+    show = interactiveBackend() if show is None else show
+    if show:
+        fig = plt.figure()
+    else:
+        fig = Figure()
+        FigureCanvasAgg(fig)
+
+    coords = np.asarray(Structure.coords, dtype=float)
+    dim = coords.shape[1]
+    if dim == 3:
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection
+        ax = fig.add_subplot(projection='3d')
+        Collection = Line3DCollection
+    else:
+        ax = fig.add_subplot()
+        Collection = LineCollection
+    add = ax.add_collection3d if dim == 3 else ax.add_collection
+    table = Structure.elemTable
+    ends = lambda points: np.stack((points[table.initNodes], points[table.finalNodes]), axis=1)
+
+    # Resultados da análise (indisponíveis quando os resultados foram obtidos do cache)
+    nodalDisp = getattr(Structure, "nodalDisp", None)
+    normalForces = getattr(Structure, "normalForces", None)
+    if nodalDisp is not None and np.ndim(nodalDisp) > 1:
+        nodalDisp = nodalDisp[:, case]
+    if normalForces is not None and np.ndim(normalForces) > 1:
+        normalForces = normalForces[:, case]
+
+    # Barras (uma única coleção de segmentos), coloridas pelo esforço normal quando solicitado
+    bars = Collection(ends(coords), colors='blue', linewidths=1.0)
+    if axialForces and normalForces is not None:
+        limit = max(float(np.abs(normalForces).max()), 1e-30)
+        bars.set_array(np.asarray(normalForces, dtype=float))
+        bars.set_cmap('coolwarm')
+        bars.set_norm(TwoSlopeNorm(vcenter=0.0, vmin=-limit, vmax=limit))
+        fig.colorbar(bars, ax=ax, label="Esforço normal [kN]")
+    add(bars)
+
+    # Configuração deformada
+    if deformed and nodalDisp is not None:
+        disp = Structure.userOrder(nodalDisp).reshape(-1, dim)
+        maxDisp = float(np.abs(disp).max())
+        if scale is None:
+            size = float(np.ptp(coords, axis=0).max())
+            scale = 0.1*size/maxDisp if maxDisp > 0 else 1.0
+        add(Collection(ends(coords + scale*disp), colors='red', linewidths=1.0, linestyles='dashed'))
+        ax.set_title(f"Estrutura (deformada ×{scale:.3g})")
+    else:
+        ax.set_title("Estrutura")
+
+    # Nós, apoios e ações nodais (uma chamada cada)
+    ax.scatter(*coords.T, color='blue', s=100/np.sqrt(max(1, coords.shape[0]/100)), zorder=3)
+    supports = coords[np.asarray(Structure.hasSupport)]
+    ax.scatter(*supports.T, marker='^', color='green', s=150, zorder=4, label="Apoios")
+    loaded = np.asarray(Structure.hasLoad)
+    if loaded.any():
+        forces = np.asarray(Structure.nodalForces, dtype=float)[loaded]
+        length = float(np.ptp(coords, axis=0).max())*0.1/max(float(np.abs(forces).max()), 1e-30)
+        ax.quiver(*coords[loaded].T, *(forces*length).T, color='orange', zorder=5, label="Ações nodais",
+                  **({} if dim == 3 else {"angles": 'xy', "scale_units": 'xy', "scale": 1}))
 
     # Configurações adicionais do gráfico
-    ax.set_title("Estrutura")
     ax.set_xlabel("Eixo X")
     ax.set_ylabel("Eixo Y")
+    if dim == 3:
+        ax.set_zlabel("Eixo Z")
+        ax.auto_scale_xyz(*coords.T)
+    else:
+        ax.set_aspect('equal', adjustable='datalim')
+        ax.autoscale_view()
     ax.grid(True)
 
-    # salvando o gráfico
-    plt.savefig((dir + '\\Structure.png'), dpi=600)
-
-    # Mantendo o gráfico aberto
-    plt.ioff()
+    # Salvando o gráfico
+    fig.savefig(os.path.join(dir, fileName), dpi=dpi)
 
     # Exibindo o gráfico
-    plt.show()
\ No newline at end of file
+    if show:
+        plt.show()
+        plt.close(fig)
+    return fig
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import Solvers
+from Nonlinear import TangentPattern
+from Parametric import assemblyOperator, elongations
+
+DISTRIBUTIONS = ("normal", "lognormal")     # Distribuições dos fatores aleatórios (média 1)
+
+# Tabelas da estrutura compartilhadas com os processos do pool (geometria, partição e forças de referência)
+SHARED_TABLES = ("DOFs", "cossines", "L", "elemMaterials", "elemSections", "baseE", "baseA", "F", "fDOFs", "pDOFs",
+                 "uP", "springs")
+
+
+def sampleFactors(rng: np.random.Generator, spec: dict, size) -> np.ndarray:
+    """
+    Fatores multiplicativos aleatórios de média 1 e coeficiente de variação spec["cov"], com distribuição
+    spec["distribution"] ("normal" ou "lognormal")
+    """
+    cov = spec.get("cov", 0.0)
+    z = rng.standard_normal(size)
+    if spec.get("distribution", "normal") == "lognormal":
+        sigma2 = np.log1p(cov**2)
+        return np.exp(np.sqrt(sigma2)*z - sigma2/2)
+    return 1 + cov*z
+
+def checkSpec(spec: dict, name: str) -> dict:
+    """
+    Verifica a definição de uma variável aleatória ({"cov", "distribution", ...}); None quando determinística
+    """
+    if spec is None or spec.get("cov", 0.0) == 0:
+        return None
+    if spec.get("distribution", "normal") not in DISTRIBUTIONS:
+        raise ValueError(f"Distribuição desconhecida para {name}: '{spec['distribution']}'")
+    if spec["cov"] < 0:
+        raise ValueError(f"O coeficiente de variação de {name} deve ser positivo")
+    return spec
+
+
+class RunningStatistics:
+    """
+    Estatísticas acumuladas de um conjunto de respostas (média, variância, extremos e número de amostras que
+    excedem o limite em valor absoluto), atualizadas por blocos de amostras sem armazená-las
+    (combinação de médias e somas de quadrados de Chan, Golub e LeVeque)
+    """
+    def __init__(self, n: int, limit=None):
+        """
+        n: número de respostas (GLs ou elementos)
+        limit: limite do valor absoluto de cada resposta (escalar ou array; None dispensa a contagem)
+        """
+        self.count = 0
+        self.mean = np.zeros(n)
+        self.M2 = np.zeros(n)                           # Soma dos quadrados dos desvios
+        self.min = np.full(n, np.inf)
+        self.max = np.full(n, -np.inf)
+        self.limit = limit
+        self.exceedances = np.zeros(n, dtype=np.int64)  # Amostras com |resposta| > limite
+
+    def update(self, X: np.ndarray) -> np.ndarray:
+        """
+        Acrescenta um bloco de amostras (n x nº de amostras); retorna as amostras com alguma excedência
+        """
+        block = RunningStatistics(X.shape[0], self.limit)
+        block.count = X.shape[1]
+        block.mean = X.mean(axis=1)
+        block.M2 = ((X - block.mean[:, None])**2).sum(axis=1)
+        block.min = X.min(axis=1);  block.max = X.max(axis=1)
+        exceeded = np.zeros(X.shape[1], dtype=bool)
+        if self.limit is not None:
+            over = np.abs(X) > np.reshape(self.limit, (-1, 1))
+            block.exceedances = over.sum(axis=1)
+            exceeded = over.any(axis=0)
+        self.merge(block)
+        return exceeded
+
+    def merge(self, other: "RunningStatistics"):
+        """
+        Combina as estatísticas de outro conjunto de amostras
+        """
+        n = self.count + other.count
+        if other.count == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta*other.count/n
+        self.M2 = self.M2 + other.M2 + delta**2*self.count*other.count/n
+        self.count = n
+        self.min = np.minimum(self.min, other.min);     self.max = np.maximum(self.max, other.max)
+        self.exceedances = self.exceedances + other.exceedances
+
+    def variance(self) -> np.ndarray:
+        return self.M2/(self.count - 1) if self.count > 1 else np.zeros_like(self.M2)
+
+    def report(self, order=lambda v: v) -> dict:
+        """
+        Estatísticas para a saída de resultados; order reordena as respostas (p.ex. GLs na numeração original)
+        """
+        report = {"mean": order(self.mean).tolist(), "std": order(np.sqrt(self.variance())).tolist(),
+                  "min": order(self.min).tolist(), "max": order(self.max).tolist()}
+        if self.limit is not None:
+            report["exceedanceProbability"] = order(self.exceedances/max(self.count, 1)).tolist()
+        return report
+
+
+class MonteCarloSystem:
+    """
+    Sistema de uma análise de Monte Carlo montado a partir das tabelas da estrutura (no processo principal ou,
+    a partir da memória compartilhada, em cada processo do pool): padrão da matriz de rigidez, operador de
+    montagem e resolvedor, com a fatoração mantida quando a rigidez é determinística
+    """
+    def __init__(self, tables: dict, options: dict):
+        self.tables = tables
+        self.options = options
+        T = tables
+        self.nGL = T["F"].size
+        self.pattern = TangentPattern(T["DOFs"], self.nGL, T["fDOFs"], T["pDOFs"])
+        self.assembly = assemblyOperator(self.pattern, T["cossines"], T["L"])
+        self.solver = Solvers.defineSolver(options["solver"], "sparse")
+        self.nFactorizations = 0
+        self.K_fp = None
+
+    def sampleStiffness(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Produtos E.A dos elementos de uma realização dos módulos e das áreas
+        """
+        T = self.tables
+        E = T["baseE"][T["elemMaterials"]].copy();      A = T["baseA"][T["elemSections"]].copy()
+        for values, spec, index, n in ((E, self.options["moduli"], T["elemMaterials"], T["baseE"].size),
+                                       (A, self.options["areas"], T["elemSections"], T["baseA"].size)):
+            if spec is not None:
+                if spec.get("perElement", False):
+                    values *= sampleFactors(rng, spec, values.size)
+                else:
+                    values *= sampleFactors(rng, spec, n)[index]
+        return E*A
+
+    def factorize(self, EA: np.ndarray):
+        """
+        Fatora o bloco livre da matriz de rigidez (a primeira fatoração define a ordenação, reutilizada nas demais)
+        """
+        K_ff, self.K_fp = self.pattern.blocks(np.asarray(self.assembly @ EA), self.tables["springs"])
+        if self.nFactorizations == 0:
+            self.solver.prepare(K_ff)
+        else:
+            self.solver.refactor(K_ff)
+        self.nFactorizations += 1
+        self.EA = EA
+
+    def run(self, seed: np.random.SeedSequence, nSamples: int) -> tuple:
+        """
+        Analisa um lote de amostras; cada realização da rigidez é resolvida para um bloco de vetores de forças
+        (uma coluna por amostra das ações). Retorna as estatísticas dos deslocamentos e dos esforços normais,
+        o número de amostras com falha (alguma excedência) e o número de fatorações
+        """
+        T = self.tables
+        options = self.options
+        rng = np.random.default_rng(seed)
+        stiffness = options["moduli"] is not None or options["areas"] is not None
+        perStiffness = options["samplesPerStiffness"] if stiffness else nSamples
+        statsU = RunningStatistics(self.nGL, options["displacementLimit"])
+        statsN = RunningStatistics(T["L"].size, options["forceLimit"])
+        failures = 0
+        factorizations = self.nFactorizations
+
+        for start in range(0, nSamples, perStiffness):
+            m = min(perStiffness, nSamples - start)
+            if stiffness:
+                self.factorize(self.sampleStiffness(rng))
+            elif self.K_fp is None:
+                self.factorize(T["baseE"][T["elemMaterials"]]*T["baseA"][T["elemSections"]])
+
+            # Bloco de vetores de forças (fatores por GL ou um fator comum por amostra)
+            F = np.repeat(T["F"][:, None], m, axis=1)
+            if options["loads"] is not None:
+                size = m if options["loads"].get("correlated", False) else (self.nGL, m)
+                F *= sampleFactors(rng, options["loads"], size)
+
+            U = np.zeros((self.nGL, m))
+            U[T["pDOFs"]] = T["uP"][:, None]
+            U[T["fDOFs"]] = self.solver.solve(F[T["fDOFs"]] - (self.K_fp @ T["uP"])[:, None])
+            N = (self.EA/T["L"])[:, None]*elongations(T["DOFs"], T["cossines"], U)
+
+            failed = statsU.update(U) | statsN.update(N)
+            failures += int(failed.sum())
+        return statsU, statsN, failures, self.nFactorizations - factorizations
+
+
+# Sistema do processo do pool (criado pelo inicializador a partir da memória compartilhada)
+_SYSTEM: MonteCarloSystem = None
+
+def attachSystem(specs: dict, options: dict):
+    """
+    Inicializador dos processos do pool: mapeia as tabelas da memória compartilhada (sem cópia) e monta o sistema
+    """
+    global _SYSTEM
+    blocks = {name: shared_memory.SharedMemory(name=shm) for name, (shm, _, _) in specs.items()}
+    tables = {name: np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf) for name, (_, shape, dtype) in specs.items()}
+    _SYSTEM = MonteCarloSystem(tables, options)
+    _SYSTEM.blocks = blocks                                 # Mantém os blocos mapeados enquanto o processo existir
+
+def runShared(task: tuple):
+    return _SYSTEM.run(*task)
+
+
+class MonteCarloAnalysis:
+    """
+    Análise de confiabilidade por simulação de Monte Carlo de uma estrutura (Truss2D ou Truss3D) com ações nodais,
+    módulos de elasticidade e áreas aleatórios.
+
+    As amostras são divididas em lotes (batchSize), cada um com a sua semente (derivada da semente da análise:
+    os resultados independem do número de processos). Em um lote, cada realização da rigidez é fatorada uma vez e
+    resolvida para um bloco de samplesPerStiffness vetores de forças; com a rigidez determinística, todas as
+    amostras do lote formam um único bloco e a fatoração é mantida entre os lotes. Com workers > 1, os lotes são
+    distribuídos em um pool de processos que mapeiam a geometria (tabelas da estrutura) em memória compartilhada.
+    As estatísticas dos deslocamentos e dos esforços normais (média, variância, extremos e excedências dos
+    limites) são acumuladas por lote, sem armazenar as amostras
+    """
+    def __init__(self, structure, nSamples: int = 1000, loads: dict = None, moduli: dict = None, areas: dict = None,
+                 displacementLimit=None, forceLimit=None, seed: int = None, batchSize: int = 256,
+                 samplesPerStiffness: int = 1, workers: int = None):
+        """
+        structure: estrutura com as ações nodais e os apoios definidos (os casos de carregamento não são considerados)
+        nSamples: número de amostras
+        loads: fatores aleatórios das ações nodais {"cov", "distribution", "correlated"}: correlated aplica um
+               fator comum a todas as ações da amostra (padrão: um fator independente por GL)
+        moduli, areas: fatores aleatórios dos módulos e das áreas {"cov", "distribution", "perElement"}: por padrão,
+                       um fator por material ou seção; perElement sorteia um fator por elemento
+        displacementLimit, forceLimit: limites dos valores absolutos dos deslocamentos (por GL, numeração original)
+                                       e dos esforços normais (por elemento); a falha é a excedência de algum limite
+        seed: semente do gerador de números aleatórios
+        batchSize: número de amostras por lote (tarefa do pool)
+        samplesPerStiffness: amostras das ações resolvidas com cada realização da rigidez (amostragem em dois
+                             níveis: valores maiores reduzem as fatorações, mas as amostras de um bloco
+                             compartilham os módulos e as áreas)
+        workers: número de processos (None ou 1: execução no processo atual)
+        """
+        if structure.nLoadCases > 0:
+            raise ValueError("A análise de Monte Carlo não admite casos de carregamento")
+        if nSamples < 1 or batchSize < 1 or samplesPerStiffness < 1:
+            raise ValueError("Os números de amostras, de amostras por lote e por rigidez devem ser positivos")
+        self.structure = structure
+        self.nSamples = nSamples
+        self.seed = seed
+        self.batchSize = batchSize
+        self.workers = workers
+        S = structure
+        self.options = {"loads": checkSpec(loads, "as ações"), "moduli": checkSpec(moduli, "os módulos"),
+                        "areas": checkSpec(areas, "as áreas"), "samplesPerStiffness": samplesPerStiffness,
+                        "displacementLimit": None if displacementLimit is None else S.internalOrder(
+                            np.broadcast_to(np.asarray(displacementLimit, dtype=float), (S.nGL,)).copy()),
+                        "forceLimit": forceLimit, "solver": S.solver.spec()}
+
+    def defineTables(self) -> dict:
+        """
+        Tabelas da estrutura utilizadas pelos sistemas (geometria, partição dos GLs e forças de referência)
+        """
+        S = self.structure
+        S.defineBoundaryDOFs()
+        S.definePartition()
+        springs = np.zeros(S.fDOFs.size)
+        np.add.at(springs, S.flexPos, S.flexValues)
+        table = S.elemTable
+        return {"DOFs": table.DOFs, "cossines": table.cossines, "L": table.L, "elemMaterials": S.elemMaterials,
+                "elemSections": S.elemSections, "baseE": np.array([material.E for material in S.materials], dtype=float),
+                "baseA": np.array([section.Ax for section in S.sections], dtype=float),
+                "F": S.dofArray(S.nodalForces).copy(), "fDOFs": S.fDOFs, "pDOFs": S.pDOFs, "uP": S.uP, "springs": springs}
+
+    def tasks(self) -> list[tuple]:
+        """
+        Lotes de amostras (semente e número de amostras)
+        """
+        sizes = [min(self.batchSize, self.nSamples - start) for start in range(0, self.nSamples, self.batchSize)]
+        return list(zip(np.random.SeedSequence(self.seed).spawn(len(sizes)), sizes))
+
+    def run(self) -> dict:
+        """
+        Executa a simulação e retorna o relatório (ver report)
+        """
+        start = time.perf_counter()
+        tables = self.defineTables()
+        S = self.structure
+        self.statsU = RunningStatistics(S.nGL, self.options["displacementLimit"])
+        self.statsN = RunningStatistics(S.nElem, self.options["forceLimit"])
+        self.failures = 0
+        self.nFactorizations = 0
+
+        if self.workers is None or self.workers <= 1:
+            system = MonteCarloSystem(tables, self.options)
+            results = (system.run(*task) for task in self.tasks())
+            self.accumulate(results)
+        else:
+            # Tabelas copiadas uma única vez para a memória compartilhada, mapeadas pelos processos do pool
+            blocks = {}
+            try:
+                specs = {}
+                for name in SHARED_TABLES:
+                    array = np.ascontiguousarray(tables[name])
+                    blocks[name] = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                    np.ndarray(array.shape, dtype=array.dtype, buffer=blocks[name].buf)[...] = array
+                    specs[name] = (blocks[name].name, array.shape, array.dtype.str)
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=attachSystem,
+                                         initargs=(specs, self.options)) as pool:
+                    self.accumulate(pool.map(runShared, self.tasks()))
+            finally:
+                for block in blocks.values():
+                    block.close()
+                    block.unlink()
+
+        self.totalTime = time.perf_counter() - start
+        return self.report()
+
+    def accumulate(self, results):
+        """
+        Combina as estatísticas dos lotes, na ordem dos lotes
+        """
+        for statsU, statsN, failures, factorizations in results:
+            self.statsU.merge(statsU)
+            self.statsN.merge(statsN)
+            self.failures += failures
+            self.nFactorizations += factorizations
+
+    def report(self) -> dict:
+        """
+        Probabilidade de falha (com o seu erro padrão) e estatísticas dos deslocamentos (numeração original dos
+        GLs) e dos esforços normais
+        """
+        S = self.structure
+        n = self.statsU.count
+        pf = self.failures/n
+        return {"nSamples": n, "seed": self.seed, "failures": self.failures, "failureProbability": pf,
+                "standardError": float(np.sqrt(pf*(1 - pf)/n)), "nFactorizations": self.nFactorizations,
+                "totalTime [s]": self.totalTime,
+                "NodalDisplacements": self.statsU.report(S.userOrder), "Normal": self.statsN.report()}
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import DataReader
+
+CACHE_VERSION = 1       # Versão do formato das entradas (invalida o cache quando alterada)
+
+# Tabelas do modelo (ver DataReader.ModelToArrays) que definem a matriz de rigidez e as ações
+STIFFNESS_TABLES = ("nodeIds", "nodeCoords", "elemIds", "elemNodes", "elemMaterial", "elemSection", "materialIds",
+                    "materialE", "sectionIds", "sectionArea", "supportNodes", "supportCodes", "supportValues")
+LOAD_TABLES = ("loadNodes", "loadForces", "caseNames", "caseLoadCase", "caseLoadNodes", "caseLoadForces",
+               "comboNames", "comboFactors")
+
+
+def normalizeTables(arrays) -> dict:
+    """
+    Ordena as tabelas do modelo pelas IDs (nós, elementos, materiais, seções, apoios e ações nodais), de modo que
+    modelos iguais escritos em outra ordem tenham a mesma representação
+    """
+    tables = {name: np.asarray(arrays[name]) for name in STIFFNESS_TABLES + LOAD_TABLES if name in arrays}
+    groups = (("nodeIds", ("nodeCoords",)), ("elemIds", ("elemNodes", "elemMaterial", "elemSection")),
+              ("materialIds", ("materialE",)), ("sectionIds", ("sectionArea",)),
+              ("supportNodes", ("supportCodes", "supportValues")), ("loadNodes", ("loadForces",)))
+    for key, columns in groups:
+        order = np.argsort(tables[key], kind="stable")
+        for name in (key,) + columns:
+            tables[name] = tables[name][order]
+    if "caseLoadCase" in tables:
+        order = np.lexsort((tables["caseLoadNodes"], tables["caseLoadCase"]))
+        for name in ("caseLoadCase", "caseLoadNodes", "caseLoadForces"):
+            tables[name] = tables[name][order]
+    return tables
+
+def hashTables(tables: dict, names) -> str:
+    """
+    Hash SHA-256 do conteúdo (nome, tipo, forma e bytes) das tabelas indicadas
+    """
+    digest = hashlib.sha256()
+    for name in names:
+        if name not in tables:
+            continue
+        array = tables[name]
+        if array.dtype.kind == "f":
+            array = array.astype(np.float64) + 0.0        # Unifica o tipo e o sinal do zero
+        elif array.dtype.kind in "iub":
+            array = array.astype(np.int64)
+        array = np.ascontiguousarray(array)
+        digest.update(f"{name}|{array.dtype.str}|{array.shape}|".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+def hashModel(data: dict) -> tuple[str, str]:
+    """
+    Hashes do modelo normalizado: da parte que define a matriz de rigidez (geometria, materiais, seções e apoios)
+    e das ações nodais (incluindo casos de carregamento e combinações)
+    """
+    arrays = data["arrays"] if "arrays" in data else DataReader.ModelToArrays(data)
+    tables = normalizeTables(arrays)
+    stiffness = hashTables(tables, STIFFNESS_TABLES)
+    return hashlib.sha256(f"{data['typeStructure']}|{stiffness}".encode()).hexdigest(), hashTables(tables, LOAD_TABLES)
+
+def hashKey(*parts) -> str:
+    """
+    Chave SHA-256 a partir de partes serializáveis em JSON
+    """
+    return hashlib.sha256(json.dumps([CACHE_VERSION, *parts], sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache em disco de resultados de análises (e, opcionalmente, de fatorações) endereçado pelo conteúdo do modelo.
+    Cada entrada é um arquivo nomeado pela chave; a ordem de uso é dada pela data de modificação dos arquivos,
+    atualizada a cada acerto, e as entradas menos usadas recentemente são removidas quando o tamanho total
+    excede o limite
+    """
+    def __init__(self, dir: str, maxSize: float = 1024, storeFactorizations: bool = False):
+        """
+        dir: diretório do cache
+        maxSize: tamanho máximo do cache [MB]
+        storeFactorizations: armazena também as fatorações da matriz de rigidez (resolvedores LU esparsos)
+        """
+        self.dir = dir
+        self.maxSize = maxSize
+        self.storeFactorizations = storeFactorizations
+        os.makedirs(dir, exist_ok=True)
+
+        self.hits = 0                   # Resultados encontrados no cache
+        self.misses = 0                 # Resultados não encontrados
+        self.factorHits = 0             # Fatorações encontradas no cache
+        self.factorMisses = 0           # Fatorações não encontradas
+        self.evictions = 0              # Entradas removidas pelo limite de tamanho
+
+    def path(self, key: str, extension: str) -> str:
+        return os.path.join(self.dir, key + extension)
+
+    def touch(self, dir: str):
+        """
+        Marca a entrada como usada recentemente
+        """
+        try:
+            os.utime(dir)
+        except OSError:
+            pass
+
+    def write(self, dir: str, writer):
+        """
+        Grava um arquivo do cache de forma atômica (arquivo temporário renomeado), permitindo processos concorrentes
+        """
+        handle, temp = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        os.close(handle)
+        try:
+            writer(temp)
+            os.replace(temp, dir)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def getResults(self, key: str, withMatrices: bool = False) -> dict:
+        """
+        Resultados armazenados para a chave: {"output": dicionário de saída, "matrices": arquivo das matrizes ou None}
+        withMatrices: exige o arquivo das matrizes (perfil "full")
+        """
+        dir = self.path(key, ".json");     matrices = self.path(key, ".npz")
+        try:
+            if withMatrices and not os.path.exists(matrices):
+                raise FileNotFoundError(matrices)
+            with open(dir, 'r') as file:
+                output = json.load(file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.touch(dir)
+        if withMatrices:
+            self.touch(matrices)
+        return {"output": output, "matrices": matrices if withMatrices else None}
+
+    def putResults(self, key: str, output: dict, matrices: dict = None):
+        """
+        Armazena os resultados (e as matrizes do perfil "full") de uma análise
+        """
+        if matrices is not None:
+            def writer(temp):
+                with open(temp, 'wb') as file:
+                    DataReader.WriteMatrices(file, matrices)
+            self.write(self.path(key, ".npz"), writer)
+        self.write(self.path(key, ".json"), lambda temp: DataReader.WriteData(temp, output, compact=True))
+        self.evict()
+
+    def getFactor(self, key: str) -> dict:
+        """
+        Fatoração armazenada para a chave (arrays exportados pelo resolvedor)
+        """
+        import scipy.sparse as sp
+        dir = self.path(key, ".factor.npz")
+        try:
+            with np.load(dir) as file:
+                arrays = {}
+                for name in ("L", "U"):
+                    arrays[name] = sp.csr_matrix((file[name + "_data"], file[name + "_indices"], file[name + "_indptr"]),
+                                                 shape=tuple(file[name + "_shape"]))
+                arrays["perm_r"] = file["perm_r"];  arrays["perm_c"] = file["perm_c"]
+        except (OSError, ValueError, KeyError):
+            self.factorMisses += 1
+            return None
+        self.factorHits += 1
+        self.touch(dir)
+        return arrays
+
+    def putFactor(self, key: str, arrays: dict):
+        """
+        Armazena a fatoração exportada pelo resolvedor
+        """
+        import scipy.sparse as sp
+        data = {"perm_r": arrays["perm_r"], "perm_c": arrays["perm_c"]}
+        for name in ("L", "U"):
+            matrix = sp.csr_matrix(arrays[name])
+            data.update({name + "_data": matrix.data, name + "_indices": matrix.indices,
+                         name + "_indptr": matrix.indptr, name + "_shape": np.array(matrix.shape)})
+        def writer(temp):
+            with open(temp, 'wb') as file:
+                np.savez(file, **data)
+        self.write(self.path(key, ".factor.npz"), writer)
+        self.evict()
+
+    def size(self) -> int:
+        """
+        Tamanho total das entradas do cache [bytes]
+        """
+        return sum(entry.stat().st_size for entry in os.scandir(self.dir) if entry.is_file() and not entry.name.endswith(".tmp"))
+
+    def evict(self):
+        """
+        Remove as entradas menos usadas recentemente até que o cache respeite o tamanho máximo
+        """
+        entries = []
+        for entry in os.scandir(self.dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, dir in sorted(entries):
+            if total <= self.maxSize*2**20:
+                break
+            try:
+                os.remove(dir)
+                self.evictions += 1
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """
+        Remove todas as entradas do cache
+        """
+        for entry in os.scandir(self.dir):
+            if entry.is_file():
+                os.remove(entry.path)
+
+    def info(self) -> dict:
+        """
+        Contadores de acertos e faltas e ocupação do cache
+        """
+        return {"hits": self.hits, "misses": self.misses, "factorHits": self.factorHits,
+                "factorMisses": self.factorMisses, "evictions": self.evictions,
+                "size [MB]": self.size()/2**20, "maxSize [MB]": self.maxSize}
+
@@ -2,75 +2,242 @@
 import numpy as np
 import DataReader
 import os
-from Classes import Node, Elem, Material, Section
-from PrintStructure import plotStructure
+import shutil
+import Solvers
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+from Instrumentation import PhaseRecorder
+from Solvers import isSparse
+from Classes import Node, NodeTable, Elem, ElementTable, Material, Section, GL_PER_NODE
+
+# O núcleo da análise depende apenas do NumPy: o SciPy (armazenamento esparso, renumeração), as análises
+# adicionais, o cache e a plotagem (matplotlib) são importados apenas quando utilizados
+if TYPE_CHECKING:
+    from Session import AnalysisSession
+    from Nonlinear import NonlinearAnalysis
+    from Parametric import ParametricStudy
+    from Reliability import MonteCarloAnalysis
+    from MovingLoads import MovingLoadAnalysis
+    from ResultCache import ResultCache
+
+OUTPUT_PROFILES = ("legacy", "full", "summary")     # Perfis de saída de resultados
+RENUMBERINGS = ("none", "rcm")                      # Métodos de renumeração dos nós
 
 class Truss2D:
-    def __init__(self, data):
-        self.type = "Truss2D"
-        self.nMinRest = 3
-        self.GLpE = 2
-        self.defineNodes(data["nodes"])
-        self.defineNodalLoads(data["nodalLoads"])
-        self.defineRestrictions(data["restrictions"])
-        self.defineMaterials(data["material"])
-        self.defineSections(data["sectionProp"])
-        self.defineElements(data["elements"])
+    type = "Truss2D"            # Tipo de análise
+    nMinRest = 3                # Número mínimo de restrições
+    GLpE = GL_PER_NODE[type]    # Número de graus de liberdade por nó
+
+    def __init__(self, data, storage: str = None, solver = None, bcMethod: str = None, recorder: PhaseRecorder = None,
+                 renumbering: str = None):
+        self.recorder = recorder                                # Registrador de fases (instrumentação opcional)
+        self.nonlinear: "NonlinearAnalysis" = None              # Análise não linear (ver solveNonlinear)
+        self.reliability: "MonteCarloAnalysis" = None           # Análise de confiabilidade (ver solveReliability)
+        self.movingLoads: "MovingLoadAnalysis" = None           # Linhas de influência e envoltórias (ver solveMovingLoads)
+        self.stability: dict = None                             # Relatório da verificação de estabilidade (ver checkStability)
+        self.storage = storage or data.get("storage", "dense")   # Armazenamento da matriz de rigidez ("dense" ou "sparse")
+        if self.storage not in ("dense", "sparse"):
+            raise ValueError(f"Tipo de armazenamento desconhecido: '{self.storage}'")
+        self.bcMethod = bcMethod or data.get("bcMethod", "penalty")   # Aplicação das CC ("penalty" ou "partition")
+        if self.bcMethod not in ("penalty", "partition"):
+            raise ValueError(f"Método de aplicação das condições de contorno desconhecido: '{self.bcMethod}'")
+        self.solver = Solvers.defineSolver(solver or data.get("solver"), self.storage)   # Resolvedor do sistema linear
+        # O método das penalidades denso não elimina as colunas dos GLs prescritos (a matriz deixa de ser simétrica)
+        if self.solver.name == "pcg" and self.storage == "dense" and self.bcMethod == "penalty":
+            raise ValueError("O resolvedor PCG exige uma matriz simétrica: utilize o armazenamento esparso "
+                             "ou o particionamento das condições de contorno")
+        self.renumbering = renumbering or data.get("renumbering", "none")    # Renumeração dos nós ("none" ou "rcm")
+        if self.renumbering not in RENUMBERINGS:
+            raise ValueError(f"Método de renumeração desconhecido: '{self.renumbering}'")
+        if "arrays" in data:
+            # Modelo binário: as tabelas são utilizadas diretamente, sem criar um objeto por nó ou elemento
+            self.defineFromArrays(data["arrays"])
+        else:
+            self.defineNodes(data["nodes"])
+            self.defineNodalLoads(data.get("nodalLoads", []))
+            self.defineRestrictions(data["restrictions"])
+            self.defineLoadCases(data.get("loadCases", []), data.get("loadCombinations", []))
+            self.defineMaterials(data["material"])
+            self.defineSections(data["sectionProp"])
+            with self.phase("elements") as stats:
+                self.defineElements(data["elements"])
+                stats["nElem"] = self.nElem
+        with self.phase("renumbering") as stats:
+            self.defineRenumbering()
+            stats.update(self.renumberingReport)
+
+    def defineFromArrays(self, arrays):
+        """
+        Define a estrutura a partir das tabelas do modelo binário (ver DataReader.ModelToArrays)
+        """
+        self.defineNodeTable(arrays["nodeIds"], arrays["nodeCoords"])
+        self.defineLoadTable(arrays["loadNodes"], arrays["loadForces"])
+        self.defineSupportTable(arrays["supportNodes"], arrays["supportCodes"], arrays["supportValues"])
+
+        # Casos de carregamento com as ações nodais em arrays
+        loadCases = [];     loadCombinations = []
+        if "caseNames" in arrays:
+            caseLoadCase = np.asarray(arrays["caseLoadCase"])
+            for c, name in enumerate(arrays["caseNames"].tolist()):
+                rows = caseLoadCase == c
+                loadCases.append({"name": name, "nodalLoads": {"no": arrays["caseLoadNodes"][rows],
+                                                               "forcas": arrays["caseLoadForces"][rows]}})
+            caseNames = [loadCase["name"] for loadCase in loadCases]
+            for name, factors in zip(arrays["comboNames"].tolist(), arrays["comboFactors"]):
+                loadCombinations.append({"name": name, "factors": {caseNames[c]: float(factors[c])
+                                                                   for c in np.flatnonzero(factors)}})
+        self.defineLoadCases(loadCases, loadCombinations)
+
+        self.defineMaterials([{"id": id, "modulo_elasticidade": E}
+                              for id, E in zip(arrays["materialIds"].tolist(), arrays["materialE"].tolist())])
+        self.defineSections([{"id": id, "area": area}
+                             for id, area in zip(arrays["sectionIds"].tolist(), arrays["sectionArea"].tolist())])
+        with self.phase("elements") as stats:
+            elemNodes = self.nodeTable.index(arrays["elemNodes"])
+            self.defineElementTable(arrays["elemIds"], elemNodes[:, 0], elemNodes[:, 1],
+                                    np.asarray(arrays["elemMaterial"]) - 1, np.asarray(arrays["elemSection"]) - 1)
+            stats["nElem"] = self.nElem
+
+    def phase(self, name: str):
+        """
+        Contexto de medição de uma fase da análise (sem efeito quando a instrumentação não está ativa)
+        """
+        if self.recorder is None:
+            return nullcontext({})
+        return self.recorder.phase(name)
+
+    def countNonzeros(self, matrix) -> int:
+        """
+        Número de coeficientes não nulos de uma matriz densa ou esparsa
+        """
+        return int(matrix.nnz) if isSparse(matrix) else int(np.count_nonzero(matrix))
 
     def verifyRestrictions(self):
         """
-        Verifica a estaticidade da estrutura
+        Verifica se a estrutura é estável com os apoios atuais (ver checkStability)
         """
-        if self.nRestrictions >= self.nMinRest:
-            return True
-        else:
-            return False
+        return self.checkStability()["stable"]
+
+    def checkStability(self, **options) -> dict:
+        """
+        Verifica a estabilidade da estrutura antes da montagem e da fatoração, com as opções de
+        Stability.StabilityAnalysis: número de mecanismos, nós e GLs que os formam e estimativa do número de condição
+        """
+        from Stability import StabilityAnalysis
+        with self.phase("stability") as stats:
+            self.stability = StabilityAnalysis(self, **options).run()
+            stats.update({key: self.stability[key] for key in ("stable", "method", "nMechanisms")})
+        return self.stability
 
     def defineNodes(self, Nodes):
         """
         Define os nós da treliça
         """
-        # Cria a lista vazia
-        self.nodes: list[Node] = []
-        # Percorre a lista de nós
-        for node in Nodes:
-            # Cria um nó
-            self.nodes.append(Node(node["id"],node["coordenadas"]))
+        ids = np.array([node["id"] for node in Nodes], dtype=np.int64)
+        coords = np.array([node["coordenadas"] for node in Nodes], dtype=float)
+        self.defineNodeTable(ids, coords)
+
+    def defineNodeTable(self, ids, coords):
+        """
+        Define a tabela de nós (IDs, coordenadas, apoios e ações nodais em arrays, ver Classes.NodeTable).
+        Os IDs não precisam ser contíguos: as referências aos nós são convertidas em posições por nodeTable.index
+        """
+        coords = np.asarray(coords, dtype=float)
+        if coords.ndim != 2 or coords.shape[1] != self.GLpE:
+            raise ValueError(f"A análise {self.type} exige {self.GLpE} coordenadas por nó")
+        self.nodeTable = NodeTable(ids, coords)                         # Tabela de nós
+
+        # Atalhos para os arrays da tabela (alterados sempre no próprio array)
+        table = self.nodeTable
+        self.nodeIds = table.ids                        # IDs dos nós
+        self.coords = table.coords                      # Coordenadas dos nós (nNodes x dimensão)
+        self.supportCodes = table.supportCodes          # Tipo de apoio por GL (DataReader.SUPPORT_TYPES)
+        self.supportValues = table.supportValues        # Deslocamento prescrito ou rigidez da mola por GL
+        self.hasSupport = table.hasSupport              # Nós com restrições definidas
+        self.nodalForces = table.forces                 # Ações nodais por GL
+        self.hasLoad = table.hasLoad                    # Nós com ações nodais definidas
         # Número total de nós
-        self.nNodes = len(self.nodes)
+        self.nNodes = self.nodeIds.size
         # Número total de graus de liberdade
-        self.nGL = self.nNodes*2
+        self.nGL = self.nNodes*self.GLpE
+        self.nRestrictions = 0
+
+        # Numeração dos GLs: GL do nó i na direção j (a numeração original é nGLpN.i + j, ver defineRenumbering)
+        self.nodeDOFs = np.arange(self.nGL).reshape(self.nNodes, self.GLpE)
+        self.userDOFs = np.arange(self.nGL)                 # GL da numeração original de cada GL interno
+
+    @property
+    def nodes(self) -> NodeTable:
+        """
+        Nós da estrutura: sequência de visões (Node) sobre a tabela de nós, criadas apenas quando acessadas
+        """
+        return self.nodeTable
+
+    def node(self, id: int) -> Node:
+        """
+        Nó com o ID indicado
+        """
+        return self.nodeTable.node(id)
 
     def defineRestrictions(self, Restrictions):
         """
-        Define as ações nodais na estrutura
+        Define as restrições nodais da estrutura
         """
-        # Número total de restrições
-        self.nRestrictions = 0
+        self.defineSupportTable(*DataReader.RestrictionsToArrays(Restrictions, self.GLpE))
+
+    def defineSupportTable(self, nodes, codes, values):
+        """
+        Define os apoios a partir dos arrays de IDs dos nós, códigos dos apoios por GL e valores por GL
+        """
+        index = self.nodeTable.index(nodes)
+        self.supportCodes[index] = codes                                # Atribui os tipos de restrição aos nós
+        self.supportValues[index] = values                              # Deslocamentos prescritos e rigidezes das molas
+        self.hasSupport[index] = True                                   # Flag de apoios
+        self.nRestrictions = int(np.count_nonzero(self.supportCodes))   # Número total de restrições
+
+    def removeSupports(self, nodes):
+        """
+        Remove todas as restrições dos nós indicados (IDs)
+        """
+        index = self.nodeTable.index(nodes)
+        self.supportCodes[index] = 0
+        self.supportValues[index] = 0
+        self.hasSupport[index] = False
+        self.nRestrictions = int(np.count_nonzero(self.supportCodes))
 
-        # Adiciona restrições aos nós
-        for restrict in Restrictions:
-            self.nodes[restrict["no"]-1].restrictions = restrict["restricoes"]  # Atribui as restrições ao nó
-            self.nodes[restrict["no"]-1].typeRestrictions = restrict["types"]   # Especifica o tipo de restrição
-            self.nodes[restrict["no"]-1].flagRestrictions = True                # Flag de apoios
-            contPresc = 0;  contFlex = 0
-            for i,type in enumerate(self.nodes[restrict["no"]-1].typeRestrictions):
-                if self.nodes[restrict["no"]-1].restrictions[i] == 1:
-                    if type == "prescrible":
-                        self.nodes[restrict["no"]-1].prescDisp.append(restrict["prescrible"][contPresc])
-                        contPresc += 1
-                    elif type == "flexible":
-                        self.nodes[restrict["no"]-1].flexibleSupports.append(restrict["flexible"][contFlex])
-                        contFlex += 1
-            self.nRestrictions += np.sum(restrict["restricoes"])                # Adiciona um GL ao contador
-            
     def defineNodalLoads(self, NodalLoads):
         """
         Define as ações nodais na estrutura
         """
-        # Adiciona as ações nodais aos nós
-        for load in NodalLoads:                                     # Percorre os carregamentos definidos
-            self.nodes[load["no"]-1].nodalLoads = load["forcas"]    # Vincula os carregamentos às forças
+        self.defineLoadTable(*DataReader.NodalLoadsToArrays(NodalLoads, self.GLpE))
+
+    def defineLoadTable(self, nodes, forces):
+        """
+        Define as ações nodais a partir dos arrays de IDs dos nós e forças por GL
+        """
+        index = self.nodeTable.index(nodes)
+        self.nodalForces[index] = forces                                # Vincula os carregamentos aos nós
+        self.hasLoad[index] = True
+
+    def defineLoadCases(self, LoadCases, LoadCombinations):
+        """
+        Define os casos de carregamento (cada um com sua lista de ações nodais) e as combinações de casos
+        """
+        self.loadCases: list[dict] = LoadCases                   # Casos de carregamento {"name", "nodalLoads"}
+        self.loadCombinations: list[dict] = LoadCombinations     # Combinações {"name", "factors": {caso: fator}}
+        self.nLoadCases = len(LoadCases)                         # Número de casos de carregamento
+
+        # As ações nodais da estrutura não são combinadas com os casos de carregamento (entrada ambígua)
+        if self.nLoadCases > 0 and self.hasLoad.any():
+            raise ValueError("O modelo define ações nodais (nodalLoads) e casos de carregamento (loadCases): "
+                             "inclua as ações nodais em um dos casos")
+
+        # Verifica se as combinações referenciam casos definidos
+        names = [loadCase["name"] for loadCase in LoadCases]
+        for combination in LoadCombinations:
+            for name in combination["factors"]:
+                if name not in names:
+                    raise ValueError(f"A combinação '{combination['name']}' referencia o caso inexistente '{name}'")
 
     def defineMaterials(self, Materials):
         """
@@ -98,20 +265,109 @@ class Truss2D:
 
     def defineElements(self, Elements):
         """
-        Define os elementos da estrutura
+        Define os elementos da estrutura a partir da tabela de elementos (cálculo vetorizado)
         """
-        # Cria a lista vazia
-        self.elements: list[Elem] = []
-        # Percorre a lista de elementos
-        for element in Elements:
-            # Cria um elemento
-            self.elements.append(Elem(element["id"], self.nodes[element["NI"]-1], self.nodes[element["NF"]-1]
-                                      , self.materials[element["material"]-1], self.sections[element["sectionProp"]-1], self.type))
-        self.nElem = len(self.elements)                 # Número de nelementos
+        # Vetores de conectividade e propriedades dos elementos
+        ids = np.array([element["id"] for element in Elements])
+        NI = self.nodeTable.index(np.array([element["NI"] for element in Elements], dtype=np.int64))
+        NF = self.nodeTable.index(np.array([element["NF"] for element in Elements], dtype=np.int64))
+        matIdx = np.array([element["material"] for element in Elements], dtype=np.int64) - 1
+        secIdx = np.array([element["sectionProp"] for element in Elements], dtype=np.int64) - 1
+        self.defineElementTable(ids, NI, NF, matIdx, secIdx)
+
+    def defineElementTable(self, ids, NI, NF, matIdx, secIdx):
+        """
+        Cria a tabela de elementos (comprimentos, cossenos e matrizes de rigidez em uma única passagem).
+        NI, NF, matIdx, secIdx: índices (base 0) dos nós, materiais e seções dos elementos
+        """
+        self.elemMaterials = np.asarray(matIdx, dtype=np.int64)        # Índices dos materiais dos elementos
+        self.elemSections = np.asarray(secIdx, dtype=np.int64)         # Índices das seções dos elementos
+        E = np.array([material.E for material in self.materials], dtype=float)[self.elemMaterials]
+        A = np.array([section.Ax for section in self.sections], dtype=float)[self.elemSections]
+        self.elemTable = ElementTable(ids, NI, NF, E, A, self.coords, self.GLpE)
+        self.nElem = self.elemTable.nElem               # Número de nelementos
+        self._elements = None
+
+    @property
+    def elements(self) -> list[Elem]:
+        """
+        Lista de elementos da estrutura, criados como visões sobre a tabela de elementos no primeiro acesso
+        """
+        if self._elements is None:
+            table = self.elemTable
+            self._elements = [Elem(id, self.nodes[i], self.nodes[f], self.materials[m], self.sections[s], self.type, table, e)
+                              for e, (id, i, f, m, s) in enumerate(zip(table.ids.tolist(), table.initNodes.tolist(),
+                                                                       table.finalNodes.tolist(), self.elemMaterials.tolist(),
+                                                                       self.elemSections.tolist()))]
+        return self._elements
+
+    def defineRenumbering(self):
+        """
+        Renumera os nós (e os seus GLs) antes da montagem para reduzir a banda e o perfil da matriz de rigidez.
+        "rcm": Cuthill–McKee reverso sobre o grafo de conectividade dos nós. Os resultados de saída permanecem
+        na numeração original (ver userOrder)
+        """
+        before = self.elemTable.bandwidthProfile()
+        if self.renumbering == "rcm":
+            import scipy.sparse as sp
+            from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+            # Grafo de conectividade dos nós (simétrico)
+            graph = sp.coo_matrix((np.ones(2*self.nElem), (np.concatenate((self.elemTable.initNodes, self.elemTable.finalNodes)),
+                                                            np.concatenate((self.elemTable.finalNodes, self.elemTable.initNodes)))),
+                                  shape=(self.nNodes, self.nNodes)).tocsr()
+            order = reverse_cuthill_mckee(graph, symmetric_mode=True)       # Nós na nova ordem
+
+            # Posição de cada nó na nova numeração
+            rank = np.empty(self.nNodes, dtype=np.int64)
+            rank[order] = np.arange(self.nNodes)
+            self.nodeDOFs = rank[:, None]*self.GLpE + np.arange(self.GLpE)
+            self.userDOFs = np.empty(self.nGL, dtype=np.int64)
+            self.userDOFs[self.nodeDOFs.ravel()] = np.arange(self.nGL)
+            self.elemTable.defineDOFs(rank)
+        after = self.elemTable.bandwidthProfile()
+        self.renumberingReport = {"method": self.renumbering, "bandwidth": [before[0], after[0]],
+                                  "profile": [before[1], after[1]]}
+
+    def internalOrder(self, v: np.ndarray) -> np.ndarray:
+        """
+        Converte um vetor (ou matriz de vetores) indexado pelos GLs da numeração original para a numeração interna
+        """
+        if self.renumbering == "none":
+            return v
+        out = np.empty_like(v)
+        out[self.nodeDOFs.ravel()] = v
+        return out
+
+    def dofArray(self, table: np.ndarray) -> np.ndarray:
+        """
+        Converte uma tabela por nó (nNodes x nGLpN) em um vetor indexado pelos GLs internos
+        """
+        return self.internalOrder(np.asarray(table).reshape(self.nGL))
+
+    def userOrder(self, matrix, DOFs: np.ndarray = None, square: bool = False):
+        """
+        Reordena as linhas (e as colunas, se square) de um vetor ou matriz indexado pelos GLs internos DOFs
+        (todos, por padrão) segundo a numeração original dos nós
+        """
+        if self.renumbering == "none":
+            return matrix
+        order = np.argsort(self.userDOFs if DOFs is None else self.userDOFs[DOFs], kind="stable")
+        matrix = matrix[order]
+        return matrix[:, order] if square else matrix
 
     def calculateKGS_Singular(self):
         """
-        Define a matriz de rigidez global singular da estrutura (pura)
+        Define a matriz de rigidez global singular da estrutura (pura) de acordo com o armazenamento escolhido
+        """
+        if self.storage == "sparse":
+            self.calculateKGS_Sparse()
+        else:
+            self.calculateKGS_Dense()
+
+    def calculateKGS_Dense(self):
+        """
+        Define a matriz de rigidez global singular da estrutura (pura) em armazenamento denso
         """
         # Cria a matriz vazia
         self.KGS_Singular = np.zeros((self.nGL, self.nGL))
@@ -120,6 +376,25 @@ class Truss2D:
             element.calculateKGE(self.nGL)              # Calcula a matriz de rigidez global do elemento
             self.KGS_Singular += element.KGE                     # Adiciona a contribuição da KGE do elemento para a KGS
 
+    def calculateKGS_Sparse(self):
+        """
+        Define a matriz de rigidez global singular da estrutura (pura) em armazenamento esparso (CSR),
+        espalhando a Klocal de cada elemento diretamente nos GLs globais
+        """
+        import scipy.sparse as sp
+
+        # Número de GLs por elemento
+        nGLE = 2*self.GLpE
+        DOFs = self.elemTable.DOFs
+
+        # Cria os vetores de triplets (linha, coluna, valor) a partir do mapa de GLs de todos os elementos
+        rows = np.repeat(DOFs, nGLE, axis=1).ravel()        # Linhas da Klocal nos GLs globais
+        cols = np.tile(DOFs, (1, nGLE)).ravel()             # Colunas da Klocal nos GLs globais
+        vals = self.elemTable.Klocal.ravel()                # Coeficientes da Klocal
+
+        # Monta a matriz (os triplets repetidos são somados na conversão)
+        self.KGS_Singular = sp.coo_matrix((vals, (rows, cols)), shape=(self.nGL, self.nGL)).tocsr()
+
     # def calculateKGS(self):
     #     """
     #     Define a matriz de rigidez global (considerando possíveis apoios flexíveis)
@@ -142,17 +417,98 @@ class Truss2D:
         """
         Define o vetor de forças nodais global
         """
-        # Cria o vetor de forças nodais global
-        self.GForcesV = np.zeros(self.nGL)
-        # Percorre os nós da estrutura
-        for i, node in enumerate(self.nodes):
-            if node.nodalLoads != None:
-                for j in range(self.GLpE):
-                    self.GForcesV[self.GLpE*i+j] = node.nodalLoads[j]    # Atribui a ação nodal
+        # Cria o vetor de forças nodais global a partir da tabela de ações nodais
+        self.GForcesV = self.dofArray(self.nodalForces).copy()
+
+    def assembleLoadVector(self, NodalLoads) -> np.ndarray:
+        """
+        Monta o vetor de forças nodais global a partir de uma lista de ações nodais (ou dos arrays {"no", "forcas"})
+        """
+        F = np.zeros(self.nGL)
+        if isinstance(NodalLoads, dict):
+            # Ações nodais em arrays (modelo binário)
+            np.add.at(F, self.nodeDOFs[self.nodeTable.index(NodalLoads["no"])], NodalLoads["forcas"])
+            return F
+        for load in NodalLoads:
+            F[self.nodeDOFs[self.nodeTable.index(load["no"])]] += load["forcas"]
+        return F
+
+    def defineLoadCaseForces(self):
+        """
+        Define a matriz de forças nodais (nGL x nº de casos + nº de combinações), uma coluna por caso ou combinação
+        """
+        # Forças dos casos de carregamento
+        caseForces = [self.assembleLoadVector(loadCase["nodalLoads"]) for loadCase in self.loadCases]
+        names = [loadCase["name"] for loadCase in self.loadCases]
+
+        # Forças das combinações (combinação linear das forças dos casos)
+        comboForces = []
+        for combination in self.loadCombinations:
+            F = np.zeros(self.nGL)
+            for name, factor in combination["factors"].items():
+                F += factor*caseForces[names.index(name)]
+            comboForces.append(F)
+
+        self.loadCaseNames = names + [combination["name"] for combination in self.loadCombinations]
+        self.loadCaseForces = np.column_stack(caseForces + comboForces)
+
+    def broadcastRHS(self, v: np.ndarray) -> np.ndarray:
+        """
+        Ajusta um vetor indexado por GLs à forma do vetor (ou matriz de casos) de forças
+        """
+        return v if self.GForcesV.ndim == 1 else v[:, None]
+
+    def defineBoundaryDOFs(self):
+        """
+        Define os vetores de GLs restringidos por tipo de apoio (fixo, prescrito e flexível)
+        """
+        # Códigos e valores dos apoios de todos os GLs (GL = nGLpN.índice do nó + direção)
+        codes = self.dofArray(self.supportCodes);     values = self.dofArray(self.supportValues)
+
+        self.fixDOFs = np.flatnonzero(codes == DataReader.SUPPORT_TYPES.index("fix"))          # GLs fixos
+        self.prescDOFs = np.flatnonzero(codes == DataReader.SUPPORT_TYPES.index("prescrible")) # GLs com deslocamento prescrito
+        self.prescValues = values[self.prescDOFs]                                             # Deslocamentos prescritos
+        self.flexDOFs = np.flatnonzero(codes == DataReader.SUPPORT_TYPES.index("flexible"))    # GLs com apoio flexível
+        self.flexValues = values[self.flexDOFs]                                               # Rigidezes dos apoios flexíveis
+        self.restrDOFs = np.sort(np.concatenate((self.fixDOFs, self.prescDOFs, self.flexDOFs)))    # Todos os GLs restringidos
 
     def calcStruture(self):
         """
-        Calcula a estrutura definindo a matriz de rigidez global da estrutura e o vetor de ações nodais aplicados nas condições de contorno e utilizando o método das penalidades
+        Calcula a estrutura aplicando as condições de contorno na matriz de rigidez global e no vetor de ações nodais
+        e resolvendo o sistema resultante
+        """
+        # Aplica as condições de contorno
+        self.applyBoundaryConditions()
+
+        # Resolve o sistema
+        self.solveSystem()
+
+    def applyBoundaryConditions(self):
+        """
+        Aplica as condições de contorno segundo o método (penalidades ou particionamento) e o armazenamento escolhidos
+        """
+        # Define os GLs restringidos
+        self.defineBoundaryDOFs()
+
+        if self.bcMethod == "partition":
+            self.applyBoundaryConditionsPartitioned()
+        elif self.storage == "sparse":
+            self.applyBoundaryConditionsSparse()
+        else:
+            self.applyBoundaryConditionsDense()
+
+    def solveSystem(self):
+        """
+        Resolve o sistema de equações com as condições de contorno aplicadas
+        """
+        if self.bcMethod == "partition":
+            self.solvePartitioned()
+        else:
+            self.nodalDisp = self.solver.factorizeAndSolve(self.KGS_CC, self.GForcesV_CC)
+
+    def applyBoundaryConditionsDense(self):
+        """
+        Aplica as condições de contorno na matriz de rigidez densa utilizando o método das penalidades
         """
         # Replica a matriz de rigidez da estrutura
         self.KGS_CC = self.KGS_Singular.copy()
@@ -160,88 +516,263 @@ class Truss2D:
         # Replica o vetor de forças nodais da estrutura
         self.GForcesV_CC = self.GForcesV.copy()
 
-        # Aplica as condições de contorno
-        for i, node in enumerate(self.nodes):                                               # Percorre os nós
-            if node.flagRestrictions == True:                                                     # Verifica se há restrições
-                for j in range(self.GLpE):                                                  # Percorre os Graus de Liberdade do nó 
-                    contPresc = 0;  contFlex = 0                                            # Contadores de prescrições de nós e apoios flexíveis
-                    if node.restrictions[j] == 1:                                           # Se houver apoio no grau de liberdade 
-                        # Modifica o vetor de forças globais segundo as restrições
-                        # Verifica se o nó é fixo
-                        if node.typeRestrictions[j] == "fix":                                   
-                            self.KGS_CC[self.GLpE*i+j, :] = 0                                   # Zera a linha da KGS
-                            self.KGS_CC[:, self.GLpE*i+j] = 0                                   # Zera a coluna da KGS
-                            self.KGS_CC[self.GLpE*i+j, self.GLpE*i+j] = 1                       # Torna unitário o elemento da diagonal principal da KGS
-                            self.GForcesV_CC[self.GLpE*i+j] = 0                                 # Zera a força no GL (deslocamento nulo)
-                        
-                        # Verifica se o nó é prescrito
-                        elif node.typeRestrictions[j] == "prescrible":  
-                            self.KGS_CC[self.GLpE*i+j, :] = 0                                   # Zera a linha da KGS
-                            self.KGS_CC[self.GLpE*i+j, self.GLpE*i+j] = 1                       # Torna unitário o elemento da diagonal principal da KGS                        
-                            self.GForcesV_CC[self.GLpE*i+j] = node.prescDisp[contPresc]         # aplica o deslocamento prescrito
-                            contPresc += 1
-
-                        # Verifica se o nó é flexivel
-                        elif node.typeRestrictions[j] == "flexible": 
-                            self.KGS_CC[self.GLpE*i+j, self.GLpE*i+j] += node.flexibleSupports[contFlex]   # Adiciona a rigidez da mola no elemento da diagonal principal                        
-                            self.GForcesV_CC[self.GLpE*i+j] = self.GForcesV[self.GLpE*i+j]                 # Define a ação nodal aplicada ao nó (mantém a aplicada e remove a componente da mola)
-                            contPresc += 1
+        # Apoios fixos: zera a linha e a coluna da KGS, torna unitário o elemento da diagonal e zera a força no GL
+        self.KGS_CC[self.fixDOFs, :] = 0
+        self.KGS_CC[:, self.fixDOFs] = 0
+        self.KGS_CC[self.fixDOFs, self.fixDOFs] = 1
+        self.GForcesV_CC[self.fixDOFs] = 0
 
-        
+        # Deslocamentos prescritos: zera a linha da KGS, torna unitário o elemento da diagonal e aplica o deslocamento
+        self.KGS_CC[self.prescDOFs, :] = 0
+        self.KGS_CC[self.prescDOFs, self.prescDOFs] = 1
+        self.GForcesV_CC[self.prescDOFs] = self.broadcastRHS(self.prescValues)
+
+        # Apoios flexíveis: adiciona a rigidez da mola no elemento da diagonal principal (mantém a ação nodal aplicada)
+        self.KGS_CC[self.flexDOFs, self.flexDOFs] += self.flexValues
+
+    def applyBoundaryConditionsSparse(self):
+        """
+        Aplica as condições de contorno na matriz de rigidez esparsa.
+        Os GLs prescritos são eliminados de forma simétrica (a coluna é levada ao vetor de forças)
+        """
+        import scipy.sparse as sp
+        restrDOFs = np.concatenate((self.fixDOFs, self.prescDOFs))
+
+        # Leva a contribuição dos deslocamentos prescritos ao vetor de forças
+        self.GForcesV_CC = self.GForcesV.copy()
+        if self.prescDOFs.size > 0:
+            self.GForcesV_CC -= self.broadcastRHS(self.KGS_Singular[:, self.prescDOFs] @ self.prescValues)
+        self.GForcesV_CC[self.fixDOFs] = 0
+        self.GForcesV_CC[self.prescDOFs] = self.broadcastRHS(self.prescValues)
+
+        # Zera as linhas e colunas dos GLs restringidos
+        keep = np.ones(self.nGL)
+        keep[restrDOFs] = 0
+        D = sp.diags(keep)
+
+        # Termos da diagonal principal: unitário nos GLs restringidos e rigidez das molas nos flexíveis
+        diag = np.zeros(self.nGL)
+        diag[restrDOFs] = 1
+        np.add.at(diag, self.flexDOFs, self.flexValues)
+
+        self.KGS_CC = (D @ self.KGS_Singular @ D + sp.diags(diag)).tocsc()
+
+    def definePartition(self):
+        """
+        Particiona os GLs em livres (incluindo os com apoio flexível) e prescritos (fixos e com deslocamento prescrito)
+        """
+        # GLs prescritos e seus deslocamentos
+        self.pDOFs = np.concatenate((self.fixDOFs, self.prescDOFs))
+        self.uP = np.concatenate((np.zeros(self.fixDOFs.size), self.prescValues))
+
+        # GLs livres
+        free = np.ones(self.nGL, dtype=bool)
+        free[self.pDOFs] = False
+        self.fDOFs = np.flatnonzero(free)
+
+        # Posição dos GLs com apoio flexível no conjunto livre
+        self.flexPos = np.searchsorted(self.fDOFs, self.flexDOFs)
+
+    def extractBlock(self, rows: np.ndarray, cols: np.ndarray):
+        """
+        Extrai um bloco da matriz de rigidez singular (densa ou esparsa)
+        """
+        if isSparse(self.KGS_Singular):
+            return self.KGS_Singular[rows][:, cols]
+        return self.KGS_Singular[np.ix_(rows, cols)]
+
+    def applyBoundaryConditionsPartitioned(self):
+        """
+        Aplica as condições de contorno por particionamento dos GLs, montando o sistema reduzido K_ff.u_f = F_f - K_fp.u_p
+        """
+        # Particiona os GLs
+        self.definePartition()
+
+        # Sistema reduzido
+        self.KGS_CC, self.K_fp = self.partitionedStiffness()
+        self.GForcesV_CC = self.GForcesV[self.fDOFs] - self.broadcastRHS(self.K_fp @ self.uP)
+
+    def partitionedStiffness(self):
+        """
+        Blocos K_ff (com a rigidez dos apoios flexíveis na diagonal) e K_fp da partição atual
+        """
+        K_ff = self.extractBlock(self.fDOFs, self.fDOFs)
+        K_fp = self.extractBlock(self.fDOFs, self.pDOFs)
+
+        # Adiciona a rigidez dos apoios flexíveis na diagonal do bloco livre
+        if isSparse(K_ff):
+            import scipy.sparse as sp
+            diag = np.zeros(self.fDOFs.size)
+            np.add.at(diag, self.flexPos, self.flexValues)
+            K_ff = (K_ff + sp.diags(diag)).tocsc()
+        else:
+            np.add.at(K_ff, (self.flexPos, self.flexPos), self.flexValues)
+        return K_ff, K_fp
+
+    def solvePartitioned(self):
+        """
+        Resolve o sistema reduzido da partição.
+        As reações são obtidas diretamente de R_p = K_pf.u_f + K_pp.u_p - F_p e, nos apoios flexíveis, R = -k.u
+        """
         # Resolve a estrutura
-        self.nodalDisp = np.linalg.solve(self.KGS_CC,self.GForcesV_CC)
+        self.nodalDisp = np.zeros(self.GForcesV.shape)
+        self.nodalDisp[self.pDOFs] = self.broadcastRHS(self.uP)
+        self.nodalDisp[self.fDOFs] = self.solver.factorizeAndSolve(self.KGS_CC, self.GForcesV_CC)
+
+        # Calcula as reações de apoio diretamente dos blocos prescritos
+        self.reactionsV = np.zeros(self.GForcesV.shape)
+        self.reactionsV[self.pDOFs] = (self.K_fp.T @ self.nodalDisp[self.fDOFs]
+                                       + self.broadcastRHS(self.extractBlock(self.pDOFs, self.pDOFs) @ self.uP)
+                                       - self.GForcesV[self.pDOFs])
+        self.reactionsV[self.flexDOFs] = -self.broadcastRHS(self.flexValues)*self.nodalDisp[self.flexDOFs]
+
+    def openSession(self, maxRank: int = 64) -> "AnalysisSession":
+        """
+        Abre uma sessão de reanálise incremental, que mantém a matriz de rigidez montada e a sua fatoração entre
+        análises com mudanças de ações nodais, apoios ou molas (ver Session.AnalysisSession)
+        """
+        from Session import AnalysisSession
+        return AnalysisSession(self, maxRank)
+
+    def parametricStudy(self, blockSize: int = 32) -> "ParametricStudy":
+        """
+        Cria um estudo paramétrico das áreas das seções e dos módulos dos materiais, com as sensibilidades
+        analíticas das respostas (ver Parametric.ParametricStudy)
+        """
+        from Parametric import ParametricStudy
+        return ParametricStudy(self, blockSize)
 
     def calcEIS(self):
         """
-        Calcula os esforços internos solicitantes
+        Calcula os esforços internos solicitantes (esforços normais de todos os elementos em uma única operação vetorizada)
         """
-        for element in self.elements:
-            element.calcInternalForces(self.nodalDisp)
+        self.normalForces = self.elemTable.calcNormalForces(self.nodalDisp)
 
     def calcReactions(self):
         """
         Calcula as forças globais nodais da estrutura e reações de apoio da estrutura
         """
-        # Cria o vetor de forças nodais global
-        self.GlobalForces = np.zeros(self.nGL)
- 
-        # Calcula as forças internas dos elementos nas coordenadas globais
-
-        # calcula as forças globais aplicadas
-        for i, element in enumerate(self.elements):
-            self.elements[i].calcLocalnGlobalForces()
-            self.GlobalForces += self.elements[i].globalForces
-
-        # especifica a reação de apoio em cada GL
-        for i, node in enumerate(self.nodes):
-            if node.restrictions != []:
-                self.nodes[i].ReactForces = np.zeros(self.GLpE)
-                for j in range(self.GLpE):
-                    if node.restrictions[j] == 1:
-                        if self.nodes[i].nodalLoads != None:
-                            self.nodes[i].ReactForces[j] = self.GlobalForces[self.GLpE*i+j] - self.nodes[i].nodalLoads[j]
-                        else:
-                            self.nodes[i].ReactForces[j] = self.GlobalForces[self.GLpE*i+j]
+        if self.bcMethod == "partition":
+            # Forças nodais globais obtidas das reações da partição (ações aplicadas + reações)
+            self.GlobalForces = self.GForcesV + self.reactionsV
+        else:
+            # Forças nodais globais pela soma das forças de extremidade de todos os elementos
+            self.GlobalForces = self.elemTable.calcGlobalForces(self.normalForces, self.nGL)
+        self.defineReactions(self.GlobalForces)
+
+    def defineReactions(self, GlobalForces: np.ndarray):
+        """
+        Define as reações de apoio a partir das forças nodais globais da estrutura
+        """
+        self.GlobalForces = GlobalForces
+
+        # Reações nos GLs restringidos: forças globais descontadas as ações nodais aplicadas
+        self.ReactionsV = np.zeros(self.GlobalForces.shape)
+        self.ReactionsV[self.restrDOFs] = self.GlobalForces[self.restrDOFs] - self.GForcesV[self.restrDOFs]
+
+        # Reações por nó na tabela de nós (lidas pelos objetos Node)
+        self.nodeTable.reactions = self.ReactionsV[self.nodeDOFs] if self.ReactionsV.ndim == 1 else None
 
     def solveStructure(self):
         """
         Resolve a estrutura calculando os deslocamentos
         """
         # Calcula a matriz de rigidez global da estrutura
-        self.calculateKGS_Singular()
+        with self.phase("assembly") as stats:
+            self.calculateKGS_Singular()
+            stats.update({"nGL": self.nGL, "nnz": self.countNonzeros(self.KGS_Singular)})
 
-        # Calcula o vetor de ações nodais da estrutura
-        self.defineGlobalForces()
+        # Calcula o vetor de ações nodais da estrutura (ou a matriz de forças dos casos de carregamento)
+        with self.phase("loads") as stats:
+            self.defineGlobalForces()
+            if self.nLoadCases > 0:
+                self.defineLoadCaseForces()
+                self.GForcesV = self.loadCaseForces
+            stats["nRHS"] = 1 if self.GForcesV.ndim == 1 else self.GForcesV.shape[1]
+
+        # Aplica as condições de contorno
+        with self.phase("bc") as stats:
+            self.applyBoundaryConditions()
+            stats.update({"nEquations": self.KGS_CC.shape[0], "nnz": self.countNonzeros(self.KGS_CC)})
 
         # Resolve a estrutura (calcula os deslocamentos nos Graus de Liberdade)
-        self.calcStruture()
+        with self.phase("solve") as stats:
+            self.solveSystem()
+            stats.update(self.solver.info())
 
-        # Calcula os esforços internos solicitantes dos elementos
-        self.calcEIS()
+        # Calcula os esforços internos solicitantes dos elementos e as reações de apoio
+        with self.phase("recovery"):
+            self.calcEIS()
+            self.calcReactions()
+
+        # Separa os resultados dos casos de carregamento, quando definidos
+        if self.nLoadCases > 0:
+            self.collectLoadCaseResults()
+
+    def solveNonlinear(self, **options) -> "NonlinearAnalysis":
+        """
+        Resolve a estrutura considerando a não linearidade geométrica (grandes deslocamentos), com as opções de
+        Nonlinear.NonlinearAnalysis (controle de carga ou de comprimento de arco, Newton completo ou modificado e
+        busca linear). Os resultados correspondem ao estado final da trajetória de equilíbrio
+        """
+        from Nonlinear import NonlinearAnalysis
+        with self.phase("nonlinear") as stats:
+            self.nonlinear = NonlinearAnalysis(self, **options)
+            self.nonlinear.run()
+            report = self.nonlinear.report()
+            stats.update({key: value for key, value in report.items() if key != "path"})
+            stats.update(self.solver.info())
+        return self.nonlinear
+
+    def solveReliability(self, **options) -> "MonteCarloAnalysis":
+        """
+        Análise de confiabilidade por simulação de Monte Carlo com ações nodais, módulos e áreas aleatórios, com as
+        opções de Reliability.MonteCarloAnalysis. Os resultados determinísticos da estrutura não são alterados
+        """
+        from Reliability import MonteCarloAnalysis
+        with self.phase("reliability") as stats:
+            self.reliability = MonteCarloAnalysis(self, **options)
+            report = self.reliability.run()
+            stats.update({key: report[key] for key in ("nSamples", "failureProbability", "nFactorizations")})
+        return self.reliability
+
+    def solveMovingLoads(self, trains: list[dict] = None, reversible: bool = True, **options) -> "MovingLoadAnalysis":
+        """
+        Linhas de influência dos esforços normais ao longo de um banzo carregado e, com trains, as envoltórias dos
+        trens de cargas móveis, com as opções de MovingLoads.MovingLoadAnalysis. Os resultados da estrutura não
+        são alterados
+        """
+        from MovingLoads import MovingLoadAnalysis
+        with self.phase("influence") as stats:
+            self.movingLoads = MovingLoadAnalysis(self, **options)
+            self.movingLoads.influenceLines()
+            stats.update({"nStations": self.movingLoads.stations.size, "nFactorizations": self.movingLoads.nFactorizations})
+        if trains:
+            with self.phase("envelopes") as stats:
+                envelopes = self.movingLoads.envelope(trains, reversible)
+                stats["nPositions"] = sum(envelope["nPositions"] for envelope in envelopes)
+        return self.movingLoads
+
+    def collectLoadCaseResults(self):
+        """
+        Separa os resultados de cada caso de carregamento e combinação, resolvidos em conjunto com uma única fatoração
+        da matriz de rigidez (as forças de todos os casos formam uma matriz de vetores independentes)
+        """
+        # Resultados de cada caso
+        self.caseResults: list[dict] = []
+        for c, name in enumerate(self.loadCaseNames):
+            self.caseResults.append({"name": name, "NodalDisplacements": self.userOrder(self.nodalDisp[:, c]).tolist(),
+                                     "Elements": self.outputElements(self.normalForces[:, c]),
+                                     "Reactions": self.outputReactions(self.ReactionsV[:, c])})
 
-        # Calcula as reações de apoio
+        # O estado da estrutura passa a corresponder ao primeiro caso de carregamento
+        self.GForcesV = self.loadCaseForces[:, 0]
+        self.GForcesV_CC = self.GForcesV_CC[:, 0]
+        self.nodalDisp = self.nodalDisp[:, 0]
+        if self.bcMethod == "partition":
+            self.reactionsV = self.reactionsV[:, 0]
+        self.calcEIS()
         self.calcReactions()
-    
 
     def displayMatriz(self, matriz):
         # Exibindo a matriz com formatação personalizada
@@ -278,48 +809,158 @@ class Truss2D:
         print("\n\nDeslocamentos nodais:\n")
         self.displayVetor(self.nodalDisp)
     
-    def outputResults(self):
+    def matrixToOutput(self, matrix):
         """
-        Cria o dicionário de saída com os resultados da estrutura
+        Converte uma matriz para a saída JSON (lista densa ou triplets no caso esparso)
         """
+        if isSparse(matrix):
+            coo = matrix.tocoo()
+            return {"shape": list(coo.shape), "row": coo.row.tolist(), "col": coo.col.tolist(), "data": coo.data.tolist()}
+        return matrix.tolist()
+
+    def outputResults(self, profile: str = "legacy"):
+        """
+        Cria o dicionário de saída com os resultados da estrutura segundo o perfil de saída:
+        "legacy": matrizes de rigidez e vetores de forças incluídos no próprio JSON
+        "full": vetores de forças no JSON; as matrizes são gravadas à parte (ver outputMatrices)
+        "summary": apenas deslocamentos, esforços normais e reações
+        """
+        if profile not in OUTPUT_PROFILES:
+            raise ValueError(f"Perfil de saída desconhecido: '{profile}'")
+
         # Cria o dicionário de saída
         self.output = {}
 
-        # Adiciona as matrizes e vetores do problema
-        self.output["KGS"] = self.KGS_Singular.tolist()                   # Matriz de rigidez global da estrutura
-        self.output["KGS_CC"] = self.KGS_CC.tolist()             # Matriz de rigidez global da estrutura aplicada às CC
-        self.output["GForcesV"] = self.GForcesV.tolist()         # Vetor de forças globais da estrutura
-        self.output["GForcesV_CC"] = self.GForcesV_CC.tolist()   # Vetor de forças globais da estrutura aplicado às CC
+        # Adiciona as matrizes e vetores do problema (na numeração original dos GLs)
+        if profile == "legacy":
+            matrices = self.outputMatrices()
+            self.output["KGS"] = self.matrixToOutput(matrices["KGS"])         # Matriz de rigidez global da estrutura
+            self.output["KGS_CC"] = self.matrixToOutput(matrices["KGS_CC"])   # Matriz de rigidez global da estrutura aplicada às CC
+        if profile != "summary":
+            self.output["GForcesV"] = self.userOrder(self.GForcesV).tolist()                      # Vetor de forças globais da estrutura
+            self.output["GForcesV_CC"] = self.userOrder(self.GForcesV_CC, self.systemDOFs()).tolist() # Vetor de forças globais da estrutura aplicado às CC
+
+        # Adiciona as estatísticas do resolvedor (tempos e iterações)
+        self.output["Solver"] = self.solver.info()
 
         # Adiciona os deslocamentos nodais
-        self.output["NodalDisplacements"] = self.nodalDisp.tolist() # Deslocamentos nodais nas referências globais
+        self.output["NodalDisplacements"] = self.userOrder(self.nodalDisp).tolist() # Deslocamentos nodais nas referências globais
+
+        # Adiciona o resumo e a trajetória de equilíbrio da análise não linear
+        if self.nonlinear is not None:
+            self.output["Nonlinear"] = self.nonlinear.report()
+
+        # Adiciona as estatísticas da análise de confiabilidade
+        if self.reliability is not None:
+            self.output["Reliability"] = self.reliability.report()
+
+        # Adiciona as linhas de influência e as envoltórias das cargas móveis
+        if self.movingLoads is not None:
+            self.output["MovingLoads"] = self.movingLoads.report()
+
+        # Adiciona a banda e o perfil da matriz de rigidez antes e depois da renumeração
+        if self.renumbering != "none":
+            self.output["Renumbering"] = self.renumberingReport
 
         # Adiciona os elementos
-        self.output["Elements"] = []
-        for elemento in self.elements:
-            self.output["Elements"].append({"id": elemento.id, "Normal [kN]": elemento.internalForcesRef[0].tolist()})
+        self.output["Elements"] = self.outputElements()
 
         # Adiciona as reações de apoio
-        self.output["Reactions"] = []
-        for node in self.nodes:
-            if node.restrictions != []:
-                self.output["Reactions"].append({"id": node.id, "Reactions": node.ReactForces.tolist()})
+        self.output["Reactions"] = self.outputReactions()
+
+        # Adiciona os resultados por caso de carregamento e por combinação
+        if self.nLoadCases > 0:
+            self.output["LoadCases"] = self.caseResults[:self.nLoadCases]
+            self.output["LoadCombinations"] = self.caseResults[self.nLoadCases:]
 
         return self.output
 
+    def outputMatrices(self) -> dict:
+        """
+        Matrizes de rigidez da estrutura para o arquivo auxiliar do perfil "full"
+        """
+        return {"KGS": self.userOrder(self.KGS_Singular, square=True),
+                "KGS_CC": self.userOrder(self.KGS_CC, self.systemDOFs(), square=True)}
+
+    def systemDOFs(self) -> np.ndarray:
+        """
+        GLs internos das equações do sistema com as condições de contorno aplicadas
+        """
+        return self.fDOFs if self.bcMethod == "partition" else None
+
+    def outputElements(self, N: np.ndarray = None) -> list:
+        """
+        Cria a lista de saída dos esforços normais dos elementos
+        """
+        N = self.normalForces if N is None else N
+        return [{"id": id, "Normal [kN]": normal} for id, normal in zip(self.elemTable.ids.tolist(), N.tolist())]
+
+    def outputReactions(self, R: np.ndarray = None) -> list:
+        """
+        Cria a lista de saída das reações de apoio
+        """
+        R = self.userOrder(self.ReactionsV if R is None else R)
+        supported = np.flatnonzero(self.hasSupport)
+        return [{"id": id, "Reactions": reactions} for id, reactions
+                in zip(self.nodeIds[supported].tolist(), R.reshape(self.nNodes, self.GLpE, *R.shape[1:])[supported].tolist())]
+
+
+class Truss3D(Truss2D):
+    """
+    Treliça espacial: três GLs de translação por nó e matrizes de rigidez de elemento 6x6. A montagem (densa ou
+    esparsa), as condições de contorno, os resolvedores e a saída são os da treliça plana
+    """
+    type = "Truss3D"            # Tipo de análise
+    nMinRest = 6                # Número mínimo de restrições
+    GLpE = GL_PER_NODE[type]    # Número de graus de liberdade por nó
+
 
 class SAG:
     """
     Gerencia a análise estrutural do modelo de entrada
     """
-    def __init__(self, dir: str):
+    def __init__(self, dir: str, storage: str = None, solver = None, bcMethod: str = None,
+                 instrument: bool = False, callback = None, outputProfile: str = None, cache = None,
+                 renumbering: str = None, nonlinear = None):
+        """
+        dir: arquivo de estrutura (.json ou modelo .ftl do Ftool)
+        instrument: registra tempos, memória e estatísticas de cada fase (adicionados ao results.json)
+        callback: função chamada ao final de cada fase como callback(nome, registro); ativa a instrumentação
+        outputProfile: perfil do arquivo de resultados ("legacy", "full" ou "summary")
+        cache: cache de resultados (ResultCache ou diretório do cache); em um acerto, a montagem e a solução
+               são dispensadas
+        renumbering: renumeração dos nós antes da montagem ("none" ou "rcm")
+        nonlinear: análise geometricamente não linear (True ou dicionário com as opções de
+                   Nonlinear.NonlinearAnalysis); por padrão, a chave "nonlinear" do arquivo de estrutura
+        """
         self.dir = dir
-        self.data = DataReader.ReadData(dir)
+        self.storage = storage
+        self.solver = solver
+        self.bcMethod = bcMethod
+        self.renumbering = renumbering
+        self.recorder = PhaseRecorder(callback) if (instrument or callback is not None) else None
+        if isinstance(cache, str):
+            from ResultCache import ResultCache
+            cache = ResultCache(cache)
+        self.cache: "ResultCache" = cache
+        self.cached = None                      # Resultados obtidos do cache {"profile", "key", "output", "matrices"}
+        self.solved = False                     # Indica se a estrutura foi resolvida
+
+        with self.phase("parse"):
+            self.data = DataReader.ReadModel(dir)
 
         if self.data is None:
-            del self
+            raise ValueError(f"Não foi possível ler o arquivo '{dir}'")
         
         self.type = self.data["typeStructure"]
+        self.nonlinear = nonlinear if nonlinear is not None else self.data.get("nonlinear")
+        if self.nonlinear is True:
+            self.nonlinear = {}
+        elif self.nonlinear is False:
+            self.nonlinear = None
+        self.outputProfile = outputProfile or self.data.get("outputProfile", "legacy")
+        if self.outputProfile not in OUTPUT_PROFILES:
+            raise ValueError(f"Perfil de saída desconhecido: '{self.outputProfile}'")
         self.definetype()
     
     def definetype(self):
@@ -327,13 +968,81 @@ class SAG:
         Define o tipo de estrutura a ser analisada
         """
         if self.type == "Truss2D":
-            self.Structure = Truss2D(self.data)
+            self.Structure = Truss2D(self.data, self.storage, self.solver, self.bcMethod, self.recorder, self.renumbering)
+        elif self.type == "Truss3D":
+            self.Structure = Truss3D(self.data, self.storage, self.solver, self.bcMethod, self.recorder, self.renumbering)
+        else:
+            raise ValueError(f"Tipo de estrutura desconhecido: '{self.type}'")
+
+    def phase(self, name: str):
+        """
+        Contexto de medição de uma fase da análise (sem efeito quando a instrumentação não está ativa)
+        """
+        if self.recorder is None:
+            return nullcontext({})
+        return self.recorder.phase(name)
+
+    def instrumentationReport(self) -> dict:
+        """
+        Relatório estruturado da instrumentação (None quando não ativa)
+        """
+        return None if self.recorder is None else self.recorder.report()
+
+    def cacheKeys(self, profile: str) -> tuple[str, str]:
+        """
+        Chaves do cache dos resultados (modelo, opções da análise e perfil de saída) e da fatoração
+        (matriz de rigidez e opções da análise)
+        """
+        from ResultCache import hashModel, hashKey
+        if not hasattr(self, "modelHashes"):
+            self.modelHashes = hashModel(self.data)
+        stiffness, loads = self.modelHashes
+        options = {"storage": self.Structure.storage, "bcMethod": self.Structure.bcMethod,
+                   "solver": self.Structure.solver.spec(), "renumbering": self.Structure.renumbering,
+                   "nonlinear": self.nonlinear}
+        return hashKey(stiffness, loads, options, profile), hashKey(stiffness, options)
 
     def solveStructure(self):
         """
-        Resolve a estrutura
+        Resolve a estrutura (ou obtém os resultados do cache, quando disponível)
+        """
+        factorKey = None
+        if self.cache is not None:
+            with self.phase("cache") as stats:
+                key, factorKey = self.cacheKeys(self.outputProfile)
+                cached = self.cache.getResults(key, self.outputProfile == "full")
+                stats["hit"] = cached is not None
+            if cached is not None:
+                self.cached = {"profile": self.outputProfile, "key": key, **cached}
+                return
+
+            # Fatoração armazenada da mesma matriz de rigidez (apenas na análise linear, com resolvedores que
+            # permitem exportar e importar fatorações)
+            if not (self.cache.storeFactorizations and self.nonlinear is None and self.Structure.solver.factorTransfer):
+                factorKey = None
+            if factorKey is not None:
+                factor = self.cache.getFactor(factorKey)
+                if factor is not None:
+                    self.Structure.solver.importFactor(factor)
+                    factorKey = None
+
+        self.analyseStructure()
+
+        # Armazena a nova fatoração
+        if factorKey is not None:
+            factor = self.Structure.solver.exportFactor()
+            if factor is not None:
+                self.cache.putFactor(factorKey, factor)
+
+    def analyseStructure(self):
+        """
+        Resolve a estrutura pela análise linear ou, quando definida, pela análise não linear
         """
-        self.Structure.solveStructure()
+        if self.nonlinear is not None:
+            self.Structure.solveNonlinear(**self.nonlinear)
+        else:
+            self.Structure.solveStructure()
+        self.solved = True
 
     def displayResults(self):
         """
@@ -341,23 +1050,67 @@ class SAG:
         """
         self.Structure.displayResults()
 
-    def outputResults(self):
+    def outputResults(self, plot: bool = True, profile: str = None, compact: bool = None):
         """
-        Cria o arquivo de saída em JSON
+        Cria o arquivo de saída em JSON e, opcionalmente, a figura da estrutura.
+        plot: desenha a estrutura (True, ou dicionário com as opções de PrintStructure.plotStructure); False
+              dispensa a plotagem (p.ex. em análises em lote)
+        profile: perfil de saída (padrão: o do construtor); no perfil "full" as matrizes de rigidez são gravadas
+        em triplets (linha, coluna, valor) no arquivo auxiliar results_matrices.npz
+        compact: JSON sem indentação (padrão nos perfis "full" e "summary")
         """
-        # Cria o dicionário com a saída de dados
-        output = self.Structure.outputResults()
+        profile = profile or self.outputProfile
+        compact = (profile != "legacy") if compact is None else compact
+
+        # Resultados do cache (apenas para o mesmo perfil de saída)
+        cached = self.cached if self.cached is not None and self.cached["profile"] == profile else None
+        if cached is None and not self.solved:
+            self.analyseStructure()
 
         # Cria o diretório do novo arquivo
         dirPaste = os.path.splitext(self.dir)[0]
         os.makedirs(dirPaste, exist_ok = True)
-        dirOut = dirPaste + '\\results' + os.path.splitext(self.dir)[1]
-        
-        # Escreve o arquivo JSON
-        DataReader.WriteData(dirOut, output)
+        dirOut = os.path.join(dirPaste, 'results.json')
+
+        # Cria o dicionário com a saída de dados
+        with self.phase("output"):
+            if cached is not None:
+                output = cached["output"]
+                if profile == "full":
+                    shutil.copyfile(cached["matrices"], os.path.join(dirPaste, output["Matrices"]["file"]))
+            else:
+                output = self.Structure.outputResults(profile)
+
+                # Grava as matrizes no arquivo auxiliar
+                if profile == "full":
+                    output["Matrices"] = {"file": "results_matrices.npz", "format": "coo",
+                                          "names": list(self.Structure.outputMatrices())}
+                    DataReader.WriteMatrices(os.path.join(dirPaste, output["Matrices"]["file"]), self.Structure.outputMatrices())
+
+                # Armazena os resultados no cache
+                if self.cache is not None:
+                    self.cache.putResults(self.cacheKeys(profile)[0], output,
+                                          self.Structure.outputMatrices() if profile == "full" else None)
+
+            # Adiciona o estado do cache
+            if self.cache is not None:
+                output["Cache"] = {"key": self.cacheKeys(profile)[0], "hit": cached is not None, **self.cache.info()}
+
+            # Escreve o arquivo JSON
+            DataReader.WriteData(dirOut, output, compact)
+
+        # Acrescenta o relatório da instrumentação (incluindo a fase de saída) ao arquivo gravado
+        if self.recorder is not None:
+            output["Instrumentation"] = self.instrumentationReport()
+            self.recorder.stopTracing()
+            DataReader.AppendData(dirOut, "Instrumentation", output["Instrumentation"], compact)
 
         # Plotagem
-        plotStructure(dirPaste, self.Structure)
+        if plot:
+            from PrintStructure import plotStructure
+            plotStructure(dirPaste, self.Structure, **(plot if isinstance(plot, dict) else {}))
+
+        return dirOut
 
 
 
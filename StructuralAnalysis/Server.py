@@ -0,0 +1,489 @@
+# -*- coding: utf-8 -*-
+"""
+Serviço de análise de longa duração (HTTP em localhost ou em um socket Unix), que mantém os modelos, as matrizes
+de rigidez e as fatorações em memória entre as requisições. Os modelos ficam em um registro de tamanho limitado
+(os menos usados recentemente são descartados) e cada modelo mantém uma sessão de reanálise incremental
+(Session.AnalysisSession): atualizações das ações nodais reutilizam a fatoração e mudanças de apoios são
+tratadas como atualizações de posto baixo. As análises são executadas em um pool de threads, sem bloquear o laço
+de eventos.
+
+Uso:
+    python Server.py --port 8765
+    python Server.py --unix /tmp/sag.sock --workers 4 --max-size 1024
+
+Rotas (corpo e respostas em JSON):
+    GET    /status                      estado do registro e do serviço
+    POST   /models                      {"model", "id"?, "options"?}: registra (ou reutiliza) e analisa um modelo
+    GET    /models/<id>                 resultados da última análise
+    PUT    /models/<id>                 {"model"}: substitui o modelo (apenas as ações nodais, se a rigidez é a mesma)
+    POST   /models/<id>/loads           {"nodalLoads"}: substitui as ações nodais e analisa
+    POST   /models/<id>/restrictions    {"restrictions"?, "remove"?}: define ou remove apoios e analisa
+    DELETE /models/<id>                 remove o modelo do registro
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import socket
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+import numpy as np
+import scipy.sparse as sp
+from ResultCache import hashModel
+from SAG import Truss2D, Truss3D
+
+STRUCTURE_TYPES = {"Truss2D": Truss2D, "Truss3D": Truss3D}      # Tipos de estrutura aceitos pelo serviço
+STRUCTURE_OPTIONS = ("storage", "solver", "bcMethod", "renumbering")   # Opções do construtor aceitas nas requisições
+MAX_BODY = 256*2**20                                            # Tamanho máximo do corpo de uma requisição [bytes]
+
+
+class ServiceError(Exception):
+    """
+    Erro de uma requisição, com o código HTTP e dados adicionais da resposta
+    """
+    def __init__(self, status: int, message: str, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+def nbytes(value) -> int:
+    """
+    Memória ocupada pelos arrays de um valor (array, matriz esparsa, fatoração SuperLU, ou listas e dicionários
+    desses valores)
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if sp.issparse(value):
+        return sum(getattr(value, name).nbytes for name in ("data", "indices", "indptr", "row", "col")
+                   if hasattr(value, name))
+    if isinstance(value, dict):
+        return sum(nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(item) for item in value)
+    if isinstance(getattr(value, "nnz", None), int):
+        return 12*value.nnz                                     # Fatores (coeficientes e índices)
+    return 0
+
+
+class ModelEntry:
+    """
+    Modelo mantido em memória pelo serviço: estrutura, sessão de reanálise (matriz de rigidez e fatoração) e
+    resultados da última análise. As requisições de um mesmo modelo são serializadas pelo seu lock
+    """
+    def __init__(self, id: str, data: dict, options: dict):
+        self.id = id
+        self.options = options
+        self.hashes = hashModel(data)                           # Hashes da rigidez e das ações nodais (None após mudar os apoios)
+        self.lock = asyncio.Lock()
+        self.nRequests = 0
+        self.build(data)
+
+    @staticmethod
+    def checkData(data: dict):
+        """
+        Recusa modelos não suportados pelo serviço (tipo de estrutura desconhecido ou casos de carregamento)
+        """
+        if data.get("typeStructure") not in STRUCTURE_TYPES:
+            raise ServiceError(400, f"Tipo de estrutura desconhecido: '{data.get('typeStructure')}'")
+        if data.get("loadCases"):
+            raise ServiceError(400, "Casos de carregamento não são suportados pelo serviço: envie as ações nodais")
+
+    def build(self, data: dict):
+        """
+        Cria a estrutura, verifica a sua estabilidade e abre a sessão de reanálise (montagem e fatoração)
+        """
+        self.checkData(data)
+        self.structure = STRUCTURE_TYPES[data["typeStructure"]](data, **self.options)
+        self.checkStability()
+        self.session = self.structure.openSession()
+        self.results = None
+
+    def checkStability(self):
+        """
+        Recusa estruturas hipostáticas antes da fatoração (ver Truss2D.checkStability)
+        """
+        stability = self.structure.checkStability()
+        if not stability["stable"]:
+            raise ServiceError(422, f"Estrutura hipostática: {stability['nMechanisms']} mecanismo(s)", stability=stability)
+
+    def solve(self) -> dict:
+        """
+        Analisa a estrutura com as ações nodais e os apoios atuais
+        """
+        start = time.perf_counter()
+        self.session.solve()
+        self.results = {"id": self.id, **self.session.results(), "solveTime [s]": time.perf_counter() - start}
+        self.size = self.memory()
+        return self.results
+
+    def setLoads(self, NodalLoads) -> dict:
+        self.session.setNodalLoads(NodalLoads)
+        return self.solve()
+
+    def setRestrictions(self, Restrictions, remove) -> dict:
+        """
+        Remove os apoios dos nós indicados, define novas restrições e analisa (atualização de posto baixo da sessão).
+        Quando os novos apoios são recusados (hipostáticos ou inválidos), os apoios anteriores são restaurados
+        """
+        S = self.structure
+        saved = (S.supportCodes.copy(), S.supportValues.copy(), S.hasSupport.copy(), S.nRestrictions, S.stability,
+                 self.session.update)
+        try:
+            if remove:
+                self.session.removeRestrictions(remove)
+            if Restrictions:
+                self.session.setRestrictions(Restrictions)
+            self.checkStability()
+        except Exception:
+            S.supportCodes[:], S.supportValues[:], S.hasSupport[:] = saved[:3]
+            S.nRestrictions, S.stability, self.session.update = saved[3:]
+            raise
+        self.hashes = None                                      # A rigidez deixa de corresponder ao modelo enviado
+        return self.solve()
+
+    def replace(self, data: dict) -> dict:
+        """
+        Substitui o modelo: com a mesma rigidez, apenas as ações nodais são atualizadas (a fatoração é mantida)
+        """
+        self.checkData(data)
+        hashes = hashModel(data)
+        if self.hashes is not None and hashes[0] == self.hashes[0]:
+            self.session.setNodalLoads(data.get("nodalLoads", []))
+        else:
+            self.build(data)
+        self.hashes = hashes
+        return self.solve()
+
+    def memory(self) -> int:
+        """
+        Memória estimada do modelo: arrays da estrutura, da tabela de elementos, da sessão e do resolvedor
+        """
+        S = self.structure
+        return sum(nbytes(value) for owner in (S, S.elemTable, self.session, S.solver) for value in vars(owner).values())
+
+    def info(self) -> dict:
+        return {"id": self.id, "type": self.structure.type, "nGL": self.structure.nGL, "nElem": self.structure.nElem,
+                "size [MB]": self.size/2**20, "nRequests": self.nRequests, **self.session.info()}
+
+
+class ModelRegistry:
+    """
+    Registro dos modelos em memória com tamanho limitado: ao exceder o limite, os modelos menos usados
+    recentemente são descartados (exceto o último inserido)
+    """
+    def __init__(self, maxSize: float = 512):
+        """
+        maxSize: memória máxima estimada dos modelos [MB]
+        """
+        self.maxSize = maxSize
+        self.entries: OrderedDict[str, ModelEntry] = OrderedDict()
+        self.hits = 0                   # Modelos encontrados no registro
+        self.misses = 0                 # Modelos criados
+        self.evictions = 0              # Modelos descartados pelo limite de tamanho
+
+    def get(self, id: str) -> ModelEntry:
+        entry = self.entries.get(id)
+        if entry is not None:
+            self.entries.move_to_end(id)
+        return entry
+
+    def put(self, entry: ModelEntry):
+        self.entries[entry.id] = entry
+        self.entries.move_to_end(entry.id)
+        self.evict()
+
+    def remove(self, id: str) -> bool:
+        return self.entries.pop(id, None) is not None
+
+    def size(self) -> int:
+        return sum(entry.size for entry in self.entries.values())
+
+    def evict(self):
+        """
+        Descarta os modelos menos usados recentemente até que o tamanho total respeite o limite
+        """
+        while len(self.entries) > 1 and self.size() > self.maxSize*2**20:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def info(self) -> dict:
+        return {"nModels": len(self.entries), "size [MB]": self.size()/2**20, "maxSize [MB]": self.maxSize,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "models": [entry.info() for entry in self.entries.values()]}
+
+
+class AnalysisService:
+    """
+    Serviço assíncrono de análise: recebe as requisições HTTP no laço de eventos e executa a criação dos
+    modelos e as análises em um pool de threads (as fatorações e substituições do SciPy liberam o GIL).
+    Requisições de modelos distintos são atendidas em paralelo; as de um mesmo modelo, em ordem de chegada
+    """
+    def __init__(self, maxSize: float = 512, workers: int = None):
+        """
+        maxSize: memória máxima estimada dos modelos em memória [MB]
+        workers: número de threads do pool de análises (padrão do ThreadPoolExecutor)
+        """
+        self.registry = ModelRegistry(maxSize)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sag")
+        self.pending: dict[str, asyncio.Future] = {}       # Modelos em criação (requisições simultâneas aguardam)
+        self.connections: set[asyncio.Task] = set()          # Conexões abertas (encerradas em close)
+        self.nRequests = 0
+        self.started = time.time()
+        self.server = None
+
+    async def run(self, function, *args):
+        """
+        Executa uma função bloqueante no pool de análises
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def modelEntry(self, id: str) -> ModelEntry:
+        entry = self.registry.get(id)
+        if entry is None:
+            raise ServiceError(404, f"Modelo não encontrado: '{id}'")
+        return entry
+
+    async def addModel(self, body: dict) -> dict:
+        """
+        Registra e analisa um modelo. Um modelo com a mesma rigidez já registrado (mesmo id) é reutilizado:
+        apenas as suas ações nodais são atualizadas
+        """
+        if "model" not in body:
+            raise ServiceError(400, "Requisição sem o modelo ('model')")
+        data = body["model"]
+        options = {key: value for key, value in body.get("options", {}).items() if key in STRUCTURE_OPTIONS}
+        if set(body.get("options", {})) - set(STRUCTURE_OPTIONS):
+            raise ServiceError(400, f"Opções desconhecidas: {sorted(set(body['options']) - set(STRUCTURE_OPTIONS))}")
+        id = body.get("id") or hashModel(data)[0][:16]
+
+        entry = self.registry.get(id)
+        if entry is None and id in self.pending:
+            await asyncio.shield(self.pending[id])
+            entry = self.registry.get(id)
+        if entry is not None and entry.options == options:
+            self.registry.hits += 1
+            async with entry.lock:
+                entry.nRequests += 1
+                return {**await self.run(entry.replace, data), "cached": True}
+
+        # Cria o modelo (montagem e fatoração no pool)
+        self.registry.misses += 1
+        future = self.pending[id] = asyncio.get_running_loop().create_future()
+        try:
+            entry = await self.run(ModelEntry, id, data, options)
+            entry.nRequests += 1
+            results = await self.run(entry.solve)
+            self.registry.put(entry)
+        finally:
+            del self.pending[id]
+            future.set_result(None)
+        return {**results, "cached": False}
+
+    async def update(self, id: str, method, *args) -> dict:
+        """
+        Atualiza e analisa um modelo registrado (method: método de ModelEntry executado no pool)
+        """
+        entry = await self.modelEntry(id)
+        async with entry.lock:
+            entry.nRequests += 1
+            results = await self.run(method, entry, *args)
+        self.registry.evict()
+        return results
+
+    async def handle(self, method: str, path: str, body: dict) -> tuple[int, dict]:
+        """
+        Atende uma requisição e retorna o código HTTP e o corpo da resposta
+        """
+        self.nRequests += 1
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        try:
+            if parts == ["status"] and method == "GET":
+                return 200, {"uptime [s]": time.time() - self.started, "nRequests": self.nRequests,
+                             "workers": self.executor._max_workers, **self.registry.info()}
+            if parts == ["models"] and method == "POST":
+                return 200, await self.addModel(body)
+            if len(parts) == 2 and parts[0] == "models":
+                id = parts[1]
+                if method == "GET":
+                    entry = await self.modelEntry(id)
+                    return 200, {**entry.results, "info": entry.info()}
+                if method == "PUT":
+                    if "model" not in body:
+                        raise ServiceError(400, "Requisição sem o modelo ('model')")
+                    return 200, await self.update(id, ModelEntry.replace, body["model"])
+                if method == "DELETE":
+                    if not self.registry.remove(id):
+                        raise ServiceError(404, f"Modelo não encontrado: '{id}'")
+                    return 200, {"id": id, "removed": True}
+            if len(parts) == 3 and parts[0] == "models" and method == "POST":
+                if parts[2] == "loads":
+                    return 200, await self.update(parts[1], ModelEntry.setLoads, body.get("nodalLoads", []))
+                if parts[2] == "restrictions":
+                    return 200, await self.update(parts[1], ModelEntry.setRestrictions, body.get("restrictions", []),
+                                                  body.get("remove", []))
+            raise ServiceError(404, f"Rota desconhecida: {method} {path}")
+        except ServiceError as e:
+            return e.status, {"error": str(e), **e.details}
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            return 400, {"error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Conexão HTTP/1.1 (com keep-alive): lê as requisições, atende e escreve as respostas em JSON
+        """
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    status, response = 413, {"error": "Requisição muito grande"}
+                else:
+                    raw = await reader.readexactly(length) if length > 0 else b""
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except json.JSONDecodeError as e:
+                        status, response = 400, {"error": f"JSON inválido: {e}"}
+                    else:
+                        status, response = await self.handle(method.upper(), path, body)
+                content = json.dumps(response).encode()
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(content)}\r\nConnection: {'close' if close else 'keep-alive'}"
+                             f"\r\n\r\n".encode() + content)
+                await writer.drain()
+                if close or length > MAX_BODY:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unixSocket: str = None):
+        """
+        Inicia o servidor (TCP em host:port ou no socket Unix indicado) e retorna o endereço de escuta
+        """
+        if unixSocket is not None:
+            self.server = await asyncio.start_unix_server(self.handleConnection, path=unixSocket)
+            return unixSocket
+        self.server = await asyncio.start_server(self.handleConnection, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """
+        Encerra o servidor, as conexões abertas e o pool de análises
+        """
+        if self.server is not None:
+            self.server.close()
+            for task in list(self.connections):
+                task.cancel()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    Conexão HTTP por um socket Unix
+    """
+    def __init__(self, path: str, timeout: float = None):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ServiceClient:
+    """
+    Cliente síncrono do serviço (mantém a conexão aberta entre as requisições)
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, unixSocket: str = None, timeout: float = 600):
+        if unixSocket is not None:
+            self.connection = UnixHTTPConnection(unixSocket, timeout)
+        else:
+            self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method: str, path: str, body: dict = None) -> tuple[int, dict]:
+        content = None if body is None else json.dumps(body)
+        self.connection.request(method, path, content, {"Content-Type": "application/json"})
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def call(self, method: str, path: str, body: dict = None) -> dict:
+        """
+        Requisição que exige sucesso (ServiceError com o código HTTP em caso de falha)
+        """
+        status, response = self.request(method, path, body)
+        if status != 200:
+            raise ServiceError(status, response.get("error", ""), **{k: v for k, v in response.items() if k != "error"})
+        return response
+
+    def addModel(self, model: dict, id: str = None, options: dict = None) -> dict:
+        return self.call("POST", "/models", {"model": model, "id": id, "options": options or {}})
+
+    def setLoads(self, id: str, NodalLoads: list) -> dict:
+        return self.call("POST", f"/models/{id}/loads", {"nodalLoads": NodalLoads})
+
+    def setRestrictions(self, id: str, Restrictions: list = None, remove: list = None) -> dict:
+        return self.call("POST", f"/models/{id}/restrictions", {"restrictions": Restrictions or [], "remove": remove or []})
+
+    def replaceModel(self, id: str, model: dict) -> dict:
+        return self.call("PUT", f"/models/{id}", {"model": model})
+
+    def results(self, id: str) -> dict:
+        return self.call("GET", f"/models/{id}")
+
+    def removeModel(self, id: str) -> dict:
+        return self.call("DELETE", f"/models/{id}")
+
+    def status(self) -> dict:
+        return self.call("GET", "/status")
+
+    def close(self):
+        self.connection.close()
+
+
+async def serve(host: str, port: int, unixSocket: str, maxSize: float, workers: int):
+    service = AnalysisService(maxSize, workers)
+    address = await service.start(host, port, unixSocket)
+    print(f"Serviço de análise em {address} (Ctrl+C para encerrar)")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serviço de análise com modelos e fatorações em memória")
+    parser.add_argument("--host", default="127.0.0.1", help="endereço de escuta (padrão: apenas localhost)")
+    parser.add_argument("--port", type=int, default=8765, help="porta TCP")
+    parser.add_argument("--unix", default=None, help="socket Unix (em vez de TCP)")
+    parser.add_argument("--workers", type=int, default=None, help="número de threads de análise")
+    parser.add_argument("--max-size", type=float, default=512, help="memória máxima dos modelos registrados [MB]")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.max_size, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import scipy.sparse as sp
+import DataReader
+
+
+def toDense(matrix) -> np.ndarray:
+    """
+    Converte um bloco da matriz de rigidez (denso ou esparso) para um array denso
+    """
+    return matrix.toarray() if sp.issparse(matrix) else np.asarray(matrix)
+
+
+class AnalysisSession:
+    """
+    Sessão de reanálise incremental de uma estrutura (Truss2D ou Truss3D).
+
+    A matriz de rigidez montada e a fatoração do bloco livre K_ff da configuração de apoios de referência são
+    mantidas entre as análises:
+    - mudanças apenas nas ações nodais reutilizam a fatoração (somente substituições);
+    - mudanças de apoios (fixação, liberação ou deslocamento prescrito de GLs) e de rigidezes de molas são
+      tratadas como uma atualização de posto baixo (Sherman–Morrison–Woodbury): o sistema de referência é
+      bordeado pelas colunas dos GLs modificados e resolvido pelo complemento de Schur, de dimensão igual ao
+      número de GLs modificados. Acima de maxRank GLs modificados, a configuração atual é refatorada
+    """
+    def __init__(self, structure, maxRank: int = 64):
+        """
+        structure: estrutura cujas tabelas de apoios e de ações nodais são alteradas pela sessão
+        maxRank: número máximo de GLs modificados em relação à referência antes de uma nova fatoração
+        """
+        self.structure = structure
+        self.maxRank = maxRank
+        self.nFactorizations = 0            # Número de fatorações da matriz de referência
+        self.nUpdates = 0                   # Número de atualizações de posto baixo (mudanças de apoios)
+        self.nSolves = 0                    # Número de análises realizadas pela sessão
+
+        # Monta a matriz de rigidez apenas uma vez
+        if getattr(structure, "KGS_Singular", None) is None:
+            structure.calculateKGS_Singular()
+        self.factorize()
+
+    def factorize(self):
+        """
+        Fatora o bloco livre da configuração de apoios atual, que passa a ser a referência da sessão
+        """
+        S = self.structure
+        S.defineBoundaryDOFs()
+        S.definePartition()
+        self.K_ff, self.K_fp = S.partitionedStiffness()
+        S.solver.prepare(self.K_ff)
+
+        # Configuração de referência
+        self.fDOFs = S.fDOFs                                    # GLs livres da referência
+        self.pPos = np.full(S.nGL, -1, dtype=np.int64)          # Posição dos GLs prescritos nas colunas de K_fp
+        self.pPos[S.pDOFs] = np.arange(S.pDOFs.size)
+        self.baseCodes = S.dofArray(S.supportCodes).copy()
+        self.baseValues = S.dofArray(S.supportValues).copy()
+        self.nFactorizations += 1
+        self.update = None
+
+    def defineUpdate(self):
+        """
+        Define a atualização de posto baixo da configuração de apoios atual em relação à referência:
+        bordas V e R, bloco Z, X = K_ff^-1.V e o complemento de Schur Z - R.X
+        """
+        S = self.structure
+        FIX, PRESC, FLEX = (DataReader.SUPPORT_TYPES.index(type) for type in ("fix", "prescrible", "flexible"))
+        codes = S.dofArray(S.supportCodes);     values = S.dofArray(S.supportValues)
+
+        # GLs livres (inclusive com apoio flexível) e rigidezes das molas na referência e na configuração atual
+        free0 = (self.baseCodes != FIX) & (self.baseCodes != PRESC)
+        free = (codes != FIX) & (codes != PRESC)
+        k0 = np.where(self.baseCodes == FLEX, self.baseValues, 0.0)
+        k = np.where(codes == FLEX, values, 0.0)
+
+        springs = np.flatnonzero(free0 & free & (k != k0))      # GLs com mudança de rigidez de mola
+        constrained = np.flatnonzero(free0 & ~free)             # GLs livres na referência e restringidos agora
+        released = np.flatnonzero(~free0 & free)                # GLs restringidos na referência e livres agora
+        prescribed = np.flatnonzero(~free0 & ~free)             # GLs restringidos em ambas
+        m = springs.size + constrained.size + released.size
+
+        # Refatora quando a modificação deixa de ser de posto baixo
+        if m > self.maxRank:
+            self.factorize()
+            return self.defineUpdate()
+
+        iS = np.arange(springs.size)
+        iC = springs.size + np.arange(constrained.size)
+        iA = springs.size + constrained.size + np.arange(released.size)
+        posF = lambda DOFs: np.searchsorted(self.fDOFs, DOFs)
+
+        V = np.zeros((self.fDOFs.size, m));     R = np.zeros((m, self.fDOFs.size));     Z = np.zeros((m, m))
+
+        # Molas: incógnita auxiliar w = u_s, com K_ff.u + dk.w = b e w - u_s = 0
+        V[posF(springs), iS] = (k - k0)[springs]
+        R[iS, posF(springs)] = -1
+        Z[iS, iS] = 1
+
+        # Novas restrições: multiplicadores de Lagrange (reações) com u_c = valor prescrito
+        V[posF(constrained), iC] = 1
+        R[iC, posF(constrained)] = 1
+
+        # GLs liberados: linhas e colunas de K acrescentadas ao sistema de referência
+        K_fA = toDense(self.K_fp[:, self.pPos[released]])
+        V[:, iA] = K_fA
+        R[iA, :] = K_fA.T
+        Z[np.ix_(iA, iA)] = toDense(S.extractBlock(released, released)) + np.diag(k[released])
+
+        X = S.solver.solve(V) if m > 0 else np.zeros((self.fDOFs.size, 0))
+        self.update = {"constrained": constrained, "uC": np.where(codes[constrained] == PRESC, values[constrained], 0.0),
+                       "released": released, "prescribed": prescribed,
+                       "uP": np.where(codes[prescribed] == PRESC, values[prescribed], 0.0),
+                       "K_fP": self.K_fp[:, self.pPos[prescribed]], "K_AP": S.extractBlock(released, prescribed),
+                       "iC": iC, "iA": iA, "R": R, "X": X, "schur": Z - R @ X, "rank": m}
+        if m > 0:
+            self.nUpdates += 1
+
+    def setNodalLoads(self, NodalLoads):
+        """
+        Substitui as ações nodais da estrutura (lista do JSON ou arrays {"no", "forcas"}); a fatoração é reutilizada
+        """
+        S = self.structure
+        S.nodalForces[:] = 0
+        S.hasLoad[:] = False
+        if isinstance(NodalLoads, dict):
+            S.defineLoadTable(NodalLoads["no"], NodalLoads["forcas"])
+        else:
+            S.defineNodalLoads(NodalLoads)
+
+    def setRestrictions(self, Restrictions):
+        """
+        Define ou substitui as restrições dos nós indicados (lista de restrições no formato do JSON)
+        """
+        self.structure.defineRestrictions(Restrictions)
+        self.update = None
+
+    def removeRestrictions(self, nodes):
+        """
+        Remove todas as restrições dos nós indicados (IDs)
+        """
+        self.structure.removeSupports(nodes)
+        self.update = None
+
+    def solve(self, F: np.ndarray = None) -> np.ndarray:
+        """
+        Analisa a estrutura com as ações nodais e os apoios atuais e atualiza os seus resultados
+        (deslocamentos, esforços normais e reações).
+        F: vetor de forças nodais (ou matriz nGL x nº de vetores) na numeração original dos GLs;
+           por padrão, o das ações nodais da estrutura
+        """
+        S = self.structure
+        if self.update is None:
+            self.defineUpdate()
+        up = self.update
+        F = S.dofArray(S.nodalForces).copy() if F is None else S.internalOrder(np.asarray(F, dtype=float))
+        column = lambda v: v if F.ndim == 1 else v[:, None]
+
+        # Sistema de referência com os deslocamentos dos GLs prescritos levados ao vetor de forças
+        b = F[self.fDOFs] - column(up["K_fP"] @ up["uP"])
+        x = S.solver.solve(b)
+
+        # Correção de posto baixo pelo complemento de Schur
+        u = np.zeros(F.shape)
+        if up["rank"] > 0:
+            c = np.zeros((up["rank"],) + F.shape[1:])
+            c[up["iC"]] = column(up["uC"])
+            c[up["iA"]] = F[up["released"]] - column(up["K_AP"] @ up["uP"])
+            w = np.linalg.solve(up["schur"], c - up["R"] @ x)
+            x = x - up["X"] @ w
+            u[up["released"]] = w[up["iA"]]
+        u[self.fDOFs] = x
+        u[up["prescribed"]] = column(up["uP"])
+        u[up["constrained"]] = column(up["uC"])
+
+        # Atualiza os resultados da estrutura (reações R = K.u - F nos GLs restringidos)
+        S.GForcesV = F
+        S.nodalDisp = u
+        S.defineBoundaryDOFs()
+        S.calcEIS()
+        S.reactionsV = np.zeros(F.shape)
+        S.reactionsV[S.restrDOFs] = (S.KGS_Singular @ u - F)[S.restrDOFs]
+        S.calcReactions()
+        self.nSolves += 1
+        return u
+
+    def results(self) -> dict:
+        """
+        Resultados da última análise da sessão (deslocamentos, esforços normais e reações)
+        """
+        S = self.structure
+        return {"NodalDisplacements": S.userOrder(S.nodalDisp).tolist(), "Elements": S.outputElements(),
+                "Reactions": S.outputReactions(), "Session": self.info()}
+
+    def info(self) -> dict:
+        """
+        Estatísticas da sessão e do resolvedor
+        """
+        return {"nFactorizations": self.nFactorizations, "nUpdates": self.nUpdates, "nSolves": self.nSolves,
+                "rank": None if self.update is None else self.update["rank"], "maxRank": self.maxRank,
+                **self.structure.solver.info()}
@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+import sys
+import time
+import warnings
+from abc import ABC, abstractmethod
+import numpy as np
+
+# O SciPy e o scikit-sparse são importados apenas pelos resolvedores esparsos, na primeira utilização: a análise
+# com armazenamento denso não os carrega
+_CHOLMOD = None             # Módulo sksparse.cholmod (False quando não instalado; ver cholmod)
+
+
+def cholmod():
+    """
+    Módulo da Cholesky esparsa do CHOLMOD (opcional, scikit-sparse), importado na primeira chamada;
+    None quando não instalado
+    """
+    global _CHOLMOD
+    if _CHOLMOD is None:
+        try:
+            from sksparse import cholmod as module
+            _CHOLMOD = module
+        except ImportError:
+            _CHOLMOD = False
+    return _CHOLMOD or None
+
+def isSparse(matrix) -> bool:
+    """
+    Indica se a matriz é esparsa (SciPy) sem importar o SciPy: sem o módulo carregado, nenhuma matriz é esparsa
+    """
+    sparse = sys.modules.get("scipy.sparse")
+    return sparse is not None and sparse.issparse(matrix)
+
+
+class Solver(ABC):
+    """
+    Classe base dos resolvedores do sistema linear K.u = F
+    """
+    name = "base"
+    factorTransfer = False          # Permite exportar e importar fatorações (ver exportFactor e importFactor)
+
+    def __init__(self):
+        self.factorTime = 0.0       # Tempo de fatoração (ou de construção do precondicionador) [s]
+        self.solveTime = 0.0        # Tempo de solução [s]
+        self.iterations = 0         # Número de iterações (resolvedores iterativos)
+        self.nRHS = 0               # Número de vetores de forças resolvidos
+        self.factorImported = False # Indica uma fatoração importada (ver importFactor), utilizada na próxima solução
+
+    @abstractmethod
+    def factorize(self, K):
+        """
+        Prepara o resolvedor para a matriz K (fatoração ou precondicionador)
+        """
+
+    @abstractmethod
+    def solveFactorized(self, F: np.ndarray) -> np.ndarray:
+        """
+        Resolve o sistema com a matriz já fatorada
+        """
+
+    def solve(self, F: np.ndarray) -> np.ndarray:
+        """
+        Resolve o sistema para um ou mais vetores de forças (colunas de F), registrando o tempo de solução
+        """
+        start = time.perf_counter()
+        u = self.solveFactorized(F)
+        self.solveTime += time.perf_counter() - start
+        self.nRHS += 1 if np.ndim(F) == 1 else np.shape(F)[1]
+        return u
+
+    def prepare(self, K):
+        """
+        Fatora a matriz K, registrando o tempo de fatoração (a fatoração importada, quando houver, é utilizada)
+        """
+        if self.factorImported:
+            self.factorImported = False
+            return
+        start = time.perf_counter()
+        self.factorize(K)
+        self.factorTime += time.perf_counter() - start
+
+    def refactor(self, K):
+        """
+        Fatora uma nova matriz com o mesmo padrão de esparsidade da fatoração anterior (p.ex. as matrizes tangentes
+        sucessivas da análise não linear), registrando o tempo de fatoração
+        """
+        start = time.perf_counter()
+        self.refactorize(K)
+        self.factorTime += time.perf_counter() - start
+
+    def refactorize(self, K):
+        """
+        Nova fatoração com o mesmo padrão de esparsidade; por padrão, equivale a uma fatoração completa.
+        A LU esparsa reutiliza a ordenação de colunas; a Cholesky (CHOLMOD) reutiliza a análise simbólica
+        """
+        self.factorize(K)
+
+    def factorizeAndSolve(self, K, F: np.ndarray) -> np.ndarray:
+        """
+        Fatora a matriz K e resolve o sistema
+        """
+        self.prepare(K)
+        return self.solve(F)
+
+    def spec(self) -> dict:
+        """
+        Tipo e parâmetros do resolvedor (ver defineSolver)
+        """
+        return {"type": self.name}
+
+    def exportFactor(self) -> dict:
+        """
+        Arrays da fatoração atual para armazenamento externo (None quando não há fatoração exportável).
+        Disponível apenas nos resolvedores com factorTransfer
+        """
+        return None
+
+    def importFactor(self, arrays: dict):
+        """
+        Restaura uma fatoração exportada por exportFactor, utilizada no lugar da próxima fatoração.
+        Disponível apenas nos resolvedores com factorTransfer
+        """
+        raise TypeError(f"O resolvedor '{self.name}' não permite importar fatorações")
+
+    def info(self) -> dict:
+        """
+        Estatísticas do resolvedor para a saída de resultados
+        """
+        return {"solver": self.name, "factorTime [s]": self.factorTime, "solveTime [s]": self.solveTime,
+                "iterations": self.iterations, "nRHS": self.nRHS}
+
+
+class DenseSolver(Solver):
+    """
+    Resolvedor direto denso (np.linalg.solve)
+    """
+    name = "dense"
+
+    def factorize(self, K):
+        self.K = K.toarray() if isSparse(K) else np.asarray(K)
+
+    def solveFactorized(self, F):
+        return np.linalg.solve(self.K, F)
+
+
+class TriangularLU:
+    """
+    Fatoração LU restaurada dos seus fatores (Pr.K.Pc = L.U), resolvida por substituições triangulares
+    """
+    def __init__(self, L, U, perm_r: np.ndarray, perm_c: np.ndarray):
+        import scipy.sparse as sp
+        self.L = sp.csr_matrix(L)
+        self.U = sp.csr_matrix(U)
+        self.perm_r = np.asarray(perm_r)
+        self.perm_c = np.asarray(perm_c)
+
+    def solve(self, F: np.ndarray) -> np.ndarray:
+        from scipy.sparse.linalg import spsolve_triangular
+        y = np.empty_like(F)
+        y[self.perm_r] = F
+        y = spsolve_triangular(self.L, y, lower=True, unit_diagonal=True)
+        y = spsolve_triangular(self.U, y, lower=False)
+        return y[self.perm_c]
+
+
+class PermutedLU:
+    """
+    Fatoração LU da matriz permutada simetricamente K[order][:, order], resolvida na numeração original
+    """
+    def __init__(self, factor, order: np.ndarray):
+        self.factor = factor
+        self.order = order
+
+    def solve(self, F: np.ndarray) -> np.ndarray:
+        u = np.empty_like(F)
+        u[self.order] = self.factor.solve(F[self.order])
+        return u
+
+
+# Ordenações de colunas do SuperLU ("natural" preserva a numeração dos GLs, p.ex. após a renumeração RCM)
+ORDERINGS = {"colamd": "COLAMD", "amd": "MMD_AT_PLUS_A", "natural": "NATURAL"}
+
+
+class SparseLUSolver(Solver):
+    """
+    Resolvedor direto esparso por fatoração LU (SuperLU)
+    """
+    name = "splu"
+    factorTransfer = True
+
+    def __init__(self, ordering: str = "colamd"):
+        """
+        ordering: ordenação das colunas na fatoração ("colamd", "amd" ou "natural")
+        """
+        super().__init__()
+        if ordering not in ORDERINGS:
+            raise ValueError(f"Ordenação desconhecida: '{ordering}'")
+        self.ordering = ordering
+
+    def factorize(self, K):
+        import scipy.sparse as sp
+        from scipy.sparse.linalg import splu
+        self.factor = splu(sp.csc_matrix(K), permc_spec=ORDERINGS[self.ordering])
+        self.order = None
+
+    def refactorize(self, K):
+        # Reutiliza apenas a ordenação de colunas da fatoração anterior, como permutação simétrica: o SuperLU não
+        # permite reaproveitar a fatoração simbólica, que é refeita (com a ordenação natural) a cada chamada
+        import scipy.sparse as sp
+        from scipy.sparse.linalg import splu
+        K = sp.csc_matrix(K)
+        order = getattr(self, "order", None)
+        factor = getattr(self, "factor", None)
+        if order is None and hasattr(factor, "perm_c") and factor.perm_c.size == K.shape[0]:
+            order = np.argsort(factor.perm_c)
+        if order is None:
+            self.factorize(K)
+            return
+        self.factor = PermutedLU(splu(K[order][:, order].tocsc(), permc_spec="NATURAL"), order)
+        self.order = order
+
+    def solveFactorized(self, F):
+        return self.factor.solve(np.asarray(F, dtype=float))
+
+    def exportFactor(self):
+        factor = getattr(self, "factor", None)
+        if factor is None or getattr(self, "order", None) is not None:
+            return None
+        return {"L": factor.L, "U": factor.U, "perm_r": factor.perm_r, "perm_c": factor.perm_c}
+
+    def importFactor(self, arrays):
+        self.factor = TriangularLU(arrays["L"], arrays["U"], arrays["perm_r"], arrays["perm_c"])
+        self.order = None
+        self.factorImported = True
+
+    def spec(self):
+        return {"type": self.name, "ordering": self.ordering}
+
+
+class CholeskySolver(Solver):
+    """
+    Resolvedor direto esparso por fatoração de Cholesky (CHOLMOD) para matrizes simétricas positivas definidas.
+    Sem o scikit-sparse instalado, utiliza a fatoração LU esparsa
+    """
+    name = "cholesky"
+    factorTransfer = True           # Apenas a fatoração LU (sem o CHOLMOD) é exportada
+
+    def __init__(self, ordering: str = "amd"):
+        """
+        ordering: ordenação de preenchimento mínimo da fatoração ("amd", "colamd" ou "natural")
+        """
+        super().__init__()
+        if ordering not in ORDERINGS:
+            raise ValueError(f"Ordenação desconhecida: '{ordering}'")
+        self.ordering = ordering
+        if cholmod() is None:
+            warnings.warn("scikit-sparse (CHOLMOD) não instalado: o resolvedor 'cholesky' utilizará a fatoração LU "
+                          "esparsa (SuperLU)", RuntimeWarning, stacklevel=2)
+
+    def factorize(self, K):
+        import scipy.sparse as sp
+        if cholmod() is not None:
+            self.backend = "cholmod"
+            self.factor = cholmod().cholesky(sp.csc_matrix(K), ordering_method=self.ordering)
+        else:
+            self.backend = "splu"
+            SparseLUSolver.factorize(self, K)
+
+    def refactorize(self, K):
+        # CHOLMOD: reutiliza a análise simbólica. Uma matriz não positiva definida (p.ex. a matriz tangente após
+        # um ponto limite) passa a ser fatorada pela LU esparsa
+        if getattr(self, "backend", None) == "cholmod":
+            import scipy.sparse as sp
+            try:
+                self.factor.cholesky_inplace(sp.csc_matrix(K))
+                return
+            except cholmod().CholmodNotPositiveDefiniteError:
+                self.backend = "splu"
+                SparseLUSolver.factorize(self, K)
+                return
+        if getattr(self, "backend", None) == "splu":
+            SparseLUSolver.refactorize(self, K)
+        else:
+            self.factorize(K)
+
+    def solveFactorized(self, F):
+        F = np.asarray(F, dtype=float)
+        if self.backend == "cholmod":
+            return self.factor(F)
+        return self.factor.solve(F)
+
+    def exportFactor(self):
+        # Apenas a fatoração LU (a do CHOLMOD não é exportável)
+        if getattr(self, "backend", None) != "splu":
+            return None
+        return SparseLUSolver.exportFactor(self)
+
+    def importFactor(self, arrays):
+        self.backend = "splu"
+        SparseLUSolver.importFactor(self, arrays)
+
+    def spec(self):
+        return {"type": self.name, "ordering": self.ordering}
+
+    def info(self):
+        info = super().info()
+        info["backend"] = getattr(self, "backend", None)
+        return info
+
+
+class PCGSolver(Solver):
+    """
+    Resolvedor iterativo por gradientes conjugados precondicionados (matriz simétrica positiva definida)
+    """
+    name = "pcg"
+
+    def __init__(self, preconditioner: str = "jacobi", tol: float = 1e-10, maxiter: int = None,
+                 dropTol: float = 1e-4, fillFactor: float = 10):
+        """
+        preconditioner: "jacobi", "ic" (fatoração incompleta) ou "none"
+        tol: tolerância relativa do resíduo
+        maxiter: número máximo de iterações por vetor de forças
+        dropTol, fillFactor: controles da fatoração incompleta
+        """
+        super().__init__()
+        if preconditioner not in ("jacobi", "ic", "none", None):
+            raise ValueError(f"Precondicionador desconhecido: '{preconditioner}'")
+        self.preconditioner = preconditioner or "none"
+        self.tol = tol
+        self.maxiter = maxiter
+        self.dropTol = dropTol
+        self.fillFactor = fillFactor
+
+    def factorize(self, K):
+        import scipy.sparse as sp
+        from scipy.sparse.linalg import spilu, LinearOperator
+        self.K = sp.csr_matrix(K)
+
+        # O método exige uma matriz simétrica
+        if abs(self.K - self.K.T).max() > 1e-12*abs(self.K).max():
+            raise ValueError("O resolvedor PCG exige uma matriz de rigidez simétrica")
+
+        # Constrói o precondicionador
+        if self.preconditioner == "jacobi":
+            invDiag = 1/self.K.diagonal()
+            self.M = LinearOperator(self.K.shape, matvec=lambda x: invDiag*x.ravel(), dtype=float)
+        elif self.preconditioner == "ic":
+            # Fatoração incompleta (ILU com limiar) aplicada à matriz simétrica como aproximação da IC
+            ilu = spilu(sp.csc_matrix(self.K), drop_tol=self.dropTol, fill_factor=self.fillFactor)
+            self.M = LinearOperator(self.K.shape, matvec=ilu.solve, dtype=float)
+        else:
+            self.M = None
+
+    def solveColumn(self, f: np.ndarray) -> np.ndarray:
+        """
+        Resolve o sistema para um único vetor de forças
+        """
+        count = [0]
+        def callback(xk):
+            count[0] += 1
+
+        from scipy.sparse.linalg import cg
+        u, flag = cg(self.K, f, rtol=self.tol, atol=0.0, maxiter=self.maxiter, M=self.M, callback=callback)
+        self.iterations += count[0]
+        if flag > 0:
+            raise RuntimeError(f"O resolvedor PCG não convergiu em {count[0]} iterações")
+        return u
+
+    def solveFactorized(self, F):
+        F = np.asarray(F, dtype=float)
+        if F.ndim == 1:
+            return self.solveColumn(F)
+        return np.column_stack([self.solveColumn(F[:, j]) for j in range(F.shape[1])])
+
+    def spec(self):
+        return {"type": self.name, "preconditioner": self.preconditioner, "tol": self.tol, "maxiter": self.maxiter,
+                "dropTol": self.dropTol, "fillFactor": self.fillFactor}
+
+    def info(self):
+        info = super().info()
+        info.update({"preconditioner": self.preconditioner, "tol": self.tol, "maxiter": self.maxiter})
+        return info
+
+
+def defineSolver(params, storage: str = "dense") -> Solver:
+    """
+    Cria o resolvedor a partir do nome ("dense", "splu", "spsolve", "cholesky", "pcg") ou de um dicionário
+    com a chave "type" e os parâmetros do resolvedor. Sem parâmetros, é escolhido de acordo com o armazenamento
+    """
+    if params is None:
+        params = "splu" if storage == "sparse" else "dense"
+    if isinstance(params, str):
+        params = {"type": params}
+
+    params = dict(params)
+    type = params.pop("type")
+    if type == "dense":
+        return DenseSolver()
+    elif type in ("splu", "spsolve"):
+        return SparseLUSolver(**params)
+    elif type == "cholesky":
+        return CholeskySolver(**params)
+    elif type == "pcg":
+        return PCGSolver(**params)
+    raise ValueError(f"Resolvedor desconhecido: '{type}'")
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Verificação da estabilidade (hipostaticidade) de treliças antes da montagem e da fatoração do sistema:
+contagem de restrições (Maxwell), GLs sem rigidez, rigidez genérica pelo jogo de pedras (pebble game, apenas na
+treliça plana) e posto numérico da matriz de rigidez livre, com os nós e GLs que formam os mecanismos e uma
+estimativa do número de condição
+"""
+import numpy as np
+import DataReader
+from Solvers import isSparse
+
+DENSE_LIMIT = 400           # Até este número de GLs livres, a matriz é densa e os autovalores são obtidos pelo NumPy
+MODE_TOL = 1e-3             # Componente relativa mínima de um GL em um modo de mecanismo
+
+
+class PebbleGame:
+    """
+    Jogo de pedras (2, 3) de Jacobs e Hendrickson para a rigidez genérica de treliças planas.
+    Os apoios são barras ligadas a um triângulo rígido que representa o solo (nós nNodes, nNodes + 1 e nNodes + 2);
+    cada nó inicia com 2 pedras e cada barra independente consome uma pedra de uma das suas extremidades
+    """
+    def __init__(self, nNodes: int):
+        self.nNodes = nNodes
+        self.ground = nNodes                                    # Primeiro nó do solo
+        self.pebbles = np.full(nNodes + 3, 2, dtype=np.int64)   # Pedras livres por nó
+        self.out = [[] for _ in range(nNodes + 3)]              # Barras cobertas pelas pedras de cada nó (arestas orientadas)
+        self.nRedundant = 0                                     # Barras redundantes (hiperestaticidade genérica)
+        g = self.ground
+        for u, v in ((g, g + 1), (g + 1, g + 2), (g, g + 2)):
+            self.addEdge(u, v)
+
+    def findPebble(self, root: int, blocked: tuple) -> bool:
+        """
+        Procura uma pedra livre acessível a partir de root (busca em profundidade pelas arestas orientadas, sem
+        passar pelos nós bloqueados) e a leva até root invertendo o caminho
+        """
+        parent = {root: None}
+        for b in blocked:
+            parent.setdefault(b, None)
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for w in self.out[u]:
+                if w in parent:
+                    continue
+                parent[w] = u
+                if self.pebbles[w] > 0:
+                    # Inverte o caminho root -> ... -> w, levando a pedra de w até root
+                    self.pebbles[w] -= 1
+                    self.pebbles[root] += 1
+                    while parent[w] is not None:
+                        p = parent[w]
+                        self.out[p].remove(w)
+                        self.out[w].append(p)
+                        w = p
+                    return True
+                stack.append(w)
+        return False
+
+    def addEdge(self, u: int, v: int) -> bool:
+        """
+        Insere a barra (u, v): é independente quando 4 pedras podem ser reunidas nas suas extremidades
+        """
+        while self.pebbles[u] < 2 and self.findPebble(u, (u, v)):
+            pass
+        while self.pebbles[v] < 2 and self.findPebble(v, (u, v)):
+            pass
+        if self.pebbles[u] + self.pebbles[v] < 4:
+            self.nRedundant += 1
+            return False
+        self.pebbles[u] -= 1
+        self.out[u].append(v)
+        return True
+
+    def addSupport(self, node: int, k: int):
+        """
+        Insere a k-ésima restrição de apoio de um nó (barra até um dos nós do solo)
+        """
+        return self.addEdge(node, self.ground + k % 3)
+
+    @property
+    def nMechanisms(self) -> int:
+        """
+        Número de mecanismos genéricos (pedras livres além das 3 do corpo rígido do solo)
+        """
+        return int(self.pebbles.sum()) - 3
+
+    def floppyNodes(self) -> np.ndarray:
+        """
+        Nós fora da componente rígida do solo: com as 3 pedras do solo fixadas em dois dos seus nós, um nó é
+        rígido quando nenhuma pedra livre é acessível a partir dele. As buscas sem sucesso marcam como rígidos
+        todos os nós visitados
+        """
+        g = self.ground
+        while self.pebbles[g] < 2 and self.findPebble(g, (g, g + 1)):
+            pass
+        while self.pebbles[g] + self.pebbles[g + 1] < 3 and self.findPebble(g + 1, (g, g + 1)):
+            pass
+        state = np.zeros(self.nNodes + 3, dtype=np.int8)        # 0: não visitado, 1: rígido, 2: mecanismo
+        state[g:] = 1
+        for root in range(self.nNodes):
+            if state[root]:
+                continue
+            parent = {root: None}
+            stack = [root]
+            found = root if self.pebbles[root] > 0 else None
+            while stack and found is None:
+                u = stack.pop()
+                for w in self.out[u]:
+                    if w in parent or state[w] == 1:
+                        continue
+                    parent[w] = u
+                    if state[w] == 2 or self.pebbles[w] > 0:
+                        found = w
+                        break
+                    stack.append(w)
+            if found is None:
+                state[list(parent)] = 1
+            else:
+                # Os nós do caminho até a pedra livre também podem se mover
+                w = found
+                while w is not None:
+                    state[w] = 2
+                    w = parent[w]
+        return np.flatnonzero(state[:self.nNodes] == 2)
+
+
+class StabilityAnalysis:
+    """
+    Verificação da estabilidade de uma estrutura (Truss2D ou Truss3D) com os apoios atuais:
+    1. contagem de Maxwell (barras e restrições x GLs);
+    2. GLs livres sem rigidez (nenhuma barra ou mola na sua direção);
+    3. rigidez genérica pelo jogo de pedras (treliça plana), que localiza os nós dos mecanismos sem cálculo numérico;
+    4. posto numérico: menores autovalores da matriz de rigidez livre escalada pela diagonal (Jacobi), que detectam
+       também os mecanismos de geometrias particulares (p.ex. barras colineares) e estimam o número de condição.
+    Por padrão, a etapa numérica é dispensada quando as etapas anteriores já encontram um mecanismo
+    """
+    def __init__(self, structure, tol: float = 1e-15, numeric: bool = None, maxModes: int = 4):
+        """
+        tol: autovalor (da matriz escalada, relativo ao maior) abaixo do qual o modo é considerado um mecanismo; os
+             autovalores dos mecanismos são da ordem do erro de arredondamento, enquanto estruturas muito esbeltas
+             (mal condicionadas, mas estáveis) podem ter autovalores relativos de até 1e-14
+        numeric: executa a etapa numérica (True), nunca (False) ou apenas quando as anteriores não encontram
+                 mecanismos (None)
+        maxModes: número inicial de autovalores calculados na etapa numérica (dobrado enquanto todos forem nulos)
+        """
+        self.structure = structure
+        self.tol = tol
+        self.numeric = numeric
+        self.maxModes = maxModes
+        self.method = None
+        self.nMechanisms = 0
+        self.nRedundant = None
+        self.mechanismDOFs = np.zeros(0, dtype=np.int64)
+        self.conditionEstimate = None
+        self.eigenvalues = None
+
+    def defineTables(self):
+        """
+        Tabelas da verificação nos GLs da numeração original (GL = nGLpN.índice do nó + direção): GLs livres,
+        rigidez das molas e, por barra, os GLs, os coeficientes da compatibilidade (alongamento = b.u) e a rigidez axial
+        """
+        S = self.structure
+        n = S.GLpE
+        codes = np.asarray(S.supportCodes).ravel()
+        self.restrained = codes == DataReader.SUPPORT_TYPES.index("fix")
+        self.restrained |= codes == DataReader.SUPPORT_TYPES.index("prescrible")
+        self.springs = np.where(codes == DataReader.SUPPORT_TYPES.index("flexible"), np.asarray(S.supportValues).ravel(), 0.0)
+        self.freeDOFs = np.flatnonzero(~self.restrained)
+
+        T = S.elemTable
+        self.DOFs = np.hstack((T.initNodes[:, None]*n + np.arange(n), T.finalNodes[:, None]*n + np.arange(n)))
+        self.b = np.hstack((-T.cossines, T.cossines))
+        self.k = T.E*T.A/T.L
+
+    def countCheck(self) -> int:
+        """
+        Contagem de Maxwell: GLs livres menos barras e molas (um valor positivo garante mecanismos)
+        """
+        return int(self.freeDOFs.size - self.k.size - np.count_nonzero(self.springs))
+
+    def pebbleCheck(self):
+        """
+        Rigidez genérica da treliça plana pelo jogo de pedras
+        """
+        S = self.structure
+        game = PebbleGame(S.nNodes)
+        T = S.elemTable
+        for u, v in zip(T.initNodes.tolist(), T.finalNodes.tolist()):
+            game.addEdge(u, v)
+        supported = (self.restrained | (self.springs != 0)).reshape(S.nNodes, S.GLpE)
+        for node, k in zip(*np.nonzero(supported)):
+            game.addSupport(int(node), int(k))
+        self.method = "pebble"
+        self.nRedundant = game.nRedundant
+        self.nMechanisms = game.nMechanisms
+        if self.nMechanisms > 0:
+            nodes = game.floppyNodes()
+            DOFs = (nodes[:, None]*S.GLpE + np.arange(S.GLpE)).ravel()
+            self.mechanismDOFs = DOFs[~self.restrained[DOFs]]
+
+    def freeStiffness(self):
+        """
+        Matriz de rigidez dos GLs livres (com as molas), k.b.b^T por barra: densa até DENSE_LIMIT GLs livres
+        (apenas com o NumPy) e esparsa acima
+        """
+        nFree = self.freeDOFs.size
+        position = np.full(self.structure.nGL, -1, dtype=np.int64)
+        position[self.freeDOFs] = np.arange(nFree)
+        DOFs = position[self.DOFs]
+        m = DOFs.shape[1]
+        rows = np.repeat(DOFs, m, axis=1).ravel()
+        cols = np.tile(DOFs, (1, m)).ravel()
+        values = (self.k[:, None, None]*self.b[:, :, None]*self.b[:, None, :]).ravel()
+        keep = (rows >= 0) & (cols >= 0)
+        springs = self.springs[self.freeDOFs]
+        if nFree <= DENSE_LIMIT:
+            K = np.diag(springs)
+            np.add.at(K, (rows[keep], cols[keep]), values[keep])
+            return K
+        import scipy.sparse as sp
+        return (sp.coo_matrix((values[keep], (rows[keep], cols[keep])), shape=(nFree, nFree)) + sp.diags(springs)).tocsr()
+
+    def numericCheck(self):
+        """
+        Posto numérico da matriz de rigidez livre escalada pela diagonal: os autovalores nulos são os mecanismos
+        (os GLs com componentes relevantes nos seus modos formam o mecanismo) e a razão entre o maior e o menor
+        autovalor estima o número de condição da matriz escalada
+        """
+        self.method = "spectral"
+        K = self.freeStiffness()
+        diag = K.diagonal()
+        scale = np.abs(diag).max(initial=0.0)
+        empty = diag <= np.finfo(float).eps*scale           # GLs sem rigidez (mecanismos imediatos)
+        active = np.flatnonzero(~empty)
+        if active.size < diag.size:
+            K = K[active][:, active]
+        d = 1/np.sqrt(diag[active])
+        if isSparse(K):
+            import scipy.sparse as sp
+            Ks = (sp.diags(d) @ K @ sp.diags(d)).tocsc()
+        else:
+            Ks = d[:, None]*K*d
+        nActive = active.size
+
+        # Maior autovalor: limitado pelo círculo de Gershgorin (exato na decomposição densa)
+        largest = float(abs(Ks).sum(axis=1).max()) if nActive > 0 else 0.0
+        threshold = self.tol*largest
+        if nActive == 0:
+            values = np.zeros(0);   modes = np.zeros((0, 0))
+        elif nActive <= DENSE_LIMIT:
+            values, modes = np.linalg.eigh(Ks.toarray() if isSparse(Ks) else Ks)
+            largest = values[-1]
+        else:
+            # Menores autovalores por iteração inversa deslocada: com o deslocamento abaixo do limite dos
+            # mecanismos, a matriz K + shift.I é definida positiva e os autovalores pequenos permanecem separados
+            import scipy.sparse as sp
+            from scipy.sparse.linalg import eigsh, splu, LinearOperator
+            k = min(self.maxModes, nActive - 2)
+            shift = max(threshold, np.finfo(float).eps*largest)
+            LU = splu((Ks + shift*sp.identity(nActive, format="csc")).tocsc(), permc_spec="MMD_AT_PLUS_A",
+                      diag_pivot_thresh=0, options={"SymmetricMode": True})
+            OPinv = LinearOperator(Ks.shape, matvec=LU.solve, dtype=float)
+            while True:
+                values, modes = eigsh(Ks, k, sigma=-shift, which='LM', OPinv=OPinv)
+                order = np.argsort(values)
+                values, modes = values[order], modes[:, order]
+                if values[-1] > threshold or k >= nActive - 2:
+                    break
+                k = min(2*k, nActive - 2)
+        null = values <= threshold
+        self.eigenvalues = values
+        self.nMechanisms = int(np.count_nonzero(empty) + np.count_nonzero(null))
+
+        # GLs dos mecanismos: sem rigidez ou com componentes relevantes nos modos nulos
+        weight = np.sqrt((modes[:, null]**2).sum(axis=1)) if null.any() else np.zeros(nActive)
+        moving = weight > MODE_TOL*weight.max(initial=0.0)
+        self.mechanismDOFs = np.sort(np.concatenate((self.freeDOFs[empty], self.freeDOFs[active[moving]])))
+
+        if self.nMechanisms > 0:
+            self.conditionEstimate = np.inf
+        elif nActive > 0:
+            self.conditionEstimate = float(largest/values[0])
+
+    def run(self) -> dict:
+        """
+        Executa as etapas da verificação e retorna o relatório
+        """
+        self.defineTables()
+        self.method = "count"
+        self.maxwell = self.countCheck()
+        self.nMechanisms = max(self.maxwell, 0)
+        if self.structure.GLpE == 2:
+            self.pebbleCheck()
+        if self.numeric or (self.numeric is None and self.nMechanisms == 0):
+            self.numericCheck()
+        elif self.nMechanisms > 0:
+            self.conditionEstimate = np.inf
+        return self.report()
+
+    @property
+    def stable(self) -> bool:
+        """
+        Indica se a estrutura não possui mecanismos
+        """
+        return self.nMechanisms == 0
+
+    def report(self) -> dict:
+        """
+        Relatório da verificação: número de mecanismos, nós (IDs) e GLs (numeração original) que os formam,
+        barras redundantes (hiperestaticidade genérica, na treliça plana) e estimativa do número de condição
+        """
+        S = self.structure
+        nodes = np.unique(self.mechanismDOFs//S.GLpE)
+        return {"stable": self.stable, "method": self.method, "nFreeDOFs": int(self.freeDOFs.size),
+                "maxwell": self.maxwell, "nMechanisms": self.nMechanisms, "nRedundant": self.nRedundant,
+                "mechanismNodes": np.asarray(S.nodeIds)[nodes].tolist(), "mechanismDOFs": self.mechanismDOFs.tolist(),
+                "conditionEstimate": self.conditionEstimate}
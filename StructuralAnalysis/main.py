@@ -11,15 +11,17 @@ if __name__ == '__main__':
             Structure = SAG(caminho_arquivo)    # Entra com o arquivo para o gerenciador de análises
             
             # Verificando se a estrutura é hipostática
-            if Structure.Structure.verifyRestrictions() == True:
+            stability = Structure.Structure.checkStability()
+            if stability["stable"]:
                 Structure.solveStructure()          # Resolve a estrutura
                 Structure.outputResults()           # Gera os arquivos de saída
                 print("\nEstrutura analisada com sucesso!")
 
             else:
-                print("\nNão é possível analisar a estrutura pois esta não é isostática!\n")
-        except:
-            print("\nErro ao realizar a análise!\n")
+                print(f"\nNão é possível analisar a estrutura pois esta é hipostática: {stability['nMechanisms']} "
+                      f"mecanismo(s) envolvendo os nós {stability['mechanismNodes']}\n")
+        except Exception as e:
+            print(f"\nErro ao realizar a análise: {e}\n")
             
         print("\nDeseja inserir um novo arquivo? (Sim -> S / Não -> qualquer tecla)")
 
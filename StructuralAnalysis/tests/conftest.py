@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES = os.path.join(ROOT, "Examples")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Benchmarks"))
+
+EXAMPLE_NAMES = ("Truss01", "Truss02", "Truss03", "Truss04", "Q3")
+
+
+def loadExample(name: str) -> dict:
+    """
+    Modelo de entrada de um exemplo (dicionário do JSON)
+    """
+    with open(os.path.join(EXAMPLES, name + ".json"), 'r') as file:
+        return json.load(file)
+
+
+def loadReference(name: str) -> dict:
+    """
+    Resultados de referência de um exemplo (Examples/<nome>/results.json)
+    """
+    with open(os.path.join(EXAMPLES, name, "results.json"), 'r') as file:
+        return json.load(file)
+
+
+@pytest.fixture(params=EXAMPLE_NAMES)
+def example(request):
+    return request.param
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import json
+import shutil
+import pytest
+import BatchRunner
+from conftest import EXAMPLES, EXAMPLE_NAMES
+
+
+@pytest.fixture
+def models(tmp_path):
+    for name in EXAMPLE_NAMES:
+        shutil.copy(f"{EXAMPLES}/{name}.json", tmp_path)
+    return tmp_path
+
+
+def test_batch_analyses_every_model(models):
+    files = BatchRunner.findModels(str(models))
+    assert len(files) == len(EXAMPLE_NAMES)
+    summary = BatchRunner.runBatch(files, workers=2, options={"outputProfile": "summary"})
+    assert [item["status"] for item in summary] == ["ok"]*len(files)
+    for item in summary:
+        with open(item["results"]) as file:
+            assert "NodalDisplacements" in json.load(file)
+
+
+def test_batch_reports_errors(models):
+    (models / "broken.json").write_text("{}")
+    summary = BatchRunner.runBatch(BatchRunner.findModels(str(models)), workers=1)
+    broken = next(item for item in summary if item["file"].endswith("broken.json"))
+    assert broken["status"] == "error"
+    assert BatchRunner.main([str(models), "--workers", "1"]) == 2
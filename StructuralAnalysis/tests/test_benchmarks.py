@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+import json
+import numpy as np
+import pytest
+import RunBenchmarks
+from SAG import Truss2D, Truss3D
+from TrussGenerators import GENERATORS, generateModel
+
+
+@pytest.mark.parametrize("kind", list(GENERATORS))
+def test_generated_models_are_solvable(kind):
+    model = generateModel(kind, 300)
+    structure = (Truss3D if model["typeStructure"] == "Truss3D" else Truss2D)(model, storage="sparse", bcMethod="partition")
+    structure.solveStructure()
+    assert np.all(np.isfinite(structure.nodalDisp))
+    assert abs(structure.nGL - 300) < 150
+
+
+def test_run_records_history(tmp_path):
+    history = tmp_path / "history.jsonl"
+    argv = ["--models", "warren", "--dofs", "100", "--history", str(history)]
+    assert RunBenchmarks.main(argv) == 0
+    assert RunBenchmarks.main(argv + ["--compare", "--threshold", "1e9"]) == 0
+    records = [json.loads(line) for line in history.read_text().splitlines()]
+    assert len(records) == 2 and set(RunBenchmarks.PHASES) <= set(records[0]["phases [s]"])
+
+
+def test_default_history_outside_source_tree():
+    assert not RunBenchmarks.DEFAULT_HISTORY.startswith(RunBenchmarks.os.path.dirname(RunBenchmarks.__file__))
+
+
+def test_import_budget():
+    record = RunBenchmarks.measureImport()
+    assert record["loadedOnImport"] == [] and record["loadedOnAnalysis"] == []
+    assert RunBenchmarks.checkImportBudget(record)
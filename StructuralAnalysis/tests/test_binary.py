@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pytest
+import DataReader
+from BatchRunner import findModels
+from conftest import loadExample, loadReference
+from SAG import Truss2D
+
+
+def test_binary_roundtrip(example, tmp_path):
+    dir = str(tmp_path / (example + DataReader.BINARY_EXTENSION))
+    DataReader.WriteBinaryModel(dir, loadExample(example))
+    assert os.listdir(tmp_path) == [example + DataReader.BINARY_EXTENSION]
+    data = DataReader.ReadModel(dir)
+    assert isinstance(data["arrays"]["nodeCoords"], np.memmap)
+    structure = Truss2D(data)
+    structure.solveStructure()
+    output = structure.outputResults("summary")
+    reference = loadReference(example)
+    assert np.allclose(output["NodalDisplacements"], reference["NodalDisplacements"], rtol=1e-8, atol=1e-12)
+    assert np.allclose([r["Reactions"] for r in output["Reactions"]],
+                       [r["Reactions"] for r in reference["Reactions"]], atol=1e-8)
+
+
+def test_convert_model_extension(tmp_path):
+    model = loadExample("Truss02")
+    dir = str(tmp_path / "Truss02.json")
+    DataReader.WriteData(dir, model)
+    converted = DataReader.ConvertModel(dir)
+    assert converted.endswith(".trz") and os.path.isfile(converted)
+
+    # O arquivo auxiliar de matrizes (.npz) não é confundido com um modelo binário
+    DataReader.WriteMatrices(str(tmp_path / "results_matrices.npz"), {"K": np.eye(2)})
+    assert findModels(str(tmp_path), "*.trz") == [converted]
+
+
+def test_binary_rejects_repeated_node_ids(tmp_path):
+    model = loadExample("Truss01")
+    model["nodes"][1]["id"] = model["nodes"][0]["id"]
+    with pytest.raises(ValueError):
+        DataReader.WriteBinaryModel(str(tmp_path / "model.trz"), model)
+
+
+def test_binary_rejects_non_contiguous_material_ids(tmp_path):
+    model = loadExample("Truss01")
+    for material in model["material"]:
+        material["id"] += 10
+    for element in model["elements"]:
+        element["material"] += 10
+    with pytest.raises(ValueError):
+        DataReader.WriteBinaryModel(str(tmp_path / "model.trz"), model)
+
+
+def test_binary_rejects_unknown_references():
+    arrays = DataReader.ModelToArrays(loadExample("Truss01"))
+    arrays["supportNodes"] = arrays["supportNodes"] + 100
+    with pytest.raises(ValueError):
+        DataReader.CheckBinaryIds(arrays)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+import numpy as np
+import pytest
+from conftest import EXAMPLES
+from ResultCache import ResultCache
+from SAG import SAG
+
+
+def copyExample(tmp_path, name: str) -> str:
+    dir = str(tmp_path / (name + ".json"))
+    shutil.copyfile(os.path.join(EXAMPLES, name + ".json"), dir)
+    return dir
+
+
+def test_results_hit_skips_analysis(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    first = SAG(copyExample(tmp_path, "Truss03"), cache=cache, outputProfile="summary")
+    first.solveStructure()
+    first.outputResults(plot=False)
+    output = first.Structure.output
+
+    second = SAG(copyExample(tmp_path, "Truss03"), cache=cache, outputProfile="summary")
+    second.solveStructure()
+    assert second.cached is not None and not second.solved
+    assert np.allclose(second.cached["output"]["NodalDisplacements"], output["NodalDisplacements"])
+    assert cache.info()["hits"] == 1 and cache.info()["misses"] == 1
+
+
+def test_options_change_key(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    dense = SAG(copyExample(tmp_path, "Truss02"), cache=cache, storage="dense")
+    sparse = SAG(copyExample(tmp_path, "Truss02"), cache=cache, storage="sparse")
+    assert dense.cacheKeys("legacy")[0] != sparse.cacheKeys("legacy")[0]
+    assert dense.cacheKeys("legacy")[0] != dense.cacheKeys("summary")[0]
+
+
+@pytest.mark.parametrize("solver, stored", [("splu", True), ("pcg", False)])
+def test_factorization_reuse(tmp_path, solver, stored):
+    cache = ResultCache(str(tmp_path / "cache"), storeFactorizations=True)
+    first = SAG(copyExample(tmp_path, "Q3"), cache=cache, storage="sparse", solver=solver)
+    first.solveStructure()
+    displacements = first.Structure.nodalDisp
+
+    # Mesma matriz de rigidez com outro perfil de saída: a fatoração armazenada é importada
+    second = SAG(copyExample(tmp_path, "Q3"), cache=cache, storage="sparse", solver=solver, outputProfile="summary")
+    second.solveStructure()
+    assert np.allclose(second.Structure.nodalDisp, displacements)
+    info = cache.info()
+    if stored:
+        assert info["factorHits"] == 1 and info["factorMisses"] == 1
+        assert second.Structure.solver.factorTime == 0
+    else:
+        assert info["factorHits"] == 0 and info["factorMisses"] == 0
+        assert not any(name.endswith(".factor.npz") for name in os.listdir(cache.dir))
+
+
+def test_eviction_respects_size(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), maxSize=1e-3)
+    for name in ("Truss01", "Truss02", "Truss03"):
+        SAG(copyExample(tmp_path, name), cache=cache, outputProfile="summary").outputResults(plot=False)
+    assert cache.info()["evictions"] > 0
+    assert cache.size() <= 1e-3*2**20 or len(os.listdir(cache.dir)) == 1
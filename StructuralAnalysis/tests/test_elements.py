@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from Classes import ElementTable, Elem, Node, Material, Section
+from conftest import loadExample
+from SAG import Truss2D
+
+
+def test_table_matches_element_formula(example):
+    structure = Truss2D(loadExample(example))
+    table = structure.elemTable
+    for element in structure.elements:
+        delta = element.finalNode.coords - element.initNode.coords
+        L = np.hypot(*delta);   c, s = delta/L
+        k = element.material.E*element.section.Ax/L
+        b = np.array([-c, -s, c, s])
+        assert np.isclose(element.L, L)
+        assert np.allclose(element.Klocal, k*np.outer(b, b))
+        assert np.allclose(element.rotMatrix @ element.rotMatrix.T, np.eye(4))
+        assert np.allclose(element.rotMatrix.T @ element.Kint @ element.rotMatrix, element.Klocal)
+    assert table.Klocal.shape == (structure.nElem, 4, 4)
+
+
+def test_standalone_element_builds_its_own_table():
+    nodeI = Node(1, [0.0, 0.0]);    nodeF = Node(2, [3.0, 4.0])
+    element = Elem(1, nodeI, nodeF, Material(1, 100.0), Section(1, 2.0), "Truss2D")
+    assert np.isclose(element.L, 5.0)
+    assert np.allclose(element.DOFs, [0, 1, 2, 3])
+    assert np.isclose(element.Klocal[0, 0], 100.0*2.0/5.0*0.6**2)
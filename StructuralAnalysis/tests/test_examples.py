@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from conftest import loadExample, loadReference
+from SAG import Truss2D
+
+
+@pytest.mark.parametrize("storage", ["dense", "sparse"])
+@pytest.mark.parametrize("bcMethod", ["penalty", "partition"])
+def test_results_match_reference(example, storage, bcMethod):
+    structure = Truss2D(loadExample(example), storage=storage, bcMethod=bcMethod)
+    structure.solveStructure()
+    reference = loadReference(example)
+    output = structure.outputResults("summary")
+    assert np.allclose(output["NodalDisplacements"], reference["NodalDisplacements"], rtol=1e-8, atol=1e-12)
+    assert np.allclose([e["Normal [kN]"] for e in output["Elements"]],
+                       [e["Normal [kN]"] for e in reference["Elements"]], atol=1e-8)
+    assert np.allclose([r["Reactions"] for r in output["Reactions"]],
+                       [r["Reactions"] for r in reference["Reactions"]], atol=1e-8)
+
+
+def test_sparse_stiffness_matches_dense(example):
+    dense = Truss2D(loadExample(example), storage="dense");     dense.calculateKGS_Singular()
+    sparse = Truss2D(loadExample(example), storage="sparse");   sparse.calculateKGS_Singular()
+    assert sp.issparse(sparse.KGS_Singular)
+    assert np.allclose(sparse.KGS_Singular.toarray(), dense.KGS_Singular)
+    assert np.allclose(dense.KGS_Singular, loadReference(example)["KGS"])
+
+
+def test_unknown_storage():
+    with pytest.raises(ValueError):
+        Truss2D(loadExample("Truss01"), storage="banded")
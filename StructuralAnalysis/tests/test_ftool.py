@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pytest
+import DataReader
+from conftest import EXAMPLES, EXAMPLE_NAMES, loadExample, loadReference
+from SAG import Truss2D
+
+# Truss01.ftl descreve uma treliça diferente da de Truss01.json
+FTOOL_EXAMPLES = [name for name in EXAMPLE_NAMES if name != "Truss01"]
+
+
+def test_ftool_models_parse():
+    for name in EXAMPLE_NAMES:
+        data = DataReader.ReadModel(os.path.join(EXAMPLES, name + ".ftl"))
+        ids = {node["id"] for node in data["nodes"]}
+        assert all(e["NI"] in ids and e["NF"] in ids and e["NI"] != e["NF"] for e in data["elements"])
+
+
+@pytest.mark.parametrize("example", FTOOL_EXAMPLES)
+def test_ftool_model_matches_json(example):
+    data = DataReader.ReadModel(os.path.join(EXAMPLES, example + ".ftl"))
+    reference = loadExample(example)
+    assert len(data["nodes"]) == len(reference["nodes"])
+    # A numeração e a orientação das barras podem diferir; compara a conectividade
+    bars = lambda model: sorted(tuple(sorted((e["NI"], e["NF"]))) for e in model["elements"])
+    assert bars(data) == bars(reference)
+    assert np.allclose([n["coordenadas"] for n in data["nodes"]], [n["coordenadas"] for n in reference["nodes"]],
+                       atol=1e-5)
+    # O Ftool grava as coordenadas com 5 casas decimais
+    structure = Truss2D(data)
+    structure.solveStructure()
+    expected = loadReference(example)
+    assert np.allclose(structure.outputResults("summary")["NodalDisplacements"],
+                       expected["NodalDisplacements"], rtol=1e-4, atol=1e-12)
+
+
+def test_vertex_lookup_tolerates_rounding():
+    index = {DataReader._FtoolVertexKey([1.5, -0.0]): 0, DataReader._FtoolVertexKey([3.0, 2.0]): 1}
+    assert DataReader._FindFtoolVertex(index, [1.5 + 1e-12, 1e-13]) == 0
+    assert DataReader._FindFtoolEdgeEnds(index, [1.5, 3.0, 2.0, 0.0]) == (0, 1)
+    with pytest.raises(ValueError):
+        DataReader._FindFtoolVertex(index, [2.0, 2.0])
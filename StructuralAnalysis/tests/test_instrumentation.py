@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+
+import pytest
+from conftest import EXAMPLES
+from SAG import SAG
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_output_phase_includes_results_file(tmp_path, compact):
+    model = str(tmp_path / "Truss01.json")
+    shutil.copyfile(os.path.join(EXAMPLES, "Truss01.json"), model)
+    analysis = SAG(model, instrument=True)
+    analysis.outputResults(plot=False, compact=compact)
+    with open(tmp_path / "Truss01" / "results.json", 'r') as file:
+        output = json.load(file)
+    phases = output["Instrumentation"]["phases"]
+    assert list(phases)[-1] == "output"
+    assert phases["output"]["wallTime [s]"] > 0
+    assert "NodalDisplacements" in output
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import copy
+import numpy as np
+import pytest
+from conftest import loadExample
+from SAG import Truss2D
+
+
+def caseModel(name: str) -> dict:
+    """
+    Exemplo com dois casos de carregamento (as ações nodais originais e o dobro delas) e uma combinação
+    """
+    model = loadExample(name)
+    loads = model.pop("nodalLoads")
+    doubled = [{"no": load["no"], "forcas": [2*f for f in load["forcas"]]} for load in loads]
+    model["loadCases"] = [{"name": "G", "nodalLoads": loads}, {"name": "Q", "nodalLoads": doubled}]
+    model["loadCombinations"] = [{"name": "G+0.5Q", "factors": {"G": 1.0, "Q": 0.5}}]
+    return model
+
+
+@pytest.mark.parametrize("options", [{}, {"storage": "sparse"}, {"storage": "sparse", "bcMethod": "partition"}])
+def test_cases_match_single_runs(options):
+    model = caseModel("Truss01")
+    structure = Truss2D(model, **options)
+    structure.solveStructure()
+    for case in model["loadCases"]:
+        single = copy.deepcopy(model)
+        single.pop("loadCases");    single.pop("loadCombinations")
+        single["nodalLoads"] = case["nodalLoads"]
+        reference = Truss2D(single, **options)
+        reference.solveStructure()
+        result = next(r for r in structure.caseResults if r["name"] == case["name"])
+        assert np.allclose(result["NodalDisplacements"], reference.nodalDisp)
+    combination = structure.caseResults[-1]
+    assert np.allclose(combination["NodalDisplacements"], 2*np.asarray(structure.caseResults[0]["NodalDisplacements"]))
+
+
+def test_single_factorization_for_all_cases():
+    structure = Truss2D(caseModel("Truss01"), storage="sparse", bcMethod="partition")
+    structure.solveStructure()
+    assert structure.solver.nRHS == 3
+
+
+def test_nodal_loads_with_load_cases_are_rejected():
+    model = caseModel("Truss01")
+    model["nodalLoads"] = model["loadCases"][0]["nodalLoads"]
+    with pytest.raises(ValueError):
+        Truss2D(model)
+
+
+def test_unknown_case_in_combination():
+    model = caseModel("Truss01")
+    model["loadCombinations"][0]["factors"]["W"] = 1.0
+    with pytest.raises(ValueError):
+        Truss2D(model)
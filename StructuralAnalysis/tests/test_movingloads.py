@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import copy
+
+import numpy as np
+import pytest
+from SAG import Truss2D
+from TrussGenerators import warrenGirder
+
+TRAIN = {"name": "TB", "loads": [100.0, 150.0, 150.0], "offsets": [0.0, 3.0, 4.5]}
+
+
+def bridge() -> dict:
+    """
+    Viga Warren de 10 painéis de 2 m (banzo inferior: nós 1 a 11)
+    """
+    return warrenGirder(10)
+
+
+def leverLoads(data: dict, axles: np.ndarray, loads: np.ndarray) -> list[dict]:
+    """
+    Ações nodais no banzo inferior (eixo x, painéis de 2 m) das cargas dos eixos pela regra da alavanca
+    """
+    forces = {}
+    for x, P in zip(axles.tolist(), loads.tolist()):
+        if 0 <= x <= 20:
+            j = min(int(x//2), 9);   t = x/2 - j
+            forces[j + 1] = forces.get(j + 1, 0.0) + P*(1 - t)
+            forces[j + 2] = forces.get(j + 2, 0.0) + P*t
+    return [{"no": id, "forcas": [0.0, -P]} for id, P in forces.items()]
+
+
+@pytest.mark.parametrize("options", [{"storage": "dense"}, {"storage": "sparse", "renumbering": "rcm"}])
+def test_influence_lines_match_single_load_analyses(options):
+    data = bridge()
+    analysis = Truss2D(copy.deepcopy(data), **options).solveMovingLoads(blockSize=4)
+    assert analysis.nFactorizations == 1 and analysis.solver.nRHS == 11
+    assert analysis.path.tolist() == list(range(1, 12))
+    assert np.allclose(analysis.stations, np.arange(0.0, 21.0, 2.0))
+    for j, id in enumerate(analysis.path.tolist()):
+        single = copy.deepcopy(data)
+        single["nodalLoads"] = [{"no": id, "forcas": [0.0, -1.0]}]
+        structure = Truss2D(single, bcMethod="partition", **options)
+        structure.solveStructure()
+        assert np.allclose(analysis.influence[:, j], structure.normalForces, atol=1e-10)
+
+
+def test_envelope_matches_sweep_and_full_analysis():
+    data = bridge()
+    structure = Truss2D(copy.deepcopy(data), storage="sparse")
+    structure.solveStructure()
+    reference = structure.normalForces.copy()
+    analysis = structure.solveMovingLoads([TRAIN], blockSize=7)
+    assert np.allclose(structure.normalForces, reference)
+    envelope = analysis.envelopes[0]["Normal"]
+    maximum = np.array(envelope["max"]);    minimum = np.array(envelope["min"])
+
+    # Varredura fina das posições do trem com as linhas de influência (nunca excede as envoltórias exatas)
+    loads = np.array(TRAIN["loads"]);     offsets = np.array(TRAIN["offsets"])
+    x = np.linspace(-6.0, 26.0, 6401)
+    R = np.hstack([sum(P*np.array([np.interp(x - direction*o, analysis.stations, row, left=0.0, right=0.0)
+                                   for row in analysis.influence]) for o, P in zip(offsets, loads))
+                   for direction in (1, -1)])
+    assert np.all(R.max(axis=1) <= maximum + 1e-9) and np.all(R.min(axis=1) >= minimum - 1e-9)
+    assert np.allclose(R.max(axis=1), maximum, atol=1.0) and np.allclose(R.min(axis=1), minimum, atol=1.0)
+
+    # Análise completa na posição crítica de cada extremo
+    for e in range(structure.nElem):
+        for key, value in (("max", maximum[e]), ("min", minimum[e])):
+            position, direction = envelope[key + "Position"][e], envelope[key + "Direction"][e]
+            single = copy.deepcopy(data)
+            single["nodalLoads"] = leverLoads(data, position - direction*offsets, loads)
+            check = Truss2D(single, bcMethod="partition")
+            check.solveStructure()
+            assert np.isclose(check.normalForces[e], value, atol=1e-8)
+
+
+def test_envelope_options():
+    structure = Truss2D(bridge(), storage="sparse")
+    analysis = structure.solveMovingLoads()
+    assert analysis.envelopes == []
+    both = analysis.envelope([TRAIN], reversible=True)[0]
+    blocked = Truss2D(bridge(), storage="sparse").solveMovingLoads([TRAIN], blockSize=1).envelopes[0]
+    assert np.allclose(both["Normal"]["max"], blocked["Normal"]["max"])
+    assert np.allclose(both["Normal"]["min"], blocked["Normal"]["min"])
+    forward = analysis.envelope([TRAIN], reversible=False)[0]
+    assert set(forward["Normal"]["maxDirection"]) == {1} and forward["nPositions"] < both["nPositions"]
+    assert np.all(np.array(forward["Normal"]["max"]) <= np.array(both["Normal"]["max"]))
+    report = analysis.report()
+    assert report["nFactorizations"] == 1 and len(report["envelopes"]) == 2
+    assert np.shape(report["influenceLines"]) == (structure.nElem, 11)
+
+
+def test_invalid_moving_loads():
+    structure = Truss2D(bridge())
+    with pytest.raises(ValueError):
+        structure.solveMovingLoads(path=[1, 99])
+    with pytest.raises(ValueError):
+        structure.solveMovingLoads(path=[1, 1, 2])
+    with pytest.raises(ValueError):
+        structure.solveMovingLoads(direction=[0.0, 0.0, -1.0])
+    with pytest.raises(ValueError):
+        structure.solveMovingLoads([{"name": "x", "loads": [1.0, 2.0], "offsets": [0.0]}])
+    with pytest.raises(ValueError):
+        structure.solveMovingLoads([{"name": "x", "loads": [1.0, 2.0], "offsets": [0.0, -1.0]}])
+
+
+@pytest.mark.parametrize("bcMethod", ["partition", "penalty"])
+def test_analysis_stiffness_is_reused_and_reported(bcMethod, monkeypatch):
+    fresh = Truss2D(bridge()).solveMovingLoads([TRAIN])
+    structure = Truss2D(bridge(), bcMethod=bcMethod)
+    structure.solveStructure()
+    calls = []
+    monkeypatch.setattr(structure, "calculateKGS_Singular", lambda: calls.append(1))
+    if bcMethod == "partition":
+        monkeypatch.setattr(structure, "partitionedStiffness", lambda: calls.append(2))
+    analysis = structure.solveMovingLoads([TRAIN])
+    assert calls == []
+    assert np.allclose(analysis.influence, fresh.influence, atol=1e-12)
+    output = structure.outputResults("summary")
+    assert output["MovingLoads"]["envelopes"][0]["Normal"]["max"] == pytest.approx(fresh.envelopes[0]["Normal"]["max"])
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import copy
+
+import numpy as np
+import pytest
+import DataReader
+from Classes import Node, NodeTable
+from conftest import loadExample
+from SAG import Truss2D
+
+
+def renumberIds(data: dict, newId) -> dict:
+    """
+    Cópia do modelo com os IDs dos nós substituídos por newId(id) (mesma ordem da tabela de nós)
+    """
+    data = copy.deepcopy(data)
+    for node in data["nodes"]:
+        node["id"] = newId(node["id"])
+    for element in data["elements"]:
+        element["NI"] = newId(element["NI"]);     element["NF"] = newId(element["NF"])
+    loads = data.get("nodalLoads", []) + [load for case in data.get("loadCases", []) for load in case["nodalLoads"]]
+    for item in data["restrictions"] + loads:
+        item["no"] = newId(item["no"])
+    return data
+
+
+def test_non_contiguous_ids_match_original(example, tmp_path):
+    data = loadExample(example)
+    sparse = renumberIds(data, lambda id: 1000 - 7*id)
+    reference = Truss2D(copy.deepcopy(data))
+    reference.solveStructure()
+    expected = reference.outputResults("summary")
+
+    dir = str(tmp_path / ("sparse" + DataReader.BINARY_EXTENSION))
+    DataReader.WriteBinaryModel(dir, sparse)
+    for model in (sparse, DataReader.ReadModel(dir)):
+        structure = Truss2D(model)
+        assert not structure.nodeTable.contiguous
+        structure.solveStructure()
+        output = structure.outputResults("summary")
+        assert np.allclose(output["NodalDisplacements"], expected["NodalDisplacements"], atol=1e-12)
+        assert [r["id"] for r in output["Reactions"]] == [1000 - 7*r["id"] for r in expected["Reactions"]]
+        assert np.allclose([r["Reactions"] for r in output["Reactions"]],
+                           [r["Reactions"] for r in expected["Reactions"]], atol=1e-8)
+
+
+def test_index_lookup():
+    table = NodeTable([40, 7, 13], np.zeros((3, 2)))
+    assert table.index([13, 40, 7, 13]).tolist() == [2, 0, 1, 2]
+    assert table.index(np.array([[7], [40]])).tolist() == [[1], [0]]
+    assert table.node(13).index == 2
+    with pytest.raises(ValueError):
+        table.index([7, 8])
+    with pytest.raises(ValueError):
+        NodeTable([1, 2, 2], np.zeros((3, 2)))
+    with pytest.raises(ValueError):
+        NodeTable([1, 2, 3], np.zeros((3, 2))).index(4)
+
+
+def test_unknown_node_references_are_rejected():
+    data = loadExample("Truss01")
+    data["elements"][0]["NI"] = 99
+    with pytest.raises(ValueError):
+        Truss2D(data)
+    structure = Truss2D(loadExample("Truss01"))
+    with pytest.raises(ValueError):
+        structure.removeSupports([99])
+
+
+def test_nodes_are_views_over_the_table():
+    data = loadExample("Truss01")
+    structure = Truss2D(data)
+    structure.solveStructure()
+    assert len(structure.nodes) == structure.nNodes
+    for node, restriction in ((structure.node(r["no"]), r) for r in data["restrictions"]):
+        assert not hasattr(node, "__dict__")
+        assert node.flagRestrictions and node.restrictions == restriction["restricoes"]
+        assert node.typeRestrictions == [type if r else "free" for r, type in zip(restriction["restricoes"], restriction["types"])]
+        assert np.allclose(node.ReactForces, structure.ReactionsV[structure.nodeDOFs[node.index]])
+    for load in data["nodalLoads"]:
+        assert structure.node(load["no"]).nodalLoads == load["forcas"]
+
+    # Alterações pelos nós são feitas diretamente nas tabelas da estrutura
+    node = structure.nodes[0]
+    node.defineNodalLoads([1.0, -2.0])
+    assert structure.hasLoad[0] and np.allclose(structure.nodalForces[0], [1.0, -2.0])
+    node.coords[0] = 123.0
+    assert structure.coords[0, 0] == 123.0
+
+
+def test_standalone_node():
+    node = Node(5, [1.0, 2.0])
+    assert node.id == 5 and np.allclose(node.coords, [1.0, 2.0])
+    assert not node.flagRestrictions and node.restrictions == [] and node.nodalLoads is None
+    node.defineRestrictions([1, 0])
+    assert node.restrictions == [1, 0] and node.typeRestrictions == ["fix", "free"]
+
+
+def test_node_table_memory():
+    n = 100000
+    table = NodeTable(np.arange(1, n + 1), np.zeros((n, 3)))
+    assert table.nbytes/n < 100
+    shuffled = NodeTable(np.random.default_rng(0).permutation(n) + 10, np.zeros((n, 3)))
+    assert shuffled.nbytes/n < 120
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from conftest import loadExample
+from SAG import Truss2D, Truss3D
+
+A, H, EA = 10.0, 1.0, 1e4
+L = np.hypot(A, H)
+
+
+def vonMises(P: float, dim: int = 2) -> dict:
+    """
+    Treliça de von Mises (arco abatido de duas barras) com carga vertical P no nó central
+    """
+    point = (lambda x, y: [x, y]) if dim == 2 else (lambda x, y: [x, 0.0, y])
+    model = {"typeStructure": f"Truss{dim}D",
+             "nodes": [{"id": 1, "coordenadas": point(-A, 0.0)}, {"id": 2, "coordenadas": point(0.0, H)},
+                       {"id": 3, "coordenadas": point(A, 0.0)}],
+             "elements": [{"id": 1, "NI": 1, "NF": 2, "material": 1, "sectionProp": 1},
+                          {"id": 2, "NI": 2, "NF": 3, "material": 1, "sectionProp": 1}],
+             "material": [{"id": 1, "modulo_elasticidade": EA}], "sectionProp": [{"id": 1, "area": 1.0}],
+             "restrictions": [{"no": 1, "restricoes": [1]*dim, "types": ["fix"]*dim},
+                              {"no": 3, "restricoes": [1]*dim, "types": ["fix"]*dim}],
+             "nodalLoads": [{"no": 2, "forcas": point(0.0, -P)}]}
+    if dim == 3:
+        model["restrictions"].append({"no": 2, "restricoes": [0, 1, 0], "types": ["fix", "fix", "fix"]})
+    return model
+
+
+def analyticLoad(v):
+    """
+    Carga em equilíbrio com o deslocamento vertical v do nó central (formulação corrotacional)
+    """
+    l = np.hypot(A, H - v)
+    return -2*EA*(l - L)/L*(H - v)/l
+
+
+LIMIT = analyticLoad(np.linspace(0, 2*H, 4001)).max()
+
+
+def test_small_load_matches_linear():
+    linear = Truss2D(vonMises(1e-4*LIMIT));     linear.solveStructure()
+    structure = Truss2D(vonMises(1e-4*LIMIT));  structure.solveNonlinear(nSteps=1)
+    assert np.allclose(structure.nodalDisp, linear.nodalDisp, rtol=1e-3)
+
+
+@pytest.mark.parametrize("options", [{}, {"iteration": "modified"}, {"lineSearch": True}])
+@pytest.mark.parametrize("storage", [{}, {"storage": "sparse", "bcMethod": "partition", "renumbering": "rcm"}])
+def test_load_control_matches_analytic(options, storage):
+    structure = Truss2D(vonMises(0.8*LIMIT), **storage)
+    structure.solveNonlinear(**options)
+    v = -structure.nodalDisp[structure.nodeDOFs[1, 1]]
+    assert abs(analyticLoad(v) - 0.8*LIMIT) < 1e-6*LIMIT
+
+
+@pytest.mark.parametrize("options", [{}, {"iteration": "modified"}, {"lineSearch": True}])
+def test_arclength_traces_snap_through(options):
+    structure = Truss2D(vonMises(1.5*LIMIT), storage="sparse")
+    report = structure.solveNonlinear(control="arclength", nSteps=20, controlNode=2, controlDirection=1, **options).report()
+    factors = [point["loadFactor"] for point in report["path"]]
+    assert report["loadFactor"] == pytest.approx(1.0)
+    assert min(factors) < 0                                     # Trecho descendente após o ponto limite
+    for point in report["path"]:
+        assert abs(analyticLoad(-point["controlDisplacement"]) - point["loadFactor"]*1.5*LIMIT) < 1e-6*LIMIT
+
+
+def test_truss3d_matches_plane_solution():
+    structure = Truss3D(vonMises(1.5*LIMIT, dim=3), storage="sparse")
+    structure.solveNonlinear(control="arclength", nSteps=20)
+    v = -structure.nodalDisp[structure.nodeDOFs[1, 2]]
+    assert abs(analyticLoad(v) - 1.5*LIMIT) < 1e-6*LIMIT
+
+
+def test_element_views_after_nonlinear_solve():
+    structure = Truss2D(loadExample("Truss01"))
+    structure.solveNonlinear()
+    forces = np.array([element.internalForces for element in structure.elements])
+    assert np.allclose(forces[:, 2], structure.normalForces)
+    assert np.allclose([element.localForces for element in structure.elements],
+                       [element.rotMatrix.T @ element.internalForces for element in structure.elements])
+
+
+def test_arclength_max_steps_raises():
+    structure = Truss2D(loadExample("Truss01"))
+    with pytest.raises(RuntimeError):
+        structure.solveNonlinear(control="arclength", maxSteps=1)
+
+
+def test_load_cases_are_rejected():
+    model = vonMises(LIMIT)
+    model["loadCases"] = [{"name": "G", "nodalLoads": model.pop("nodalLoads")}]
+    with pytest.raises(ValueError):
+        Truss2D(model).solveNonlinear()
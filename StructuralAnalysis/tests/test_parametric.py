@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import copy
+
+import numpy as np
+import pytest
+from conftest import loadExample
+from Parametric import candidateGrid
+from SAG import Truss2D, Truss3D
+from TrussGenerators import generateModel
+
+
+def springModel() -> dict:
+    """
+    Treliça com mola, deslocamento prescrito e duas seções e materiais
+    """
+    data = generateModel("warren", 120)
+    data["material"].append({"id": 2, "modulo_elasticidade": 1.0e8})
+    data["sectionProp"].append({"id": 2, "area": 5.0e-3})
+    for element in data["elements"][::3]:
+        element["material"] = 2;    element["sectionProp"] = 2
+    data["restrictions"].append({"no": 4, "restricoes": [0, 1], "types": ["fix", "flexible"], "flexible": [1.0e4]})
+    data["restrictions"].append({"no": 6, "restricoes": [1, 0], "types": ["prescrible", "fix"], "prescrible": [1.0e-3]})
+    return data
+
+
+def modified(data: dict, areas: dict = None, moduli: dict = None) -> dict:
+    data = copy.deepcopy(data)
+    for section in data["sectionProp"]:
+        section["area"] = (areas or {}).get(section["id"], section["area"])
+    for material in data["material"]:
+        material["modulo_elasticidade"] = (moduli or {}).get(material["id"], material["modulo_elasticidade"])
+    return data
+
+
+@pytest.mark.parametrize("options", [{"storage": "dense"}, {"storage": "sparse", "renumbering": "rcm"}])
+def test_sweep_matches_fresh_analyses(options):
+    data = springModel()
+    areas, moduli = candidateGrid({1: [1e-3, 4e-3], 2: [2e-3, 8e-3]}, {2: [5e7, 2e8]})
+    study = Truss2D(copy.deepcopy(data), **options).parametricStudy(blockSize=3)
+    results = study.sweep(areas, moduli)
+    assert results["displacements"].shape[0] == 8
+    assert study.nFactorizations == 8
+    for c in range(8):
+        fresh = Truss2D(modified(data, {1: areas[1][c], 2: areas[2][c]}, {2: moduli[2][c]}), **options)
+        fresh.solveStructure()
+        assert np.allclose(results["displacements"][c], fresh.userOrder(fresh.nodalDisp), rtol=1e-8, atol=1e-14)
+        assert np.allclose(results["normalForces"][c], fresh.normalForces, rtol=1e-8, atol=1e-8)
+        assert np.isclose(results["maxDisplacement"][c], np.abs(fresh.nodalDisp).max())
+
+
+def test_sweep_load_cases_and_summary_only(example):
+    data = loadExample(example)
+    study = Truss2D(copy.deepcopy(data), storage="sparse").parametricStudy()
+    results = study.sweep(np.array([[s["area"]*f for s in data["sectionProp"]] for f in (0.5, 1.0)]), store=False)
+    assert "displacements" not in results
+    fresh = Truss2D(copy.deepcopy(data))
+    fresh.solveStructure()
+    assert np.isclose(results["maxDisplacement"][1], np.abs(fresh.nodalDisp).max())
+    half = Truss2D(modified(data, {s["id"]: 0.5*s["area"] for s in data["sectionProp"]}))
+    half.solveStructure()
+    assert np.isclose(results["maxDisplacement"][0], np.abs(half.nodalDisp).max())
+    assert np.isclose(results["maxNormal"][0], np.abs(half.normalForces).max())
+
+
+def test_sweep_truss3d():
+    data = generateModel("spacegrid", 300)
+    results = Truss3D(copy.deepcopy(data), storage="sparse").parametricStudy().sweep(moduli={1: [1e8, 4e8]})
+    assert np.allclose(results["displacements"][0], 4*results["displacements"][1])
+
+
+@pytest.mark.parametrize("bcMethod", ["partition", "penalty"])
+def test_sensitivities_match_finite_differences(bcMethod):
+    data = springModel()
+    structure = Truss2D(copy.deepcopy(data), storage="sparse", bcMethod=bcMethod)
+    structure.solveStructure()
+    dofs = [5, 11, 17]
+    elements = [2, 7, 10]
+    sens = structure.parametricStudy().sensitivities(dofs, elements)
+    assert sens["reusedFactorization"] is (bcMethod == "partition")
+
+    # Diferenças centrais nas áreas de alguns elementos
+    def responses(delta: np.ndarray):
+        trial = Truss2D(copy.deepcopy(data), storage="sparse")
+        trial.elemTable.A = trial.elemTable.A + delta
+        trial.elemTable.defineStiffness()
+        trial.solveStructure()
+        u = trial.userOrder(trial.nodalDisp)
+        index = [list(trial.elemTable.ids).index(id) for id in elements]
+        return np.concatenate((u[dofs], trial.normalForces[index], [trial.GForcesV @ trial.nodalDisp]))
+
+    A = structure.elemTable.A
+    for e in (0, 2, 9):
+        h = 1e-4*A[e]
+        delta = np.zeros(A.size);   delta[e] = h
+        fd = (responses(delta) - responses(-delta))/(2*h)
+        adjoint = np.concatenate([sens[name]["dArea"][:, e] for name in ("displacement", "normal", "compliance")])
+        assert np.allclose(adjoint, fd, rtol=1e-5, atol=1e-9*np.abs(fd).max())
+
+
+def test_sensitivities_of_other_load_cases():
+    data = loadExample("Truss01")
+    loads = data.pop("nodalLoads")
+    doubled = [{"no": load["no"], "forcas": [2*f for f in load["forcas"]]} for load in loads]
+    data["loadCases"] = [{"name": "G", "nodalLoads": loads}, {"name": "2G", "nodalLoads": doubled}]
+    dofs = list(range(2*len(data["nodes"])))
+    elements = [element["id"] for element in data["elements"]]
+    structure = Truss2D(copy.deepcopy(data), bcMethod="partition")
+    structure.solveStructure()
+    fresh = Truss2D(copy.deepcopy(data), bcMethod="partition").parametricStudy()
+    for case in (0, 1):
+        reused = structure.parametricStudy().sensitivities(dofs, elements, case)
+        expected = fresh.sensitivities(dofs, elements, case)
+        assert reused["reusedFactorization"] and not expected["reusedFactorization"]
+        assert np.allclose(reused["displacement"]["value"], structure.caseResults[case]["NodalDisplacements"], atol=1e-14)
+        for name in ("displacement", "normal", "compliance"):
+            for key in ("value", "dArea", "dModulus"):
+                assert np.allclose(reused[name][key], expected[name][key], rtol=1e-10, atol=1e-14)
+
+
+def test_section_and_material_sensitivities():
+    data = springModel()
+    structure = Truss2D(copy.deepcopy(data), storage="sparse", bcMethod="partition")
+    structure.solveStructure()
+    sens = structure.parametricStudy().sensitivities(dofs=[9])
+    base = sens["displacement"]["value"][0]
+    for name, key, id, value in (("dSectionArea", "areas", 2, 5.0e-3), ("dMaterialModulus", "moduli", 1, 2.0e8)):
+        h = 1e-5*value
+        plus = Truss2D(modified(data, **{key: {id: value + h}}), storage="sparse")
+        plus.solveStructure()
+        minus = Truss2D(modified(data, **{key: {id: value - h}}), storage="sparse")
+        minus.solveStructure()
+        fd = (plus.userOrder(plus.nodalDisp)[9] - minus.userOrder(minus.nodalDisp)[9])/(2*h)
+        column = [s["id"] for s in data["sectionProp" if key == "areas" else "material"]].index(id)
+        assert np.isclose(sens["displacement"][name][0, column], fd, rtol=1e-5)
+    assert base == pytest.approx(structure.userOrder(structure.nodalDisp)[9])
+
+
+def test_invalid_parameters():
+    study = Truss2D(loadExample("Truss01")).parametricStudy()
+    with pytest.raises(ValueError):
+        study.sweep(areas={99: [1.0]})
+    with pytest.raises(ValueError):
+        study.sweep(areas=np.ones((2, 5)))
+    with pytest.raises(ValueError):
+        study.sweep(areas={1: [1.0, 2.0]}, moduli={1: [1.0, 2.0, 3.0]})
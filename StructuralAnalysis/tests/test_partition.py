@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from conftest import loadExample
+from SAG import Truss2D
+
+
+@pytest.mark.parametrize("storage", ["dense", "sparse"])
+def test_partition_matches_penalty(example, storage):
+    penalty = Truss2D(loadExample(example), storage=storage, bcMethod="penalty")
+    penalty.solveStructure()
+    partition = Truss2D(loadExample(example), storage=storage, bcMethod="partition")
+    partition.solveStructure()
+    assert np.allclose(partition.nodalDisp, penalty.nodalDisp, rtol=1e-9, atol=1e-12)
+    assert np.allclose(partition.ReactionsV, penalty.ReactionsV, atol=1e-8)
+
+    # O sistema reduzido contém apenas os GLs livres (inclusive os com apoio flexível)
+    assert partition.KGS_CC.shape == (partition.fDOFs.size,)*2
+    assert partition.fDOFs.size == partition.nGL - partition.fixDOFs.size - partition.prescDOFs.size
+
+
+def test_unknown_bc_method():
+    with pytest.raises(ValueError):
+        Truss2D(loadExample("Truss01"), bcMethod="lagrange")
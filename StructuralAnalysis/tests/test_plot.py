@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+import numpy as np
+import pytest
+from matplotlib.collections import LineCollection
+import BatchRunner
+import PrintStructure
+from conftest import EXAMPLES, loadExample
+from SAG import SAG, Truss2D, Truss3D
+from TrussGenerators import generateModel
+
+
+def test_single_collection_per_shape(tmp_path):
+    structure = Truss2D(generateModel("warren", 2000), storage="sparse")
+    structure.solveStructure()
+    fig = PrintStructure.plotStructure(str(tmp_path), structure, show=False, axialForces=True, deformed=True)
+    ax = fig.axes[0]
+    bars = [c for c in ax.collections if isinstance(c, LineCollection)]
+    assert len(bars) == 2                                   # Configurações original e deformada
+    assert len(bars[0].get_segments()) == structure.nElem
+    assert np.allclose(bars[0].get_array(), structure.normalForces)
+    assert len(ax.lines) == 0
+    assert os.path.isfile(tmp_path / "Structure.png")
+
+
+def test_deformed_scale(tmp_path):
+    structure = Truss2D(loadExample("Truss02"))
+    structure.solveStructure()
+    fig = PrintStructure.plotStructure(str(tmp_path), structure, show=False, deformed=True, scale=100.0)
+    deformed = fig.axes[0].collections[1].get_segments()
+    disp = structure.userOrder(structure.nodalDisp).reshape(-1, 2)
+    table = structure.elemTable
+    assert np.allclose([segment[0] for segment in deformed], (structure.coords + 100.0*disp)[table.initNodes])
+
+
+def test_truss3d_plot(tmp_path):
+    structure = Truss3D(generateModel("spacegrid", 300))
+    structure.solveStructure()
+    PrintStructure.plotStructure(str(tmp_path), structure, show=False, axialForces=True, fileName="grid.png")
+    assert os.path.isfile(tmp_path / "grid.png")
+
+
+def test_headless_output_does_not_block(tmp_path):
+    dir = str(tmp_path / "Truss03.json")
+    shutil.copyfile(os.path.join(EXAMPLES, "Truss03.json"), dir)
+    SAG(dir).outputResults(plot={"show": False, "deformed": True})
+    assert os.path.isfile(tmp_path / "Truss03" / "Structure.png")
+
+
+@pytest.mark.parametrize("plot", [False, True])
+def test_batch_plot_option(tmp_path, plot):
+    shutil.copyfile(os.path.join(EXAMPLES, "Truss01.json"), tmp_path / "Truss01.json")
+    summary = BatchRunner.runBatch(BatchRunner.findModels(str(tmp_path)), workers=1, plot=plot)
+    assert summary[0]["status"] == "ok"
+    assert os.path.isfile(tmp_path / "Truss01" / "Structure.png") is plot
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+import DataReader
+from conftest import EXAMPLES, loadExample, loadReference
+from SAG import SAG, Truss2D, OUTPUT_PROFILES
+
+
+def test_legacy_profile_matches_reference(example):
+    structure = Truss2D(loadExample(example))
+    structure.solveStructure()
+    output = structure.outputResults("legacy")
+    reference = loadReference(example)
+    for key in ("KGS", "KGS_CC", "GForcesV", "GForcesV_CC", "NodalDisplacements"):
+        assert np.allclose(output[key], reference[key], atol=1e-8), key
+
+
+def test_summary_profile_keys():
+    structure = Truss2D(loadExample("Truss01"))
+    structure.solveStructure()
+    output = structure.outputResults("summary")
+    assert not {"KGS", "KGS_CC", "GForcesV", "GForcesV_CC"} & set(output)
+    assert {"NodalDisplacements", "Elements", "Reactions"} <= set(output)
+
+
+def test_full_profile_writes_matrices(tmp_path):
+    model = str(tmp_path / "Truss02.json")
+    shutil.copyfile(os.path.join(EXAMPLES, "Truss02.json"), model)
+    SAG(model, outputProfile="full").outputResults(plot=False)
+    with open(tmp_path / "Truss02" / "results.json", 'r') as file:
+        output = json.load(file)
+    assert "KGS" not in output
+    matrices = DataReader.ReadMatrices(str(tmp_path / "Truss02" / output["Matrices"]["file"]))
+    reference = loadReference("Truss02")
+    assert np.allclose(matrices["KGS"].toarray(), reference["KGS"])
+    assert np.allclose(matrices["KGS_CC"].toarray(), reference["KGS_CC"])
+
+
+def test_unknown_profile():
+    assert "legacy" in OUTPUT_PROFILES
+    structure = Truss2D(loadExample("Truss01"))
+    structure.solveStructure()
+    with pytest.raises(ValueError):
+        structure.outputResults("verbose")
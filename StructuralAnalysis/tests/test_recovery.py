@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from conftest import loadExample
+from SAG import Truss2D
+
+
+def test_vectorized_forces_match_element_recovery(example):
+    structure = Truss2D(loadExample(example))
+    structure.solveStructure()
+    for element, N in zip(structure.elements, structure.normalForces):
+        fromTable = element.internalForces.copy();     refFromTable = element.internalForcesRef.copy()
+        element.calcInternalForces(structure.nodalDisp)
+        assert np.isclose(element.internalForces[2], N)
+        assert np.isclose(element.internalForcesRef[0], N)
+        assert np.allclose(element.internalForces, fromTable, atol=1e-9*max(1.0, abs(N)))
+        assert np.allclose(element.internalForcesRef, refFromTable, atol=1e-9*max(1.0, abs(N)))
+
+
+def test_global_forces_are_in_equilibrium(example):
+    structure = Truss2D(loadExample(example), storage="sparse")
+    structure.solveStructure()
+    free = np.setdiff1d(np.arange(structure.nGL), structure.restrDOFs)
+    assert np.allclose(structure.GlobalForces[free], structure.GForcesV[free], atol=1e-6)
+    assert np.allclose(structure.GlobalForces.reshape(-1, 2).sum(axis=0), 0, atol=1e-6)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import copy
+import math
+
+import numpy as np
+import pytest
+from conftest import loadExample
+from Reliability import RunningStatistics
+from SAG import Truss2D
+from TrussGenerators import generateModel
+
+
+def solved(data: dict, **options) -> Truss2D:
+    structure = Truss2D(copy.deepcopy(data), **options)
+    structure.solveStructure()
+    return structure
+
+
+def test_running_statistics_match_numpy():
+    X = np.random.default_rng(0).normal(size=(5, 103))*[[1], [2], [3], [4], [5]]
+    stats = RunningStatistics(5, limit=4.0)
+    for start in range(0, 103, 17):
+        stats.update(X[:, start:start + 17])
+    assert stats.count == 103
+    assert np.allclose(stats.mean, X.mean(axis=1))
+    assert np.allclose(stats.variance(), X.var(axis=1, ddof=1))
+    assert np.allclose(stats.max, X.max(axis=1)) and np.allclose(stats.min, X.min(axis=1))
+    assert np.array_equal(stats.exceedances, (np.abs(X) > 4.0).sum(axis=1))
+
+
+def test_failure_probability_matches_normal_distribution():
+    structure = solved(loadExample("Truss03"), storage="sparse")
+    u0 = np.abs(structure.userOrder(structure.nodalDisp))
+    analysis = structure.solveReliability(nSamples=20000, loads={"cov": 0.1, "correlated": True},
+                                          displacementLimit=1.2*u0, seed=7, batchSize=4000)
+    report = analysis.report()
+    exact = 0.5*math.erfc(2/math.sqrt(2))                  # P(1 + 0.1.z > 1.2)
+    assert abs(report["failureProbability"] - exact) < 4*report["standardError"]
+    assert analysis.nFactorizations == 1                    # Rigidez determinística: uma única fatoração
+
+
+def test_linear_response_statistics():
+    data = generateModel("pratt", 400)
+    structure = solved(data, storage="sparse")
+    report = structure.solveReliability(nSamples=3000, loads={"cov": 0.2}, seed=1, batchSize=512).report()
+    u0 = structure.userOrder(structure.nodalDisp)
+    scale = np.abs(u0).max()
+    assert np.allclose(report["NodalDisplacements"]["mean"], u0, atol=0.02*scale)
+    assert np.allclose(report["Normal"]["mean"], structure.normalForces, atol=0.02*np.abs(structure.normalForces).max())
+    assert max(report["NodalDisplacements"]["std"]) > 0
+
+
+@pytest.mark.parametrize("options", [{"moduli": {"cov": 0.1, "distribution": "lognormal"}, "samplesPerStiffness": 8},
+                                     {"areas": {"cov": 0.05, "perElement": True}, "loads": {"cov": 0.1}}])
+def test_pool_matches_serial_and_seed_is_reproducible(options):
+    data = generateModel("warren", 600)
+    structure = solved(data, storage="sparse")
+    common = {"nSamples": 300, "seed": 11, "batchSize": 64, "displacementLimit": 1.02*np.abs(structure.nodalDisp).max()}
+    serial = structure.solveReliability(**common, **options).report()
+    again = structure.solveReliability(**common, **options).report()
+    pooled = structure.solveReliability(**common, **options, workers=2).report()
+    assert serial["failures"] == again["failures"] == pooled["failures"]
+    assert np.allclose(serial["Normal"]["mean"], pooled["Normal"]["mean"], rtol=1e-12)
+    assert np.allclose(serial["NodalDisplacements"]["std"], pooled["NodalDisplacements"]["std"], rtol=1e-10)
+    assert np.array_equal(serial["NodalDisplacements"]["exceedanceProbability"], again["NodalDisplacements"]["exceedanceProbability"])
+    assert 0 < serial["failureProbability"] < 1
+
+
+def test_reliability_in_output():
+    structure = solved(loadExample("Truss02"))
+    structure.solveReliability(nSamples=50, loads={"cov": 0.1}, seed=0)
+    output = structure.outputResults("summary")
+    assert output["Reliability"]["nSamples"] == 50
+
+
+def test_invalid_options():
+    structure = Truss2D(loadExample("Truss01"))
+    with pytest.raises(ValueError):
+        structure.solveReliability(loads={"cov": 0.1, "distribution": "gumbel"})
+    with pytest.raises(ValueError):
+        structure.solveReliability(nSamples=0)
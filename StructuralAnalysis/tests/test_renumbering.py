@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import copy
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from conftest import loadExample, loadReference
+from SAG import Truss2D
+from TrussGenerators import generateModel
+
+
+@pytest.mark.parametrize("options", [{"storage": "dense"}, {"storage": "sparse"},
+                                     {"storage": "sparse", "bcMethod": "partition"}])
+def test_rcm_results_in_original_numbering(example, options):
+    structure = Truss2D(loadExample(example), renumbering="rcm", **options)
+    structure.solveStructure()
+    output = structure.outputResults("summary")
+    reference = loadReference(example)
+    KGS = structure.outputMatrices()["KGS"]
+    assert np.allclose(KGS.toarray() if sp.issparse(KGS) else KGS, reference["KGS"])
+    assert np.allclose(output["NodalDisplacements"], reference["NodalDisplacements"], rtol=1e-8, atol=1e-12)
+    assert np.allclose([r["Reactions"] for r in output["Reactions"]],
+                       [r["Reactions"] for r in reference["Reactions"]], atol=1e-8)
+    assert output["Renumbering"]["method"] == "rcm"
+
+
+def test_rcm_reduces_bandwidth_of_shuffled_model():
+    data = generateModel("grid", 600)
+    original = [node["coordenadas"] for node in data["nodes"]]
+
+    # Embaralha a numeração dos nós (mesma estrutura com banda grande)
+    permutation = np.random.default_rng(1).permutation(len(original))
+    newId = {i + 1: int(p) + 1 for i, p in enumerate(permutation)}
+    shuffled = copy.deepcopy(data)
+    for i, node in enumerate(shuffled["nodes"]):
+        node["id"] = newId[i + 1]
+    shuffled["nodes"].sort(key=lambda node: node["id"])
+    for element in shuffled["elements"]:
+        element["NI"] = newId[element["NI"]];     element["NF"] = newId[element["NF"]]
+    for item in shuffled["restrictions"] + shuffled.get("nodalLoads", []):
+        item["no"] = newId[item["no"]]
+
+    plain = Truss2D(copy.deepcopy(shuffled), storage="sparse")
+    plain.solveStructure()
+    rcm = Truss2D(copy.deepcopy(shuffled), storage="sparse", renumbering="rcm")
+    rcm.solveStructure()
+    report = rcm.renumberingReport
+    assert report["bandwidth"][1] < report["bandwidth"][0] / 4
+    assert report["profile"][1] < report["profile"][0]
+    assert np.allclose(rcm.outputResults("summary")["NodalDisplacements"],
+                       plain.outputResults("summary")["NodalDisplacements"], atol=1e-12)
+
+
+def test_unknown_renumbering():
+    with pytest.raises(ValueError):
+        Truss2D(loadExample("Truss01"), renumbering="metis")
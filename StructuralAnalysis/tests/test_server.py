@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from conftest import loadExample, EXAMPLE_NAMES
+from SAG import Truss2D, Truss3D
+from Server import AnalysisService, ServiceClient, ServiceError
+from TrussGenerators import generateModel
+
+
+class RunningService:
+    """
+    Serviço executado em um laço de eventos em uma thread separada
+    """
+    def __init__(self, unixSocket: str = None, **options):
+        self.loop = asyncio.new_event_loop()
+        self.service = AnalysisService(**options)
+        self.address = self.loop.run_until_complete(self.service.start(port=0, unixSocket=unixSocket))
+        self.unixSocket = unixSocket
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def client(self) -> ServiceClient:
+        if self.unixSocket is not None:
+            return ServiceClient(unixSocket=self.unixSocket)
+        return ServiceClient(*self.address)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.service.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def server():
+    running = RunningService(workers=4)
+    yield running
+    running.stop()
+
+
+def reference(data: dict) -> Truss2D:
+    structure = (Truss3D if data["typeStructure"] == "Truss3D" else Truss2D)(copy.deepcopy(data))
+    structure.solveStructure()
+    return structure
+
+
+def assertMatches(results: dict, structure: Truss2D):
+    assert np.allclose(results["NodalDisplacements"], structure.userOrder(structure.nodalDisp), atol=1e-12)
+    assert np.allclose([e["Normal [kN]"] for e in results["Elements"]], structure.normalForces)
+
+
+def test_models_stay_warm(server):
+    client = server.client()
+    data = loadExample("Truss03")
+    first = client.addModel(data)
+    assert not first["cached"]
+    assertMatches(first, reference(data))
+    again = client.addModel(data)
+    assert again["cached"] and again["id"] == first["id"]
+    assert again["Session"]["nFactorizations"] == 1
+
+    # Atualização das ações nodais: a fatoração é reutilizada
+    loads = [{"no": 2, "forcas": [5.0, -20.0]}, {"no": 3, "forcas": [0.0, -7.5]}]
+    updated = client.setLoads(first["id"], loads)
+    changed = copy.deepcopy(data)
+    changed["nodalLoads"] = loads
+    assertMatches(updated, reference(changed))
+    assert updated["Session"]["nFactorizations"] == 1 and updated["Session"]["nSolves"] == 3
+    assertMatches(client.results(first["id"]), reference(changed))
+
+    status = client.status()
+    assert status["nModels"] == 1 and status["hits"] == 1 and status["misses"] == 1
+    client.close()
+
+
+def test_restriction_and_model_updates(server):
+    client = server.client()
+    data = loadExample("Truss03")
+    id = client.addModel(data, id="truss", options={"storage": "sparse"})["id"]
+    assert id == "truss"
+
+    # Novo apoio em um nó livre (atualização de posto baixo)
+    supported = {restrict["no"] for restrict in data["restrictions"]}
+    node = next(node["id"] for node in data["nodes"] if node["id"] not in supported)
+    restriction = {"no": node, "restricoes": [0, 1], "types": ["fix", "fix"]}
+    updated = client.setRestrictions(id, [restriction])
+    changed = copy.deepcopy(data)
+    changed["restrictions"].append(restriction)
+    assertMatches(updated, reference(changed))
+    assert updated["Session"]["nFactorizations"] == 1 and updated["Session"]["rank"] == 1
+
+    # Substituição do modelo com outra rigidez
+    changed["sectionProp"][0]["area"] *= 2
+    replaced = client.replaceModel(id, changed)
+    assertMatches(replaced, reference(changed))
+    assert replaced["Session"]["nSolves"] == 1
+    client.close()
+
+
+def test_rejected_restrictions_keep_model(server):
+    client = server.client()
+    data = loadExample("Truss01")
+    id = client.addModel(data)["id"]
+    loads = [{"no": 3, "forcas": [10.0, -40.0]}]
+    before = client.setLoads(id, loads)
+
+    # Remoção de todos os apoios: recusada, com os apoios anteriores mantidos
+    with pytest.raises(ServiceError) as error:
+        client.setRestrictions(id, remove=[restrict["no"] for restrict in data["restrictions"]])
+    assert error.value.status == 422
+    with pytest.raises(ServiceError) as error:
+        client.setRestrictions(id, [{"no": 99, "restricoes": [1, 1], "types": ["fix", "fix"]}], remove=[1])
+    assert error.value.status == 400
+    after = client.setLoads(id, loads)
+    assert np.allclose(after["NodalDisplacements"], before["NodalDisplacements"], atol=1e-12)
+    client.close()
+
+
+def test_replace_after_support_change(server):
+    client = server.client()
+    data = loadExample("Truss03")
+    id = client.addModel(data)["id"]
+    supported = {restrict["no"] for restrict in data["restrictions"]}
+    node = next(node["id"] for node in data["nodes"] if node["id"] not in supported)
+    client.setRestrictions(id, [{"no": node, "restricoes": [1, 1], "types": ["fix", "fix"]}])
+
+    # O modelo original é reconstruído (os apoios enviados substituem os alterados)
+    assertMatches(client.replaceModel(id, data), reference(data))
+
+    # Casos de carregamento são recusados também com a mesma rigidez
+    cases = copy.deepcopy(data)
+    cases["loadCases"] = [{"name": "G", "nodalLoads": cases.pop("nodalLoads")}]
+    with pytest.raises(ServiceError) as error:
+        client.replaceModel(id, cases)
+    assert error.value.status == 400
+    client.close()
+
+
+def test_errors(server):
+    client = server.client()
+    assert client.request("GET", "/models/unknown")[0] == 404
+    assert client.request("GET", "/unknown")[0] == 404
+    assert client.request("POST", "/models", {})[0] == 400
+    data = loadExample("Truss01")
+    status, response = client.request("POST", "/models", {"model": data, "options": {"color": "red"}})
+    assert status == 400
+    data["typeStructure"] = "Frame2D"
+    assert client.request("POST", "/models", {"model": data})[0] == 400
+
+    # Estrutura hipostática: relatório da verificação de estabilidade
+    data = generateModel("warren", 40)
+    data["typeStructure"] = "Truss2D"
+    data["restrictions"] = data["restrictions"][:1]
+    with pytest.raises(ServiceError) as error:
+        client.addModel(data)
+    assert error.value.status == 422 and error.value.details["stability"]["nMechanisms"] == 1
+    assert client.status()["nModels"] == 0
+    client.close()
+
+
+def test_registry_is_size_bounded():
+    running = RunningService(maxSize=0.05)
+    try:
+        client = running.client()
+        small = loadExample("Truss01")
+        client.addModel(small, id="small")
+        large = generateModel("warren", 2000)
+        large["typeStructure"] = "Truss2D"
+        client.addModel(large, id="large", options={"storage": "sparse"})
+        status = client.status()
+        assert status["evictions"] == 1 and [model["id"] for model in status["models"]] == ["large"]
+        assert client.request("GET", "/models/small")[0] == 404
+        client.close()
+    finally:
+        running.stop()
+
+
+def test_concurrent_requests(server):
+    models = {name: loadExample(name) for name in EXAMPLE_NAMES}
+
+    def analyse(name):
+        client = server.client()
+        try:
+            return name, client.addModel(models[name], id=name)
+        finally:
+            client.close()
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(analyse, list(models)*3))
+    for name, result in results:
+        assertMatches(result, reference(models[name]))
+    client = server.client()
+    status = client.status()
+    client.close()
+    assert status["nModels"] == len(models) and status["misses"] == len(models)
+
+
+def test_unix_socket(tmp_path):
+    running = RunningService(unixSocket=str(tmp_path / "sag.sock"))
+    try:
+        client = running.client()
+        data = loadExample("Q3")
+        assertMatches(client.addModel(data), reference(data))
+        client.close()
+    finally:
+        running.stop()
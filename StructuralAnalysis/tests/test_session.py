@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import copy
+
+import numpy as np
+import pytest
+from SAG import Truss2D
+from TrussGenerators import generateModel
+
+OPTIONS = [{}, {"storage": "sparse"}, {"storage": "sparse", "bcMethod": "partition"},
+           {"storage": "sparse", "solver": "pcg"}]
+
+
+def assertMatchesFresh(structure, data, options):
+    """
+    Compara os resultados da sessão com os de uma análise completa do modelo modificado
+    """
+    fresh = Truss2D(copy.deepcopy(data), **options)
+    fresh.solveStructure()
+    scale = np.abs(fresh.nodalDisp).max()
+    assert np.allclose(structure.nodalDisp, fresh.nodalDisp, atol=1e-8*scale)
+    assert np.allclose(structure.normalForces, fresh.normalForces, atol=1e-6*np.abs(fresh.normalForces).max())
+    assert np.allclose([r["Reactions"] for r in structure.outputReactions()],
+                       [r["Reactions"] for r in fresh.outputReactions()], atol=1e-6)
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_session_updates_match_fresh_analysis(options):
+    data = generateModel("warren", 200)
+    nNodes = len(data["nodes"])
+    structure = Truss2D(copy.deepcopy(data), **options)
+    session = structure.openSession(maxRank=8)
+    session.solve()
+    assertMatchesFresh(structure, data, options)
+
+    # Novas ações nodais: a fatoração é reutilizada
+    data["nodalLoads"] = [{"no": 5, "forcas": [3, -7]}, {"no": 9, "forcas": [0, -2]}]
+    session.setNodalLoads(data["nodalLoads"])
+    session.solve()
+    assertMatchesFresh(structure, data, options)
+    assert session.info()["nFactorizations"] == 1
+
+    # Novo apoio, mola e deslocamento prescrito (atualização de posto baixo)
+    restrict = {"no": nNodes//2, "restricoes": [1, 1], "types": ["flexible", "prescrible"],
+                "flexible": [500.0], "prescrible": [-0.001]}
+    data["restrictions"].append(restrict)
+    session.setRestrictions([restrict])
+    session.solve()
+    assertMatchesFresh(structure, data, options)
+    assert session.info()["rank"] == 2 and session.info()["nFactorizations"] == 1
+
+    # Liberação de um GL da referência (substituído por uma mola)
+    first = {"no": data["restrictions"][0]["no"], "restricoes": [1, 1], "types": ["fix", "flexible"],
+             "flexible": [2000.0]}
+    data["restrictions"][0] = first
+    session.setRestrictions([first])
+    session.solve()
+    assertMatchesFresh(structure, data, options)
+
+    # Remoção do apoio acrescentado
+    data["restrictions"].pop()
+    session.removeRestrictions([nNodes//2])
+    session.solve()
+    assertMatchesFresh(structure, data, options)
+
+    # Modificações acima de maxRank: nova fatoração
+    extra = [{"no": i, "restricoes": [0, 1], "types": ["fix", "flexible"], "flexible": [100.0 + i]} for i in range(2, 14)]
+    data["restrictions"] += extra
+    session.setRestrictions(extra)
+    session.solve()
+    assertMatchesFresh(structure, data, options)
+    assert session.info()["nFactorizations"] == 2
+
+
+def test_session_multiple_load_vectors():
+    data = generateModel("pratt", 120)
+    structure = Truss2D(copy.deepcopy(data), storage="sparse")
+    session = structure.openSession()
+    F = np.zeros((structure.nGL, 3))
+    F[5, 0] = 10.0;     F[8, 1] = -4.0;     F[11, 2] = 7.5
+    U = session.solve(F)
+    for j in range(3):
+        assert np.allclose(session.solve(F[:, j]), U[:, j])
+    assert session.info()["nSolves"] == 4
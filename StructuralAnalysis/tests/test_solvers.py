@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from contextlib import nullcontext
+
+import numpy as np
+import pytest
+import Solvers
+from conftest import loadExample, loadReference
+from SAG import Truss2D
+
+
+def solve(name: str, **options) -> Truss2D:
+    structure = Truss2D(loadExample(name), **options)
+    structure.solveStructure()
+    return structure
+
+
+@pytest.mark.parametrize("options", [
+    {"storage": "dense", "solver": "dense"},
+    {"storage": "sparse", "solver": "splu"},
+    {"storage": "sparse", "solver": {"type": "splu", "ordering": "natural"}},
+    {"storage": "sparse", "solver": "pcg"},
+    {"storage": "sparse", "solver": {"type": "pcg", "preconditioner": "ic"}},
+    {"storage": "dense", "bcMethod": "partition", "solver": "pcg"},
+])
+def test_solvers_match_reference(example, options):
+    structure = solve(example, **options)
+    reference = loadReference(example)
+    assert np.allclose(structure.nodalDisp, reference["NodalDisplacements"], rtol=1e-7, atol=1e-10)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_cholesky_matches_reference(example):
+    structure = solve(example, storage="sparse", bcMethod="partition", solver="cholesky")
+    assert np.allclose(structure.nodalDisp, loadReference(example)["NodalDisplacements"], rtol=1e-8, atol=1e-12)
+
+
+def test_cholesky_without_cholmod_warns():
+    if Solvers.cholmod() is not None:
+        pytest.skip("scikit-sparse instalado")
+    with pytest.warns(RuntimeWarning):
+        Solvers.defineSolver("cholesky")
+
+
+def test_pcg_with_dense_penalty_is_rejected():
+    with pytest.raises(ValueError):
+        Truss2D(loadExample("Truss02"), storage="dense", bcMethod="penalty", solver="pcg")
+
+
+def test_unknown_solver():
+    with pytest.raises(ValueError):
+        Solvers.defineSolver("gauss")
+
+
+def test_solver_is_abstract():
+    with pytest.raises(TypeError):
+        Solvers.Solver()
+
+    class Incomplete(Solvers.Solver):
+        def factorize(self, K):
+            self.K = K
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize("name, transfer", [("dense", False), ("pcg", False), ("splu", True), ("cholesky", True)])
+def test_factor_transfer_capability(name, transfer):
+    with pytest.warns(RuntimeWarning) if name == "cholesky" and Solvers.cholmod() is None else nullcontext():
+        solver = Solvers.defineSolver(name, "sparse")
+    assert solver.factorTransfer is transfer
+    if not transfer:
+        with pytest.raises(TypeError):
+            solver.importFactor({})
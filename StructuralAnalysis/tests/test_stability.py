@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import json
+import numpy as np
+import pytest
+import BatchRunner
+from conftest import loadExample
+from SAG import Truss2D, Truss3D
+from Stability import PebbleGame
+from TrussGenerators import generateModel
+from test_truss3d import tripod
+
+
+def collinearNode(data: dict) -> int:
+    """
+    Acrescenta um nó no meio de uma diagonal, ligado às extremidades da diagonal por duas barras colineares
+    (genericamente rígido, mas com um mecanismo infinitesimal perpendicular à diagonal). Retorna o ID do nó
+    """
+    coords = {node["id"]: node["coordenadas"] for node in data["nodes"]}
+    diagonal = next(e for e in data["elements"] if coords[e["NI"]][1] != coords[e["NF"]][1])
+    id = len(data["nodes"]) + 1;    nElem = len(data["elements"])
+    data["nodes"].append({"id": id, "coordenadas": [(a + b)/2 for a, b in zip(coords[diagonal["NI"]], coords[diagonal["NF"]])]})
+    data["elements"] += [{"id": nElem + 1, "NI": diagonal["NI"], "NF": id, "material": 1, "sectionProp": 1},
+                         {"id": nElem + 2, "NI": id, "NF": diagonal["NF"], "material": 1, "sectionProp": 1}]
+    return id
+
+
+def test_examples_are_stable(example):
+    data = loadExample(example)
+    structure = (Truss3D if data["typeStructure"] == "Truss3D" else Truss2D)(data)
+    report = structure.checkStability()
+    assert report["stable"] and structure.verifyRestrictions()
+    assert report["method"] == "spectral" and report["nMechanisms"] == 0
+    assert report["mechanismNodes"] == [] and 1 <= report["conditionEstimate"] < 1e3
+    assert report["nRedundant"] == -report["maxwell"]       # Treliças planas genericamente rígidas
+
+
+def test_pebble_game_counts():
+    # Triângulo apoiado (isostático), com uma barra repetida (redundante)
+    game = PebbleGame(3)
+    assert [game.addEdge(u, v) for u, v in ((0, 1), (1, 2), (0, 2), (0, 1))] == [True, True, True, False]
+    assert game.nRedundant == 1 and game.nMechanisms == 3
+    for node, k in ((0, 0), (0, 1), (1, 2)):
+        game.addSupport(node, k)
+    assert game.nMechanisms == 0 and game.floppyNodes().size == 0
+
+    # Quadrilátero sem diagonal: um mecanismo que envolve os nós não apoiados
+    game = PebbleGame(4)
+    for u, v in ((0, 1), (1, 2), (2, 3)):
+        game.addEdge(u, v)
+    for node, k in ((0, 0), (0, 1), (3, 2), (3, 0)):
+        game.addSupport(node, k)
+    assert game.nMechanisms == 1
+    assert game.floppyNodes().tolist() == [1, 2]
+
+
+def test_missing_diagonal_is_found_without_factorization():
+    data = generateModel("warren", 400)
+    supported = {restrict["no"] for restrict in data["restrictions"]}
+    middle = next(i for i, e in enumerate(data["elements"])
+                  if i >= len(data["elements"])//2 and not {e["NI"], e["NF"]} & supported)
+    removed = data["elements"].pop(middle)
+    structure = Truss2D(data, storage="sparse")
+    report = structure.checkStability()
+    assert not report["stable"] and report["method"] == "pebble"
+    assert report["nMechanisms"] == 1 and report["conditionEstimate"] == np.inf
+    assert {removed["NI"], removed["NF"]} <= set(report["mechanismNodes"])
+    numeric = structure.checkStability(numeric=True)
+    assert numeric["method"] == "spectral" and numeric["nMechanisms"] == 1
+
+
+@pytest.mark.parametrize("nGL", [80, 2000])                 # Autovalores densos e por iteração inversa deslocada
+def test_collinear_mechanism_is_found_numerically(nGL):
+    data = generateModel("pratt", nGL)
+    id = collinearNode(data)
+    report = Truss2D(data, storage="sparse").checkStability()
+    assert report["method"] == "spectral" and report["nMechanisms"] == 1
+    assert report["mechanismNodes"] == [id]
+    assert report["nRedundant"] == 0                        # Genericamente rígida: apenas a geometria é singular
+    assert 0 < len(report["mechanismDOFs"]) and set(report["mechanismDOFs"]) <= {2*(id - 1), 2*(id - 1) + 1}
+
+
+def test_supports_and_isolated_nodes():
+    data = loadExample("Truss01")
+    structure = Truss2D(data)
+    nodes = np.asarray(structure.nodeIds)[structure.hasSupport]
+    structure.removeSupports(nodes[:1])
+    report = structure.checkStability()
+    assert not report["stable"] and report["nMechanisms"] >= 1
+    assert report["mechanismNodes"] == sorted(structure.nodeIds.tolist())
+
+    data = loadExample("Truss02")
+    id = max(node["id"] for node in data["nodes"]) + 1
+    data["nodes"].append({"id": id, "coordenadas": [50.0, 50.0]})
+    report = Truss2D(data).checkStability(numeric=True)
+    assert report["nMechanisms"] == 2 and report["mechanismNodes"] == [id]
+
+
+def test_truss3d_stability():
+    assert Truss3D(tripod()).checkStability()["stable"]
+    data = tripod()
+    data["restrictions"][0]["types"] = ["fix", "fix", "flexible"]
+    data["restrictions"][0]["flexible"] = [1e4]
+    assert Truss3D(data).checkStability()["stable"]         # Apoio flexível também restringe o GL
+    data["elements"].pop()
+    report = Truss3D(data).checkStability()
+    assert report["method"] == "count" and report["nMechanisms"] == 1 and report["conditionEstimate"] == np.inf
+    report = Truss3D(data).checkStability(numeric=True)
+    assert report["nMechanisms"] == 1 and report["mechanismNodes"] == [4]
+
+
+def test_slender_structure_is_stable_but_ill_conditioned():
+    report = Truss2D(generateModel("warren", 2000), storage="sparse").checkStability()
+    assert report["stable"] and report["conditionEstimate"] > 1e8
+
+
+def test_batch_reports_mechanism(tmp_path):
+    data = generateModel("warren", 40)
+    id = collinearNode(data)
+    data["typeStructure"] = "Truss2D"
+    (tmp_path / "mechanism.json").write_text(json.dumps(data))
+    status = BatchRunner.analyseModel(str(tmp_path / "mechanism.json"), {})
+    assert status["status"] == "unstable" and str(id) in status["message"]
+    assert status["stability"]["mechanismNodes"] == [id]
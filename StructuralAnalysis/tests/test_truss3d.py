@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from conftest import loadExample
+from SAG import Truss2D, Truss3D, SAG
+from TrussGenerators import generateModel
+
+
+def tripod(P: float = -30.0, radius: float = 2.0, height: float = 3.0) -> dict:
+    """
+    Tripé: três barras dos apoios (no plano z = 0) até o topo, com força vertical no topo
+    """
+    angles = np.radians([90.0, 210.0, 330.0])
+    nodes = [{"id": i + 1, "coordenadas": [radius*np.cos(a), radius*np.sin(a), 0.0]} for i, a in enumerate(angles)]
+    nodes.append({"id": 4, "coordenadas": [0.0, 0.0, height]})
+    return {
+        "typeStructure": "Truss3D",
+        "nodes": nodes,
+        "elements": [{"id": i, "NI": i, "NF": 4, "material": 1, "sectionProp": 1} for i in (1, 2, 3)],
+        "material": [{"id": 1, "modulo_elasticidade": 2.0e8}],
+        "sectionProp": [{"id": 1, "area": 1.0e-3}],
+        "restrictions": [{"no": i, "restricoes": [1, 1, 1], "types": ["fix", "fix", "fix"]} for i in (1, 2, 3)],
+        "nodalLoads": [{"no": 4, "forcas": [0.0, 0.0, P]}],
+    }
+
+
+@pytest.mark.parametrize("options", [{"storage": "dense"}, {"storage": "sparse"},
+                                     {"storage": "sparse", "bcMethod": "partition", "renumbering": "rcm"}])
+def test_tripod_matches_analytic_solution(options):
+    P, radius, height = -30.0, 2.0, 3.0
+    structure = Truss3D(tripod(P, radius, height), **options)
+    structure.solveStructure()
+    L = np.hypot(radius, height);   sin = height/L;     k = 2.0e8*1.0e-3/L
+    assert np.allclose(structure.normalForces, P/(3*sin))
+    assert np.allclose(structure.userOrder(structure.nodalDisp)[9:], [0.0, 0.0, P/(3*k*sin**2)], atol=1e-14)
+    reactions = np.array([r["Reactions"] for r in structure.outputReactions()])
+    assert np.allclose(reactions.sum(axis=0), [0.0, 0.0, -P])
+
+
+def test_planar_model_matches_truss2d(example):
+    data2D = loadExample(example)
+    structure2D = Truss2D(data2D)
+    structure2D.solveStructure()
+
+    # Mesma treliça no plano z = 0, com o GL z restringido em todos os nós
+    data3D = loadExample(example)
+    data3D["typeStructure"] = "Truss3D"
+    for node in data3D["nodes"]:
+        node["coordenadas"] = list(node["coordenadas"]) + [0.0]
+    restricted = {restrict["no"] for restrict in data3D["restrictions"]}
+    for restrict in data3D["restrictions"]:
+        restrict["restricoes"] = list(restrict["restricoes"][:2]) + [1]
+        restrict["types"] = list(restrict["types"][:2]) + ["fix"]
+    data3D["restrictions"] += [{"no": node["id"], "restricoes": [0, 0, 1], "types": ["fix", "fix", "fix"]}
+                               for node in data3D["nodes"] if node["id"] not in restricted]
+    for load in data3D.get("nodalLoads", []):
+        load["forcas"] = list(load["forcas"][:2]) + [0.0]
+    structure3D = Truss3D(data3D)
+    structure3D.solveStructure()
+
+    u2D = structure2D.userOrder(structure2D.nodalDisp).reshape(-1, 2)
+    u3D = structure3D.userOrder(structure3D.nodalDisp).reshape(-1, 3)
+    assert np.allclose(u3D[:, :2], u2D, rtol=1e-8, atol=1e-12)
+    assert np.allclose(u3D[:, 2], 0.0)
+    assert np.allclose(structure3D.normalForces, structure2D.normalForces, rtol=1e-8, atol=1e-8)
+
+
+def test_element_stiffness_is_rotated_axial_bar():
+    structure = Truss3D(generateModel("spacegrid", 300))
+    structure.calculateKGS_Singular()
+    for element in structure.elements[:20]:
+        delta = element.finalNode.coords - element.initNode.coords
+        L = np.linalg.norm(delta);   direction = delta/L
+        b = np.concatenate((-direction, direction))
+        k = element.material.E*element.section.Ax/L
+        assert np.isclose(element.L, L)
+        assert np.allclose(element.Klocal, k*np.outer(b, b))
+    assert structure.elemTable.Klocal.shape == (structure.nElem, 6, 6)
+
+
+def test_spacegrid_equilibrium():
+    structure = Truss3D(generateModel("spacegrid", 600), storage="sparse")
+    structure.solveStructure()
+    applied = structure.nodalForces.sum(axis=0)
+    reactions = np.array([r["Reactions"] for r in structure.outputReactions()]).sum(axis=0)
+    assert np.allclose(applied + reactions, 0.0, atol=1e-8*np.abs(applied).max())
+
+
+def test_dimension_mismatch():
+    data = tripod()
+    data["typeStructure"] = "Truss2D"
+    with pytest.raises(ValueError):
+        Truss2D(data)
+    with pytest.raises(ValueError):
+        Truss3D(loadExample("Truss01"))